@@ -0,0 +1,364 @@
+"""
+Benchmark dei percorsi caldi di Supernova Range Suite su dati sintetici.
+
+Genera colpi realistici (liste opzioni reali dell'app, seme fisso) e misura
+coercizione, filtri periodo, aggregazioni Review, tabella putting, modello
+strokes gained e salvataggio contro un foglio Google finto in memoria.
+Con ``--entry-shots`` misura anche la CPU server per colpo inserito dal
+wizard (AppTest), con rerun completi e con rerun del solo frammento.
+
+    python bench_range_suite.py --sizes 10000,100000 --repeat 3 --out bench.json
+    python bench_range_suite.py --sizes "" --entry-shots 10
+
+Il risultato è JSON (una voce per benchmark e dimensione) per confrontare
+le esecuzioni nel tempo.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import datetime
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+import vvl_range_protect_logo as app
+
+SESSION = "Sessione Benchmark"
+
+
+# =============================================================================
+# Dati sintetici
+# =============================================================================
+def generate_shots(n: int, seed: int = 0, users: int = 25, days: int = 730) -> pd.DataFrame:
+    """``n`` righe grezze allineate a ``DATA_COLUMNS`` come arrivano dal backend."""
+    rng = np.random.default_rng(seed)
+    today = datetime.date.today()
+    cat = rng.choice(["RANGE", "SHORT", "PUTT"], n, p=[0.5, 0.3, 0.2])
+    is_range, is_short, is_putt = cat == "RANGE", cat == "SHORT", cat == "PUTT"
+    df = pd.DataFrame(index=range(n), columns=app.DATA_COLUMNS)
+    df["User"] = rng.choice([f"ATLETA{i:02d}" for i in range(users)], n)
+    df["Date"] = [(today - datetime.timedelta(days=int(d))).isoformat() for d in rng.integers(0, days, n)]
+    df["SessionName"] = rng.choice([SESSION, "Sessione Allenamento", "Pre-gara"], n)
+    df["Time"] = [f"{h:02d}:{m:02d}" for h, m in zip(rng.integers(7, 20, n), rng.integers(0, 60, n))]
+    df["Category"] = cat
+    df["Club"] = np.select(
+        [is_range, is_short],
+        [rng.choice(app.CLUBS_LONG, n), rng.choice(app.CLUBS_SHORT, n)],
+        "Putter",
+    )
+    df["Impact"] = np.select(
+        [is_range, is_short],
+        [rng.choice(app.LONG_IMPACT, n), rng.choice(app.SHORT_IMPACT, n)],
+        rng.choice(app.PUTT_IMPACT, n),
+    )
+    df["Curvature"] = np.where(is_range, rng.choice(app.LONG_CURVE, n), "")
+    df["Trajectory"] = np.where(is_putt, rng.choice(app.PUTT_TRAJ, n), "")
+    df["Direction_LR"] = np.select(
+        [is_range, is_short], [rng.choice(app.LONG_DIR, n), rng.choice(app.SHORT_DIR, n)], ""
+    )
+    lie_long = rng.choice(["Tee", "Fairway"], n)
+    df["Lie_Long"] = np.where(is_range, lie_long, "")
+    df["Lie_Start"] = np.select([is_range, is_short], [lie_long, rng.choice(app.SHORT_LIE_START, n)], "Green")
+    df["Lie_End"] = np.select(
+        [is_range, is_short],
+        [rng.choice(["Fairway", "Rough", "Bunker"], n), rng.choice(app.SHORT_LIE_END, n)],
+        "Green",
+    )
+    hole_start = rng.uniform(60, 420, n)
+    hole_end = np.abs(rng.normal(25, 15, n))
+    short_start = rng.uniform(3, 50, n)
+    putt_start = rng.gamma(2.0, 2.5, n).clip(0.3, 25)
+    made = rng.random(n) < np.exp(-putt_start / 3)
+    df["Proximity_Lateral_m"] = np.where(is_putt, np.nan, rng.normal(0, 8, n))
+    df["Proximity_Depth_m"] = np.where(is_putt, np.nan, rng.normal(0, 10, n))
+    df["Hole_Dist_Start_m"] = np.where(is_range, hole_start, np.nan)
+    df["Hole_Dist_End_m"] = np.where(is_range, hole_end, np.nan)
+    df["Start_Dist_m"] = np.select([is_range, is_short], [hole_start, short_start], putt_start)
+    df["End_Dist_m"] = np.select(
+        [is_range, is_short],
+        [hole_end, np.abs(rng.normal(3, 2.5, n))],
+        np.where(made, 0.0, np.abs(rng.normal(0.8, 0.5, n))),
+    )
+    df["Rating"] = rng.integers(1, 6, n)
+    df["Mental_Reaction"] = rng.choice(app.MENTAL_OPTIONS, n)
+    df["Strokes_Gained"] = np.round(app.compute_sg_frame(df), 3)
+    df["SG_Model"] = app.SG_MODEL_VERSION
+    df["Shot_ID"] = [f"bench-{seed}-{i}" for i in range(n)]
+    return df
+
+
+# =============================================================================
+# Foglio finto
+# =============================================================================
+class FakeWorksheet:
+    """Sottoinsieme delle chiamate gspread usate da ``GSheetsBackend``."""
+
+    def __init__(self, header: list[str]) -> None:
+        self.rows: list[list[Any]] = [list(header)]
+        self.calls = 0
+
+    def row_values(self, i: int) -> list[Any]:
+        self.calls += 1
+        return list(self.rows[i - 1]) if i <= len(self.rows) else []
+
+    def col_values(self, j: int) -> list[Any]:
+        self.calls += 1
+        return [r[j - 1] if j <= len(r) else "" for r in self.rows]
+
+    def update(self, range_name: str, values: list[list[Any]]) -> None:
+        self.calls += 1
+        if range_name == "A1":
+            self.rows[0] = list(values[0])
+
+    def append_rows(self, values: list[list[Any]], **_: Any) -> None:
+        self.calls += 1
+        self.rows.extend(list(v) for v in values)
+
+    def get(self, range_name: str, **_: Any) -> list[list[Any]]:
+        self.calls += 1
+        start = int("".join(ch for ch in range_name.split(":")[0] if ch.isdigit()))
+        return [list(r) for r in self.rows[start - 1 :]]
+
+
+class FakeConnection:
+    """Connessione in memoria con l'interfaccia di st-gsheets-connection."""
+
+    def __init__(self) -> None:
+        self.ws = FakeWorksheet(app.DATA_COLUMNS)
+        self.client = self
+
+    def _select_worksheet(self) -> FakeWorksheet:
+        return self.ws
+
+    def read(self, ttl: int = 0) -> pd.DataFrame:
+        header, *body = self.ws.rows
+        return pd.DataFrame(body, columns=header)
+
+    def update(self, data: pd.DataFrame) -> None:
+        self.ws.rows = [list(data.columns)] + data.astype(object).values.tolist()
+
+
+# =============================================================================
+# Misure
+# =============================================================================
+def timeit(fn: Callable[[], Any], repeat: int) -> dict[str, float]:
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - t0)
+    return {"min_s": min(runs), "median_s": statistics.median(runs), "max_s": max(runs)}
+
+
+def bench_size(n: int, seed: int, repeat: int, save_shots: int) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = []
+
+    def record(name: str, fn: Callable[[], Any], rows: int | None = None, **extra: Any) -> None:
+        entry = {"bench": name, "n": n, "rows": rows if rows is not None else n, "repeat": repeat}
+        entry.update(timeit(fn, repeat))
+        entry.update(extra)
+        results.append(entry)
+
+    raw = generate_shots(n, seed)
+    record("coerce_frame", lambda: app.coerce_frame(raw))
+    df = app.coerce_frame(raw)
+    record("build_rollup", lambda: app.build_rollup(df))
+    roll = app.build_rollup(df)
+
+    for period in app.PERIOD_LABELS:
+        record(f"filter_period[{period}]", lambda p=period: app.filter_period(df, SESSION, p))
+
+    user = str(df["User"].iloc[0])
+    df_u, roll_u = df[df["User"] == user], roll[roll["User"] == user]
+    for sector in app.CATEGORIES:
+        record(
+            f"compute_review[{sector}]",
+            lambda s=sector: app.compute_review(df_u, roll_u, SESSION, "Lifelong", s),
+            rows=len(df_u),
+        )
+    putts = df[df["Category"] == "PUTT"]
+    record("putting_make_frame", lambda: app.putting_make_frame(putts), rows=len(putts))
+
+    record("compute_sg_frame", lambda: app.compute_sg_frame(raw))
+    for cat, fn in (
+        ("RANGE", lambda d: app.compute_sg_long_vec(
+            d["Hole_Dist_Start_m"], d["Hole_Dist_End_m"], d["Lie_Long"] == "Tee", d["Lie_End"])),
+        ("SHORT", lambda d: app.compute_sg_short_vec(
+            d["Start_Dist_m"], d["End_Dist_m"], d["Lie_Start"], d["Lie_End"])),
+        ("PUTT", lambda d: app.compute_sg_putt_vec(d["Start_Dist_m"], d["End_Dist_m"])),
+    ):
+        sub = {
+            k: v.to_numpy(dtype=float) if v.dtype.kind == "f" else v.astype(str).to_numpy()
+            for k, v in raw[raw["Category"] == cat].items()
+        }
+        record(f"compute_sg_{cat.lower()}_vec", lambda f=fn, s=sub: f(s), rows=len(sub["Category"]))
+
+    rows = generate_shots(save_shots, seed + 1).drop(columns=["Shot_ID"]).to_dict("records")
+
+    def save() -> int:
+        conn = FakeConnection()
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = app.ShotWriter(
+                app.GSheetsBackend(conn),
+                flush_seconds=3600,
+                flush_rows=10**9,
+                journal=app.ShotJournal(str(Path(tmp) / "journal.jsonl")),
+            )
+            for row in rows:
+                writer.submit(row)
+            # Ferma il thread del writer: non deve sopravvivere alla ripetizione
+            writer.close()
+        return conn.ws.calls
+
+    record("save_shot+flush", save, rows=save_shots, sheet_calls=save())
+    return results
+
+
+# =============================================================================
+# Inserimento colpi (AppTest)
+# =============================================================================
+@contextlib.contextmanager
+def fragment_reruns(fragment_id: str):
+    """Le interazioni di AppTest rieseguono solo ``fragment_id``, come fa il browser.
+
+    AppTest esegue sempre lo script intero; qui il rerun completo che ogni
+    runner ha in coda viene sostituito da quello del frammento.
+    """
+    from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+    from streamlit.testing.v1.element_tree import parse_tree_from_messages
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner, require_widgets_deltas
+
+    original = LocalScriptRunner.run
+
+    def run(self, widget_state=None, query_params=None, timeout=3, page_hash=""):
+        self._requests._rerun_data = RerunData(
+            widget_states=widget_state, page_script_hash=page_hash, fragment_id_queue=[fragment_id]
+        )
+        try:
+            if not self._script_thread:
+                self.start()
+            require_widgets_deltas(self, timeout)
+        finally:
+            self.join()
+        return parse_tree_from_messages(self.forward_msgs())
+
+    LocalScriptRunner.run = run
+    try:
+        yield
+    finally:
+        LocalScriptRunner.run = original
+
+
+def bench_shot_entry(shots: int) -> list[dict[str, Any]]:
+    """CPU server per colpo Range (``last_shot_cpu`` dell'app, thread dello script).
+
+    ``full``: ogni passaggio è un rerun completo più il rerun dell'app, come
+    prima dei frammenti; ``fragment``: i passaggi rieseguono solo il wizard.
+    """
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    def click(at: Any, label: str) -> None:
+        button = next((b for b in at.button if b.label == label), None)
+        if button is None:
+            raise RuntimeError(f"bottone {label!r} non trovato")
+        button.click().run()
+        if at.exception:
+            raise RuntimeError(f"{label!r}: {at.exception[0].value}")
+
+    def one_shot(at: Any) -> tuple[float, int]:
+        for label in (
+            "Range\n(gioco lungo)", app.CLUBS_LONG[0], app.LONG_IMPACT[0], app.LONG_CURVE[0], app.LONG_DIR[0],
+            "Conferma errore laterale", "Conferma profondità", "4", app.MENTAL_OPTIONS[0],
+        ):
+            click(at, label)
+        at.number_input[0].set_value(150.0)
+        at.number_input[1].set_value(10.0)
+        click(at, "Calcola e salva colpo")
+        return at.session_state["last_shot_cpu"]
+
+    results: list[dict[str, Any]] = []
+    for mode in ("full", "fragment"):
+        with tempfile.TemporaryDirectory() as tmp:
+            at = AppTest.from_file(app.__file__, default_timeout=60)
+            at.secrets["storage"] = {
+                "backend": "sqlite",
+                "sqlite_path": str(Path(tmp) / "bench.sqlite"),
+                "journal_path": str(Path(tmp) / "journal.jsonl"),
+            }
+            at.session_state["splash_done"] = True
+            at.session_state["logged_in"] = True
+            at.session_state["user"] = "ATLETA00"
+            at.run()
+            fragments = list(at._fragment_storage._fragments)
+            with fragment_reruns(fragments[0]) if mode == "fragment" else contextlib.nullcontext():
+                one_shot(at)  # riscaldamento: cache e primo rendering
+                measured = [one_shot(at) for _ in range(shots)]
+            # AppTest esegue l'app come __main__: get_writer() restituisce il writer in cache
+            # della sessione, da fermare prima che sparisca la cartella del giornale
+            sys.modules["__main__"].get_writer().close()
+            # Le risorse in cache (backend, writer, dataset) non passano alla modalità successiva
+            st.cache_resource.clear()
+            st.cache_data.clear()
+        cpu = [c for c, _ in measured]
+        results.append(
+            {
+                "bench": f"shot_entry_cpu[{mode}]",
+                "n": shots,
+                "rows": shots,
+                "repeat": shots,
+                "min_s": min(cpu),
+                "median_s": statistics.median(cpu),
+                "max_s": max(cpu),
+                "script_runs": statistics.median(r for _, r in measured),
+            }
+        )
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--sizes", default="10000,100000", help="dimensioni separate da virgola")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save-shots", type=int, default=200, help="colpi per il benchmark di salvataggio")
+    parser.add_argument("--entry-shots", type=int, default=0, help="colpi inseriti dal wizard via AppTest (0: salta)")
+    parser.add_argument("--out", help="file JSON di output (default: stdout)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for n in (int(s) for s in args.sizes.split(",") if s.strip()):
+        results.extend(bench_size(n, args.seed, args.repeat, args.save_shots))
+    if args.entry_shots > 0:
+        results.extend(bench_shot_entry(args.entry_shots))
+    report = {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "seed": args.seed,
+            "sg_model": app.SG_MODEL_VERSION,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    else:
+        sys.stdout.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
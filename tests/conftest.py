@@ -0,0 +1,136 @@
+import re
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import vvl_range_protect_logo as app  # noqa: E402
+
+
+class MemoryBackend(app.StorageBackend):
+    """Backend in memoria: registra ogni append, opzionalmente fallisce."""
+
+    name = "memory"
+
+    def __init__(self) -> None:
+        self.rows: list[dict] = []
+        self.appends = 0
+        self.fail = 0
+
+    def append(self, rows: pd.DataFrame, skip_existing: bool = False) -> None:
+        if self.fail:
+            self.fail -= 1
+            raise ConnectionError("offline")
+        self.appends += 1
+        known = {r.get("Shot_ID") for r in self.rows} if skip_existing else set()
+        self.rows.extend(r for r in rows.to_dict("records") if r.get("Shot_ID") not in known)
+
+
+def _cell(ref: str) -> tuple[int, int | None]:
+    """"B12" → (2, 12); "ZZ" → (702, None)."""
+    letters, digits = re.fullmatch(r"([A-Z]+)(\d*)", ref).groups()
+    col = 0
+    for ch in letters:
+        col = col * 26 + ord(ch) - 64
+    return col, int(digits) if digits else None
+
+
+class FakeWorksheet:
+    """Worksheet gspread in memoria: solo i metodi usati dal backend."""
+
+    def __init__(self, spreadsheet: "FakeSpreadsheet", title: str) -> None:
+        self.spreadsheet, self.title, self.rows = spreadsheet, title, []
+
+    def _write(self, row: int, col: int, values: list[list]) -> None:
+        for k, vals in enumerate(values):
+            while len(self.rows) < row + k:
+                self.rows.append([])
+            line = self.rows[row - 1 + k]
+            line.extend([""] * (col - 1 + len(vals) - len(line)))
+            line[col - 1 : col - 1 + len(vals)] = vals
+        self.spreadsheet.edits += 1
+
+    def row_values(self, i: int) -> list:
+        return list(self.rows[i - 1]) if i <= len(self.rows) else []
+
+    def col_values(self, j: int) -> list:
+        return [r[j - 1] if j <= len(r) else "" for r in self.rows]
+
+    def update(self, range_name: str, values: list[list]) -> None:
+        col, row = _cell(range_name)
+        self._write(row, col, values)
+
+    def append_rows(self, values: list[list], **_) -> None:
+        self.rows.extend(list(v) for v in values)
+        self.spreadsheet.edits += 1
+
+    def get(self, rng: str, **_) -> list[list]:
+        start, end = rng.split(":")
+        first, last = _cell(start)[1], _cell(end)[1]
+        return [list(r) for r in self.rows[first - 1 : last]]
+
+    @property
+    def row_count(self) -> int:
+        return len(self.rows)
+
+    @property
+    def col_count(self) -> int:
+        return max((len(r) for r in self.rows), default=0)
+
+    def batch_update(self, data: list[dict], **_) -> None:
+        for d in data:
+            col, row = _cell(d["range"].split(":")[0])
+            self._write(row, col, d["values"])
+
+
+class FakeSpreadsheet:
+    """Spreadsheet in memoria; ``modifiedTime`` avanza a ogni scrittura, come su Drive."""
+
+    def __init__(self) -> None:
+        self.sheets: dict[str, FakeWorksheet] = {}
+        self.edits = 0
+
+    def values_get(self, title: str, params: dict | None = None) -> dict:
+        return {"values": [list(r) for r in self.sheets[title.strip("'")].rows]}
+
+    def get_lastUpdateTime(self) -> str:
+        return f"2026-10-18T10:00:00.{self.edits:06d}Z"
+
+    def worksheets(self) -> list[FakeWorksheet]:
+        return list(self.sheets.values())
+
+    def add_worksheet(self, title: str, rows: int, cols: int) -> FakeWorksheet:
+        if title in self.sheets:
+            raise ValueError(f"worksheet {title!r} exists")
+        self.sheets[title] = FakeWorksheet(self, title)
+        return self.sheets[title]
+
+
+@pytest.fixture
+def backend() -> MemoryBackend:
+    return MemoryBackend()
+
+
+@pytest.fixture
+def make_writer():
+    """Crea ``ShotWriter`` e li chiude a fine test (niente thread residui)."""
+    writers = []
+
+    def make(*args, **kwargs) -> app.ShotWriter:
+        writer = app.ShotWriter(*args, **kwargs)
+        writers.append(writer)
+        return writer
+
+    yield make
+    for writer in writers:
+        if writer._thread.is_alive():
+            writer.close()
+
+
+def shot(user: str = "ANNA", day: str = "2026-10-01", **extra) -> dict:
+    row = {"User": user, "Date": day, "SessionName": "Test", "Category": "PUTT", "Club": "Putter"}
+    row.update(extra)
+    return row
@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pytest
+
+import vvl_range_protect_logo as app
+
+
+def open_breaker(threshold: int = 1) -> app.CircuitBreaker:
+    """Breaker già aperto con la pausa scaduta: la prossima chiamata è la prova."""
+    breaker = app.CircuitBreaker(threshold=threshold, reset_seconds=60.0)
+    breaker.failure()
+    breaker.opened_at = time.monotonic() - 61.0
+    return breaker
+
+
+def guard(breaker: app.CircuitBreaker, **kwargs) -> app.ApiGuard:
+    kwargs.setdefault("retries", 0)
+    return app.ApiGuard(rate_per_minute=6000, burst=100, breaker=breaker, **kwargs)
+
+
+def test_half_open_lets_a_single_probe_through():
+    breaker = open_breaker()
+    g = guard(breaker)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def probe():
+        calls.append("probe")
+        started.set()
+        release.wait(5)
+        return "ok"
+
+    result = {}
+    t = threading.Thread(target=lambda: result.setdefault("probe", g.call(probe)))
+    t.start()
+    assert started.wait(5)
+    with pytest.raises(app.BackendUnavailable):
+        g.call(lambda: calls.append("other"))
+    release.set()
+    t.join(5)
+    assert result["probe"] == "ok"
+    assert calls == ["probe"]
+    assert g.call(lambda: "after") == "after"
+
+
+def test_failed_probe_reopens_the_breaker():
+    breaker = open_breaker(threshold=5)
+    g = guard(breaker)
+
+    def boom():
+        raise ConnectionError("down")
+
+    with pytest.raises(app.BackendUnavailable):
+        g.call(boom)
+    assert breaker.opened_at is not None
+    with pytest.raises(app.BackendUnavailable, match="sospeso"):
+        g.call(lambda: "never")
+
+
+def test_non_transient_error_closes_the_probe():
+    breaker = open_breaker()
+    g = guard(breaker)
+
+    def bad():
+        raise ValueError("bad range")
+
+    with pytest.raises(ValueError):
+        g.call(bad)
+    assert g.call(lambda: "ok") == "ok"
+
+
+def test_interactive_guard_has_a_short_budget():
+    base = guard(app.CircuitBreaker(threshold=10), retries=4, base_delay=1.0, max_delay=32.0)
+    fast = base.interactive()
+    assert fast.breaker is base.breaker and fast.bucket is base.bucket
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        raise ConnectionError("timeout")
+
+    t0 = time.monotonic()
+    with pytest.raises(app.BackendUnavailable):
+        fast.call(flaky)
+    assert len(calls) == 2
+    assert time.monotonic() - t0 < 1.5
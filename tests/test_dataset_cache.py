@@ -0,0 +1,39 @@
+import pandas as pd
+
+import vvl_range_protect_logo as app
+from conftest import shot
+
+
+class PublicSheet(app.StorageBackend):
+    """Come il foglio pubblico: revisione a finestre temporali con watermark -1."""
+
+    def __init__(self, *rows: dict) -> None:
+        self.df = pd.DataFrame(list(rows), index=pd.RangeIndex(1, len(rows) + 1))
+        self.window = 0
+        self.reads = 0
+
+    def read_all(self) -> pd.DataFrame:
+        self.reads += 1
+        return app.align_dataframe(self.df)
+
+    def revision(self) -> tuple[int, int]:
+        return (self.window, -1)
+
+
+def test_unchanged_public_revision_is_served_from_the_cache():
+    backend = PublicSheet(shot("ANNA"), shot("LUCA"))
+    cache = app.DatasetCache(backend)
+    for _ in range(5):
+        assert len(cache.get()) == 2
+    assert backend.reads == 1
+
+
+def test_new_public_window_reloads_once():
+    backend = PublicSheet(shot("ANNA"))
+    cache = app.DatasetCache(backend)
+    cache.get()
+    backend.df = pd.DataFrame([shot("ANNA"), shot("LUCA")], index=pd.RangeIndex(1, 3))
+    backend.window += 1
+    assert len(cache.get()) == 2
+    assert len(cache.get()) == 2
+    assert backend.reads == 2
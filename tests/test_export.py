@@ -0,0 +1,40 @@
+import importlib.util
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import vvl_range_protect_logo as app
+from conftest import shot
+
+
+def frame(n: int) -> pd.DataFrame:
+    return app.coerce_frame(pd.DataFrame([shot(Rating=i % 5 + 1, Shot_ID=f"s{i}") for i in range(n)]))
+
+
+def read_csv(df: pd.DataFrame, rows=None) -> pd.DataFrame:
+    with app.write_export(df, "CSV", rows) as spool:
+        return pd.read_csv(io.BytesIO(spool.read()))
+
+
+def test_empty_csv_still_has_the_header():
+    out = read_csv(frame(0))
+    assert list(out.columns) == app.DATA_COLUMNS
+    assert out.empty
+
+
+def test_csv_exports_only_the_selected_rows_across_chunks(monkeypatch):
+    monkeypatch.setattr(app, "EXPORT_CHUNK_ROWS", 3)
+    df = frame(10)
+    rows = np.array([1, 4, 5, 8, 9])
+    out = read_csv(df, rows)
+    assert out["Shot_ID"].tolist() == [f"s{i}" for i in rows]
+
+
+@pytest.mark.skipif(importlib.util.find_spec("pyarrow") is None, reason="pyarrow non installato")
+def test_parquet_round_trip_keeps_rows():
+    df = frame(7)
+    with app.write_export(df, "Parquet", np.array([0, 6])) as spool:
+        out = pd.read_parquet(io.BytesIO(spool.read()))
+    assert out["Shot_ID"].tolist() == ["s0", "s6"]
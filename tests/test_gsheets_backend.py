@@ -0,0 +1,139 @@
+import datetime
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import vvl_range_protect_logo as app
+from conftest import FakeSpreadsheet, FakeWorksheet
+
+
+@pytest.mark.parametrize("missing", [None, float("nan"), np.float32("nan"), np.float64("nan"), pd.NA, pd.NaT])
+def test_sheet_cell_blanks_every_missing_value(missing):
+    assert app._sheet_cell(missing) == ""
+
+
+def test_sheet_cell_returns_json_ready_values():
+    cells = [
+        app._sheet_cell(np.float32(1.5)),
+        app._sheet_cell(np.int8(3)),
+        app._sheet_cell(np.datetime64("2026-10-01")),
+        app._sheet_cell(pd.Timestamp("2026-10-02 10:00")),
+        app._sheet_cell(datetime.date(2026, 10, 3)),
+        app._sheet_cell("PUTT"),
+    ]
+    assert cells == [1.5, 3, "2026-10-01", "2026-10-02", "2026-10-03", "PUTT"]
+    assert type(cells[0]) is float and type(cells[1]) is int
+    json.dumps(cells, allow_nan=False)
+
+
+def test_values_of_a_compact_frame_have_no_nan():
+    rows = app.align_dataframe(pd.DataFrame([{"User": "ANNA", "Category": "PUTT", "Strokes_Gained": np.nan}]))
+    values = app.GSheetsBackend._values(rows, list(app.DATA_COLUMNS))
+    json.dumps(values, allow_nan=False)
+    assert values[0][app.DATA_COLUMNS.index("Strokes_Gained")] == ""
+
+
+def sheet_backend(*data_rows: list) -> tuple[app.GSheetsBackend, FakeWorksheet]:
+    ws = FakeSpreadsheet().add_worksheet("Foglio1", rows=1000, cols=len(app.DATA_COLUMNS))
+    ws.rows = [list(app.DATA_COLUMNS)] + [list(r) for r in data_rows]
+    return app.GSheetsBackend(None, revision_ttl=0, worksheet=ws), ws
+
+
+def test_revision_follows_appends_without_a_new_generation():
+    backend, ws = sheet_backend(["ANNA"])
+    gen, count = backend.revision()
+    backend.append(pd.DataFrame([{"User": "LUCA", "Category": "PUTT"}]))
+    assert backend.revision() == (gen, count + 1)
+
+
+def test_edit_made_outside_the_process_opens_a_new_generation():
+    backend, ws = sheet_backend(["ANNA"], ["LUCA"])
+    gen, count = backend.revision()
+    ws.update("A2", [["MARIO"]])
+    assert backend.revision() == (gen + 1, count)
+
+
+def test_delete_balanced_by_an_append_opens_a_new_generation():
+    backend, ws = sheet_backend(["ANNA"], ["LUCA"])
+    gen, count = backend.revision()
+    del ws.rows[1]
+    ws.append_rows([["MARIO"]])
+    assert backend.revision() == (gen + 1, count)
+
+
+def test_generation_expires_after_max_age(monkeypatch):
+    backend, ws = sheet_backend(["ANNA"])
+    gen, _ = backend.revision()
+    now = time.monotonic()
+    monkeypatch.setattr(app.time, "monotonic", lambda: now + app.REVISION_MAX_AGE_SECONDS)
+    assert backend.revision()[0] == gen + 1
+
+
+def test_drive_errors_fall_back_to_the_age_cap():
+    backend, ws = sheet_backend(["ANNA"])
+
+    def denied():
+        raise PermissionError("Drive API has not been used in project")
+
+    ws.spreadsheet.get_lastUpdateTime = denied
+    gen, count = backend.revision()
+    assert backend._revision.drive is False
+    assert backend.revision() == (gen, count)
+
+
+class SerialDateWorksheet(FakeWorksheet):
+    """Celle data restituite come numero seriale se non si chiede il testo formattato."""
+
+    def get(self, rng: str, **options) -> list[list]:
+        values = super().get(rng)
+        if options.get("date_time_render_option") == "FORMATTED_STRING":
+            return values
+        col = app.DATA_COLUMNS.index("Date")
+        serial = lambda d: (pd.Timestamp(d) - pd.Timestamp("1899-12-30")).days  # noqa: E731
+        return [r[:col] + [serial(r[col])] + r[col + 1 :] for r in values]
+
+
+def test_delta_rows_keep_the_sheet_dates():
+    sp = FakeSpreadsheet()
+    ws = sp.sheets["Foglio1"] = SerialDateWorksheet(sp, "Foglio1")
+    date_col = app.DATA_COLUMNS.index("Date")
+    row = [""] * len(app.DATA_COLUMNS)
+    row[app.DATA_COLUMNS.index("User")], row[date_col] = "ANNA", "2026-10-01"
+    ws.rows = [list(app.DATA_COLUMNS), row]
+    backend = app.GSheetsBackend(None, revision_ttl=0, worksheet=ws)
+    typed = app.coerce_frame(backend.read_rows(0))
+    assert typed["Date"].iloc[0] == pd.Timestamp("2026-10-01")
+
+
+class WorksheetConnection:
+    """Connessione con service account: lettura completa via gspread_dataframe."""
+
+    def __init__(self, ws: FakeWorksheet) -> None:
+        self.ws = ws
+
+    def read(self, ttl: int = 0):
+        gspread_dataframe = pytest.importorskip("gspread_dataframe")
+        return gspread_dataframe.get_as_dataframe(self.ws, evaluate_formulas=True)
+
+
+def test_recompute_writes_back_to_the_right_rows_across_a_blank_row():
+    header = list(app.DATA_COLUMNS)
+
+    def putt(user: str, start: float) -> list:
+        row = dict(User=user, Date="2026-10-01", Category="PUTT", Club="Putter", Start_Dist_m=start, End_Dist_m=0)
+        return [row.get(c, "") for c in header]
+
+    ws = FakeSpreadsheet().add_worksheet("Foglio1", rows=1000, cols=len(header))
+    # Riga 4 del foglio vuota: i dati sono sulle righe 2, 3, 5 e 6
+    ws.rows = [header, putt("A", 1.0), putt("B", 2.0), [""] * len(header), putt("C", 3.0), putt("D", 4.0)]
+    backend = app.GSheetsBackend(WorksheetConnection(ws), worksheet=ws)
+    assert list(backend.read_all().index) == [1, 2, 4, 5]
+    assert app.recompute_strokes_gained(backend) == 4
+    sg = header.index("Strokes_Gained")
+    assert all(c == "" for c in ws.rows[3])
+    shots = pd.DataFrame([dict(zip(header, r)) for r in ws.rows[1:3] + ws.rows[4:]])
+    expected = app.compute_sg_frame(app.align_dataframe(shots))
+    assert [ws.rows[i][sg] for i in (1, 2, 4, 5)] == pytest.approx(list(expected))
@@ -0,0 +1,81 @@
+import re
+
+import pandas as pd
+import pytest
+
+import vvl_range_protect_logo as app
+from conftest import FakeSpreadsheet, shot
+
+
+@pytest.fixture
+def sharded() -> app.ShardedSheetsBackend:
+    return app.ShardedSheetsBackend(FakeSpreadsheet(), by_month=True, revision_ttl=0)
+
+
+def frame(*rows: dict) -> pd.DataFrame:
+    return pd.DataFrame([dict(r, Shot_ID=f"id-{i}") for i, r in enumerate(rows)])
+
+
+def test_titles_differ_for_users_that_sanitize_alike():
+    assert app.shard_title("A/B", "2026-10") != app.shard_title("A_B", "2026-10")
+
+
+def test_titles_differ_for_long_users_with_a_common_prefix():
+    prefix = "X" * 120
+    a, b = app.shard_title(prefix + "1", ""), app.shard_title(prefix + "2", "")
+    assert a != b
+    assert len(a) <= 100 and len(app.shard_title(prefix, "2026-10")) <= 100
+    assert not re.search(r"[\[\]:*?/\\']", app.shard_title("a[b]:c*?/'\\", "2026-10"))
+
+
+def test_rows_are_routed_to_each_users_shard(sharded):
+    sharded.append(
+        frame(
+            shot("A/B", "2026-09-30", Strokes_Gained=1.0),
+            shot("A_B", "2026-10-01", Strokes_Gained=2.0),
+            shot("A/B", "2026-10-02", Strokes_Gained=3.0),
+        )
+    )
+    m = sharded.manifest(refresh=True)
+    assert len(m) == 3 and m["Shard"].is_unique
+    assert sorted(zip(m["User"], m["Month"], m["Rows"])) == [
+        ("A/B", "2026-09", 1),
+        ("A/B", "2026-10", 1),
+        ("A_B", "2026-10", 1),
+    ]
+    mine = sharded.read_user("A/B")
+    assert sorted(pd.to_numeric(mine["Strokes_Gained"])) == [1.0, 3.0]
+    assert set(sharded.read_user("A_B")["User"]) == {"A_B"}
+    assert len(sharded.read_all()) == 3
+
+
+def test_update_rows_goes_back_to_the_owning_shard(sharded):
+    sharded.append(frame(shot("ANNA"), shot("LUCA"), shot("ANNA", "2026-11-01")))
+    full = sharded.read_all()
+    luca = full[full["User"] == "LUCA"].copy()
+    luca["Strokes_Gained"] = 9.5
+    sharded.update_rows(luca, columns=["Strokes_Gained"])
+    again = sharded.read_all()
+    sg = pd.to_numeric(again["Strokes_Gained"])
+    assert (sg[again["User"] == "LUCA"] == 9.5).all()
+    assert sg[again["User"] == "ANNA"].isna().all()
+
+
+def test_title_already_in_the_manifest_is_not_reused(sharded, monkeypatch):
+    monkeypatch.setattr(app, "shard_title", lambda user, month: "clash")
+    sharded.append(frame(shot("ANNA")))
+    sharded.append(frame(shot("LUCA")))
+    m = sharded.manifest(refresh=True)
+    assert list(m["Shard"]) == ["clash", "clash (2)"]
+    assert set(sharded.read_user("LUCA")["User"]) == {"LUCA"}
+    assert set(sharded.read_user("ANNA")["User"]) == {"ANNA"}
+
+
+def test_edit_inside_a_shard_opens_a_new_generation(sharded):
+    sharded.append(frame(shot("ANNA"), shot("LUCA")))
+    gen, count = sharded.revision()
+    sharded.append(frame(shot("ANNA")))
+    assert sharded.revision() == (gen, count + 1)
+    ws = next(w for t, w in sharded.spreadsheet.sheets.items() if t.startswith("LUCA"))
+    ws.update("A2", [["MARIO"]])
+    assert sharded.revision() == (gen + 1, count + 1)
@@ -0,0 +1,97 @@
+import vvl_range_protect_logo as app
+from conftest import shot
+
+
+def ids(entries) -> list:
+    return [row["Shot_ID"] for row, _ in entries]
+
+
+def test_append_returns_end_of_line_offsets(tmp_path):
+    journal = app.ShotJournal(str(tmp_path / "journal.jsonl"))
+    first = journal.append(shot(Shot_ID="a"))
+    second = journal.append(shot(Shot_ID="b"))
+    assert 0 < first < second == journal.path.stat().st_size
+
+
+def test_partial_commit_keeps_the_tail_unsynced(tmp_path):
+    journal = app.ShotJournal(str(tmp_path / "journal.jsonl"))
+    first = journal.append(shot(Shot_ID="a"))
+    journal.append(shot(Shot_ID="b"))
+    journal.commit(first)
+    assert journal.checkpoint() == first
+    assert ids(journal.unsynced()) == ["b"]
+
+
+def test_full_commit_compacts_and_resets_the_position(tmp_path):
+    journal = app.ShotJournal(str(tmp_path / "journal.jsonl"))
+    journal.append(shot(Shot_ID="a"))
+    journal.commit(journal.append(shot(Shot_ID="b")))
+    assert journal.path.stat().st_size == 0
+    assert journal.checkpoint() == 0
+    assert journal._fh.tell() == 0
+    # Dopo la compattazione gli offset ripartono dall'inizio del file
+    offset = journal.append(shot(Shot_ID="c"))
+    assert offset == journal.path.stat().st_size
+    assert ids(journal.unsynced()) == ["c"]
+
+
+def test_checkpoint_is_reset_before_the_journal_is_truncated(tmp_path, monkeypatch):
+    journal = app.ShotJournal(str(tmp_path / "journal.jsonl"))
+    offset = journal.append(shot(Shot_ID="a"))
+    sizes = []
+    replace = app.os.replace
+
+    def spy(src, dst):
+        sizes.append(journal.path.stat().st_size)
+        replace(src, dst)
+
+    monkeypatch.setattr(app.os, "replace", spy)
+    journal.commit(offset)
+    # Un crash tra checkpoint e troncamento deve lasciare il giornale intero
+    assert sizes == [offset]
+
+
+def test_unsynced_shots_survive_a_restart(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = app.ShotJournal(path)
+    journal.commit(journal.append(shot(Shot_ID="a")))
+    journal.append(shot(Shot_ID="b"))
+    assert ids(app.ShotJournal(path).unsynced()) == ["b"]
+
+
+def test_writer_replays_the_journal_once(tmp_path, backend, make_writer):
+    path = str(tmp_path / "journal.jsonl")
+    backend.fail = 1
+    writer = make_writer(backend, flush_seconds=60, journal=app.ShotJournal(path))
+    writer.submit(shot(Shot_ID="a"))
+    writer.submit(shot(Shot_ID="b"))
+    assert not writer.flush()
+    # Riavvio: il nuovo writer riprende i colpi dal giornale
+    restarted = make_writer(backend, flush_seconds=60, journal=app.ShotJournal(path))
+    assert restarted.pending_count() == 2
+    assert restarted.flush()
+    assert [r["Shot_ID"] for r in backend.rows] == ["a", "b"]
+    assert app.ShotJournal(path).unsynced() == []
+
+
+def test_append_many_offsets_after_compaction(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = app.ShotJournal(path)
+    journal.commit(journal.append(shot(Shot_ID="a")))
+    offsets = journal.append_many([shot(Shot_ID="b"), shot(Shot_ID="c")])
+    assert offsets[-1] == journal.path.stat().st_size
+    # Solo "b" è confermato: "c" deve sopravvivere al riavvio
+    journal.commit(offsets[0])
+    assert ids(app.ShotJournal(path).unsynced()) == ["c"]
+
+
+def test_submit_many_then_single_submit_keeps_offsets_ordered(tmp_path, backend, make_writer):
+    journal = app.ShotJournal(str(tmp_path / "journal.jsonl"))
+    writer = make_writer(backend, flush_seconds=60, journal=journal)
+    writer.submit_many([shot(Shot_ID=f"i{k}") for k in range(3)])
+    assert writer.flush()
+    writer.submit_many([shot(Shot_ID="j0"), shot(Shot_ID="j1")])
+    writer.submit(shot(Shot_ID="k"))
+    offsets = [offset for _, _, offset in writer._pending]
+    assert offsets == sorted(offsets)
+    assert offsets[-1] == journal.path.stat().st_size
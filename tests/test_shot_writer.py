@@ -0,0 +1,58 @@
+import time
+
+import vvl_range_protect_logo as app
+from conftest import shot
+
+
+def wait_for(cond, timeout: float = 2.0) -> bool:
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if cond():
+            return True
+        time.sleep(0.01)
+    return cond()
+
+
+def test_single_shot_is_flushed_without_reaching_flush_rows(backend, make_writer):
+    writer = make_writer(backend, flush_seconds=0.05, flush_rows=25)
+    ticket = writer.submit(shot())
+    assert wait_for(lambda: writer.is_flushed(ticket))
+    assert len(backend.rows) == 1
+
+
+def test_batch_of_flush_rows_is_written_at_once(backend, make_writer):
+    writer = make_writer(backend, flush_seconds=60, flush_rows=5)
+    tickets = [writer.submit(shot()) for _ in range(5)]
+    assert wait_for(lambda: writer.is_flushed(tickets[-1]))
+    assert backend.appends == 1
+    assert len(backend.rows) == 5
+
+
+def test_failed_batch_is_retried_in_order(backend, make_writer):
+    backend.fail = 1
+    writer = make_writer(backend, flush_seconds=60, flush_rows=25)
+    tickets = [writer.submit(shot(Rating=i)) for i in range(3)]
+    assert not writer.flush()
+    assert writer.pending_count() == 3
+    assert writer.flush()
+    assert writer.is_flushed(tickets[-1])
+    assert [r["Rating"] for r in backend.rows] == [0, 1, 2]
+
+
+def test_close_flushes_and_stops_the_thread(backend):
+    writer = app.ShotWriter(backend, flush_seconds=60, flush_rows=25)
+    ticket = writer.submit(shot())
+    assert writer.close()
+    assert writer.is_flushed(ticket)
+    assert not writer._thread.is_alive()
+
+
+def test_close_does_not_wait_for_the_retry_backoff(backend):
+    backend.fail = 10
+    writer = app.ShotWriter(backend, flush_seconds=0.01, flush_rows=25)
+    writer.submit(shot())
+    assert wait_for(lambda: writer.last_error is not None)
+    started = time.monotonic()
+    writer.close()
+    assert time.monotonic() - started < 0.5
+    assert not writer._thread.is_alive()
@@ -0,0 +1,34 @@
+import re
+
+import vvl_range_protect_logo as app
+
+
+def test_committed_stylesheet_is_current():
+    # Se fallisce: app.write_stylesheet() e committare static/supernova.css
+    assert app.STYLESHEET_PATH.read_text(encoding="utf-8") == app.build_stylesheet()
+
+
+def test_font_faces_point_at_committed_fonts():
+    urls = re.findall(r"url\('([^']+)'\)", app.build_stylesheet())
+    assert urls
+    for url in urls:
+        assert (app.STATIC_DIR / url).is_file(), url
+
+
+def test_href_is_versioned_and_writes_nothing(tmp_path, monkeypatch):
+    before = sorted(p.name for p in app.STATIC_DIR.iterdir())
+    app.stylesheet_href.clear()
+    href = app.stylesheet_href()
+    assert re.fullmatch(r"app/static/supernova\.css\?v=[0-9a-f]{12}", href)
+    assert sorted(p.name for p in app.STATIC_DIR.iterdir()) == before
+
+    monkeypatch.setattr(app, "STYLESHEET_PATH", tmp_path / "supernova.css")
+    app.stylesheet_href.clear()
+    assert app.stylesheet_href() is None
+    assert not any(tmp_path.iterdir())
+    app.stylesheet_href.clear()
+
+
+def test_inline_css_without_static_serving_has_no_font_urls():
+    assert "url(" not in app.build_stylesheet(None)
+    assert "url('app/static/fonts/" in app.build_stylesheet("app/static/")
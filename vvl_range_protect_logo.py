@@ -1,1386 +1,3944 @@
-"""
-Supernova Range Suite — tracking allenamento (range, gioco corto, putting).
-UI mobile-first, tema bianco/oro, persistenza Google Sheets. Nessun export PDF.
-"""
-
-from __future__ import annotations
-
-import datetime
-import time
-from typing import Any
-
-import numpy as np
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import streamlit as st
-
-try:
-    from streamlit_gsheets_connection import GSheetsConnection
-except ImportError:  # pragma: no cover
-    from streamlit_gsheets import GSheetsConnection  # type: ignore
-
-# =============================================================================
-# Config pagina
-# =============================================================================
-st.set_page_config(
-    page_title="Supernova Range Suite",
-    page_icon="⛳",
-    layout="wide",
-    initial_sidebar_state="collapsed",
-)
-
-st.markdown(f"""
-    <style>
-    #MainMenu {{visibility: hidden;}} footer {{visibility: hidden;}} header {{visibility: hidden;}}
-    .stDeployButton {{display:none;}}
-    [data-testid="stToolbar"] {{visibility: hidden !important;}}
-    .stApp {{background: linear-gradient(180deg, #FFFFFF 0%, #FFFBEF 75%, #F8EFCF 100%);}}
-    </style>
-    """, unsafe_allow_html=True)
-
-
-GOLD = "#C9A227"
-GOLD_LIGHT = "#E8D48A"
-GOLD_DARK = "#7A5B12"
-WHITE = "#FFFFFF"
-OFF_WHITE = "#F8F7F4"
-TEXT = "#1E2430"
-MUTED = "#596174"
-ACCENT_BLUE = "#2F6DF6"
-ACCENT_BLUE_SOFT = "#EAF0FF"
-SUCCESS_GREEN = "#17A673"
-CARD_BG = "#FFFFFF"
-CARD_BORDER = "#E7EAF1"
-
-PASSWORD_DEFAULT = "supernova.analytics"
-
-CATEGORIES = {
-    "RANGE": "Gioco lungo / Range",
-    "SHORT": "Gioco corto (<50 m)",
-    "PUTT": "Putting",
-}
-
-# Schema colonne foglio (ordine stabile per concat/update)
-DATA_COLUMNS = [
-    "User",
-    "Date",
-    "SessionName",
-    "Time",
-    "Category",
-    "Club",
-    "Impact",
-    "Curvature",
-    "Trajectory",
-    "Lie_Start",
-    "Lie_End",
-    "Direction_LR",
-    "Proximity_Lateral_m",
-    "Proximity_Depth_m",
-    "Start_Dist_m",
-    "End_Dist_m",
-    "Hole_Dist_Start_m",
-    "Hole_Dist_End_m",
-    "Lie_Long",
-    "Rating",
-    "Mental_Reaction",
-    "Strokes_Gained",
-]
-
-LONG_IMPACT = ["Centro", "Punta", "Tacco", "Shank", "Top", "Flappa"]
-LONG_CURVE = ["Dritta", "Fade", "Draw", "Slice", "Hook", "Push", "Pull"]
-LONG_DIR = ["Esattamente in linea", "A destra del bersaglio", "A sinistra del bersaglio"]
-
-SHORT_IMPACT = ["Dritta", "Punta", "Tacco", "Shank", "Top", "Flappa"]
-SHORT_LIE_START = ["Fairway", "Rough", "Bunker"]
-SHORT_LIE_END = ["Fairway", "Rough", "Bunker", "Green"]
-SHORT_DIR = ["Esattamente in linea", "A destra della buca", "A sinistra della buca"]
-
-PUTT_IMPACT = ["Centro", "Punta", "Tacco", "Flappa"]
-PUTT_TRAJ = ["Dritta", "Pull", "Push"]
-
-MENTAL_OPTIONS = [
-    "Molto negativa",
-    "Negativa",
-    "Neutra",
-    "Positiva",
-    "Molto positiva",
-]
-
-CLUBS_LONG = [
-    "DR",
-    "3W",
-    "5W",
-    "7W",
-    "3H",
-    "3i",
-    "4i",
-    "5i",
-    "6i",
-    "7i",
-    "8i",
-    "9i",
-    "PW",
-    "AW",
-    "GW",
-    "SW",
-    "LW",
-]
-CLUBS_SHORT = ["LW", "SW", "GW", "AW", "PW", "9i", "8i", "7i"]
-
-PERIOD_LABELS = [
-    "Sessione corrente",
-    "Ultimi 7 giorni",
-    "Ultimo mese",
-    "Ultimi 6 mesi",
-    "Ultimo anno",
-    "Lifelong",
-]
-
-
-def inject_styles() -> None:
-    st.markdown(
-        f"""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800&family=Manrope:wght@600;700;800&display=swap');
-    #MainMenu {{visibility: hidden; height: 0;}}
-    footer {{visibility: hidden; height: 0;}}
-    header [data-testid="stHeader"] {{background: transparent;}}
-    html, body, [class*="css"] {{
-        font-family: 'Inter', sans-serif;
-        color: {TEXT};
-    }}
-    .stApp {{
-        background:
-            radial-gradient(circle at 85% 8%, #dce8ff 0%, rgba(220,232,255,0.0) 28%),
-            radial-gradient(circle at 10% -5%, #f7ebc8 0%, rgba(247,235,200,0.0) 32%),
-            linear-gradient(180deg, #f5f7fb 0%, #ffffff 46%);
-        color: {TEXT};
-    }}
-    .block-container {{
-        padding-top: 0.75rem;
-        padding-bottom: 4rem;
-        max-width: 860px;
-    }}
-    h1, h2, h3 {{
-        color: {TEXT};
-        font-family: 'Manrope', sans-serif;
-        font-weight: 800;
-        letter-spacing: -0.01em;
-    }}
-    h3 {{
-        margin-top: 0.25rem;
-    }}
-    p, span, label {{
-        color: {TEXT};
-    }}
-    [data-testid="stTabs"] button[role="tab"] {{
-        font-size: 0.98rem !important;
-        font-weight: 700 !important;
-        border-radius: 12px !important;
-        color: {MUTED} !important;
-        border: 1px solid transparent !important;
-        background: transparent !important;
-    }}
-    [data-testid="stTabs"] button[aria-selected="true"] {{
-        color: {TEXT} !important;
-        border-color: {CARD_BORDER} !important;
-        background: {WHITE} !important;
-        box-shadow: 0 6px 20px rgba(30, 36, 48, 0.08) !important;
-    }}
-    div[data-testid="stSelectbox"], div[data-testid="stTextInput"], div[data-testid="stNumberInput"] {{
-        background: transparent;
-    }}
-    div[data-baseweb="select"] > div,
-    .stTextInput input,
-    .stNumberInput input {{
-        border-radius: 12px !important;
-        border: 1px solid #d9dee8 !important;
-        background: #fff !important;
-        min-height: 2.7rem !important;
-    }}
-    .stTextInput input:focus,
-    .stNumberInput input:focus {{
-        border-color: {ACCENT_BLUE} !important;
-        box-shadow: 0 0 0 2px rgba(47, 109, 246, 0.13) !important;
-    }}
-    [data-testid="stMetric"] {{
-        background: {CARD_BG};
-        border: 1px solid {CARD_BORDER};
-        border-radius: 14px;
-        padding: 8px 10px;
-        box-shadow: 0 6px 18px rgba(28, 40, 64, 0.06);
-    }}
-    [data-testid="stMetricLabel"] {{
-        color: {MUTED} !important;
-        font-weight: 600 !important;
-    }}
-    [data-testid="stMetricValue"] {{
-        color: {TEXT} !important;
-        font-family: 'Manrope', sans-serif !important;
-        font-weight: 800 !important;
-    }}
-    div[data-testid="stHorizontalBlock"] button {{
-        min-height: 3.15rem !important;
-        font-size: 1rem !important;
-        border-radius: 14px !important;
-        border: 1px solid #d7ddeb !important;
-        background: {WHITE} !important;
-        color: {TEXT} !important;
-        font-weight: 700 !important;
-        transition: all .14s ease-in-out !important;
-    }}
-    div[data-testid="stHorizontalBlock"] button:hover {{
-        border-color: {ACCENT_BLUE} !important;
-        box-shadow: 0 8px 16px rgba(47,109,246,0.15) !important;
-        transform: translateY(-1px);
-    }}
-    .sn-big-btn > button {{
-        width: 100%;
-        min-height: 3.5rem;
-        font-size: 1.05rem;
-        border-radius: 16px;
-        background: {WHITE};
-        border: 1px solid #d7ddeb;
-        font-weight: 700;
-    }}
-    .stButton > button[kind="primary"], .stDownloadButton > button {{
-        border-radius: 14px !important;
-        border: 0 !important;
-        color: #fff !important;
-        font-weight: 700 !important;
-        background: linear-gradient(135deg, {ACCENT_BLUE}, #5f89f8) !important;
-        box-shadow: 0 8px 18px rgba(47,109,246,0.28) !important;
-    }}
-    .stButton > button[kind="primary"]:hover, .stDownloadButton > button:hover {{
-        filter: brightness(1.04);
-        transform: translateY(-1px);
-    }}
-    .stRadio > div {{
-        background: {CARD_BG};
-        border: 1px solid {CARD_BORDER};
-        border-radius: 14px;
-        padding: 8px 10px;
-        box-shadow: 0 4px 14px rgba(28,40,64,0.05);
-    }}
-    .stCaption {{
-        color: {MUTED} !important;
-    }}
-    .sn-footer {{
-        text-align: center;
-        color: {MUTED};
-        font-size: 0.82rem;
-        margin-top: 2rem;
-        padding: 0.8rem;
-        border-top: 1px solid #e6eaf2;
-    }}
-    .sn-logo-caption {{
-        font-style: italic;
-        color: {MUTED};
-        font-weight: 600;
-        font-size: 0.9rem;
-        margin: 0;
-    }}
-    [data-testid="stSidebar"] {{
-        background: linear-gradient(180deg, #f7f8fc, #fdfefe);
-        border-right: 1px solid #e8ecf3;
-    }}
-    [data-testid="stSidebar"] .block-container {{
-        padding-top: 1rem;
-    }}
-    .sn-hero {{
-        background: linear-gradient(122deg, #ffffff, #f8fbff);
-        border: 1px solid {CARD_BORDER};
-        border-radius: 18px;
-        padding: 14px 16px;
-        margin: 8px 0 16px 0;
-        box-shadow: 0 12px 24px rgba(33, 44, 68, 0.08);
-    }}
-    .sn-hero-title {{
-        font-size: 1.08rem;
-        font-weight: 800;
-        color: {TEXT};
-        margin-bottom: 4px;
-    }}
-    .sn-hero-sub {{
-        color: {MUTED};
-        font-size: 0.9rem;
-        margin: 0;
-    }}
-    .sn-chip {{
-        display: inline-block;
-        background: {ACCENT_BLUE_SOFT};
-        border: 1px solid #cddaff;
-        border-radius: 999px;
-        padding: 4px 10px;
-        margin-right: 6px;
-        margin-top: 6px;
-        color: #355ac6;
-        font-size: 0.8rem;
-        font-weight: 700;
-    }}
-    .sn-panel {{
-        background: {CARD_BG};
-        border: 1px solid {CARD_BORDER};
-        border-radius: 16px;
-        padding: 12px 14px;
-        margin-bottom: 12px;
-        box-shadow: 0 8px 18px rgba(29, 41, 65, 0.06);
-    }}
-    .sn-panel-title {{
-        font-family: 'Manrope', sans-serif;
-        font-size: 0.98rem;
-        color: {TEXT};
-        font-weight: 800;
-        margin-bottom: 2px;
-    }}
-    .sn-panel-sub {{
-        color: {MUTED};
-        font-size: 0.86rem;
-        margin: 0;
-    }}
-</style>
-""",
-        unsafe_allow_html=True,
-    )
-
-
-def brand_header(title: str | None = None) -> None:
-    c1, c2 = st.columns([1, 3])
-    with c1:
-        try:
-            st.image("logo.png", use_container_width=True)
-        except Exception:
-            st.markdown(
-                f"<div style='font-size:1.6rem;font-weight:800;color:{GOLD};'>SUPERNOVA</div>",
-                unsafe_allow_html=True,
-            )
-    with c2:
-        if title:
-            st.markdown(f"### {title}")
-        st.markdown(
-            "<p class='sn-logo-caption'>Range Data Suite · Data over talent</p>",
-            unsafe_allow_html=True,
-        )
-
-
-def brand_footer() -> None:
-    st.markdown(
-        "<div class='sn-footer'>Powered by Supernova Sport Science</div>",
-        unsafe_allow_html=True,
-    )
-
-
-def render_hero(title: str, subtitle: str, chips: list[str] | None = None) -> None:
-    chips_html = ""
-    if chips:
-        chips_html = "".join([f"<span class='sn-chip'>{c}</span>" for c in chips])
-    st.markdown(
-        (
-            "<div class='sn-hero'>"
-            f"<div class='sn-hero-title'>{title}</div>"
-            f"<p class='sn-hero-sub'>{subtitle}</p>"
-            f"{chips_html}"
-            "</div>"
-        ),
-        unsafe_allow_html=True,
-    )
-
-
-def render_panel(title: str, subtitle: str) -> None:
-    st.markdown(
-        (
-            "<div class='sn-panel'>"
-            f"<div class='sn-panel-title'>{title}</div>"
-            f"<p class='sn-panel-sub'>{subtitle}</p>"
-            "</div>"
-        ),
-        unsafe_allow_html=True,
-    )
-
-
-# =============================================================================
-# Strokes gained (modello semplificato da practice — coerente tra settori)
-# =============================================================================
-def _interp(x: float, xs: list[float], ys: list[float]) -> float:
-    if x <= xs[0]:
-        return ys[0]
-    if x >= xs[-1]:
-        return ys[-1]
-    for i in range(len(xs) - 1):
-        if xs[i] <= x <= xs[i + 1]:
-            t = (x - xs[i]) / (xs[i + 1] - xs[i])
-            return ys[i] + t * (ys[i + 1] - ys[i])
-    return ys[-1]
-
-
-def expected_putts(distance_m: float) -> float:
-    """Colpi attesi PGA-style (approssimazione) da distanza in metri."""
-    if distance_m <= 0:
-        return 0.0
-    xs = [0.5, 1, 1.5, 2, 3, 4, 5, 6, 8, 10, 12, 15, 20, 25, 30]
-    ys = [1.02, 1.06, 1.10, 1.15, 1.23, 1.30, 1.38, 1.45, 1.58, 1.72, 1.85, 2.05, 2.25, 2.42, 2.55]
-    return float(_interp(distance_m, xs, ys))
-
-
-def expected_short_hole(dist_m: float, lie: str) -> float:
-    """Colpi attesi fino alla buca dal gioco corto (non green)."""
-    if dist_m <= 0:
-        return 0.0
-    lie_adj = {"Fairway": 0.0, "Rough": 0.18, "Bunker": 0.55, "Green": 0.0}
-    base = 2.08 + (dist_m / 45.0) * 0.95
-    return float(base + lie_adj.get(lie, 0.0))
-
-
-def expected_long_hole(dist_m: float, from_tee: bool) -> float:
-    """Approccio / tee: colpi attesi verso la buca prima/dopo il colpo."""
-    if dist_m <= 0:
-        return 0.0
-    if from_tee:
-        xs = [120, 160, 200, 240, 280, 320, 380, 440]
-        ys = [3.05, 3.25, 3.45, 3.62, 3.78, 3.92, 4.08, 4.22]
-        return float(_interp(dist_m, xs, ys))
-    xs = [30, 60, 90, 120, 150, 180, 210]
-    ys = [2.35, 2.72, 3.02, 3.28, 3.48, 3.65, 3.78]
-    return float(_interp(dist_m, xs, ys))
-
-
-def compute_sg_putt(start_m: float, end_m: float) -> float:
-    exp_before = expected_putts(start_m)
-    exp_after = expected_putts(end_m)
-    return float(exp_before - exp_after - 1.0)
-
-
-def compute_sg_short(start_m: float, end_m: float, lie_s: str, lie_e: str) -> float:
-    def exp_at(d: float, lie: str) -> float:
-        if lie == "Green":
-            return expected_putts(d)
-        return expected_short_hole(d, lie)
-
-    exp_before = exp_at(start_m, lie_s)
-    exp_after = exp_at(end_m, lie_e)
-    return float(exp_before - exp_after - 1.0)
-
-
-def compute_sg_long(start_before_m: float, start_after_m: float, from_tee: bool, lie_after: str) -> float:
-    exp_before = expected_long_hole(start_before_m, from_tee)
-    use_fairway = lie_after.lower() == "fairway"
-    exp_after = expected_long_hole(start_after_m, from_tee=False) if use_fairway else expected_short_hole(start_after_m, lie_after)
-    return float(exp_before - exp_after - 1.0)
-
-
-# =============================================================================
-# Dati
-# =============================================================================
-@st.cache_data(ttl=10)
-def load_data() -> pd.DataFrame:
-    try:
-        conn = st.connection("gsheets", type=GSheetsConnection)
-        df = conn.read(ttl=0)
-        if df is None or df.empty:
-            return pd.DataFrame(columns=DATA_COLUMNS)
-        for c in DATA_COLUMNS:
-            if c not in df.columns:
-                df[c] = np.nan
-        df["Date"] = pd.to_datetime(df["Date"], errors="coerce").dt.date
-        for num in [
-            "Proximity_Lateral_m",
-            "Proximity_Depth_m",
-            "Start_Dist_m",
-            "End_Dist_m",
-            "Hole_Dist_Start_m",
-            "Hole_Dist_End_m",
-            "Rating",
-            "Strokes_Gained",
-        ]:
-            df[num] = pd.to_numeric(df[num], errors="coerce")
-        return df[DATA_COLUMNS]
-    except Exception:
-        return pd.DataFrame(columns=DATA_COLUMNS)
-
-
-def align_dataframe(df: pd.DataFrame) -> pd.DataFrame:
-    out = df.copy()
-    for c in DATA_COLUMNS:
-        if c not in out.columns:
-            out[c] = np.nan
-    return out[DATA_COLUMNS]
-
-
-def save_shot(row: dict[str, Any]) -> None:
-    conn = st.connection("gsheets", type=GSheetsConnection)
-    existing = load_data()
-    new = pd.DataFrame([row])
-    merged = align_dataframe(pd.concat([existing, new], ignore_index=True))
-    conn.update(data=merged)
-    st.cache_data.clear()
-
-
-# =============================================================================
-# Splash & login
-# =============================================================================
-def run_splash_sequence() -> None:
-    holder = st.empty()
-    slides = [
-        (3.0, "logo", ""),
-        (3.0, "text", "The first…"),
-        (3.0, "text", "the easiest…"),
-        (3.0, "text", "the original RANGE DATA SUITE"),
-    ]
-    for dur, kind, msg in slides:
-        with holder.container():
-            st.markdown("<br><br>", unsafe_allow_html=True)
-            cc1, cc2, cc3 = st.columns([1, 3, 1])
-            with cc2:
-                if kind == "logo":
-                    try:
-                        st.image("logo.png", use_container_width=True)
-                    except Exception:
-                        st.markdown(
-                            f"<h1 style='text-align:center;color:{GOLD};'>SUPERNOVA</h1>",
-                            unsafe_allow_html=True,
-                        )
-                    st.markdown(
-                        f"<p style='text-align:center;color:{MUTED};'>Range Data Suite</p>",
-                        unsafe_allow_html=True,
-                    )
-                else:
-                    st.markdown(
-                        f"<h2 style='text-align:center;color:{GOLD_DARK};margin-top:4rem;'>{msg}</h2>",
-                        unsafe_allow_html=True,
-                    )
-        time.sleep(dur)
-    holder.empty()
-
-
-def login_screen() -> None:
-    brand_header("Accesso")
-    st.caption("Inserisci le credenziali per salvare i tuoi colpi sul foglio collegato.")
-    u = st.text_input("Username / ID atleta", key="login_user").strip()
-    p = st.text_input("Password", type="password", key="login_pass")
-    privacy = st.checkbox(
-        "Ho letto e accetto l'informativa privacy e il trattamento dei dati.",
-        key="privacy_ok",
-    )
-    if st.button("Entra nella suite", type="primary", use_container_width=True):
-        if not privacy:
-            st.error("È necessario accettare la privacy policy.")
-            return
-        if not u:
-            st.error("Inserisci uno username.")
-            return
-        pwd_ok = p == PASSWORD_DEFAULT
-        env_p = None
-        try:
-            env_p = st.secrets.get("APP_PASSWORD")
-        except Exception:
-            env_p = None
-        if env_p:
-            pwd_ok = pwd_ok or (p == str(env_p))
-        if pwd_ok:
-            st.session_state["logged_in"] = True
-            st.session_state["user"] = u.upper()
-            st.rerun()
-        else:
-            st.error("Credenziali non valide.")
-    brand_footer()
-    st.stop()
-
-
-# =============================================================================
-# Helpers UI wizard
-# =============================================================================
-def reset_wizard() -> None:
-    for k in list(st.session_state.keys()):
-        if k.startswith("wz_"):
-            del st.session_state[k]
-    st.session_state["wz_cat"] = None
-    st.session_state["wz_step"] = 0
-
-
-def lat_sign(direction: str, lateral_abs: float) -> float:
-    if direction.startswith("A destra"):
-        return float(abs(lateral_abs))
-    if direction.startswith("A sinistra"):
-        return -float(abs(lateral_abs))
-    return 0.0
-
-
-def depth_sign(depth_m: float, label: str) -> float:
-    """Profondità: positivo = lungo, negativo = corto (optional convention)."""
-    if label == "Corto del bersaglio":
-        return -abs(depth_m)
-    if label == "Lungo del bersaglio":
-        return abs(depth_m)
-    return 0.0
-
-
-def filter_period(df: pd.DataFrame, session_name: str, period: str) -> pd.DataFrame:
-    if df.empty:
-        return df
-    d = df.copy()
-    today = datetime.date.today()
-    if period == "Sessione corrente":
-        return d[d["SessionName"] == session_name]
-    if period == "Ultimi 7 giorni":
-        return d[d["Date"] >= today - datetime.timedelta(days=7)]
-    if period == "Ultimo mese":
-        return d[d["Date"] >= today - datetime.timedelta(days=30)]
-    if period == "Ultimi 6 mesi":
-        return d[d["Date"] >= today - datetime.timedelta(days=182)]
-    if period == "Ultimo anno":
-        return d[d["Date"] >= today - datetime.timedelta(days=365)]
-    return d
-
-
-def plot_pie(df: pd.DataFrame, column: str, title: str, legend_help: str) -> None:
-    if df.empty or column not in df.columns:
-        st.info("Nessun dato per questo grafico.")
-        return
-    if column == "Rating":
-        s = pd.to_numeric(df[column], errors="coerce").dropna().astype(int).astype(str)
-    else:
-        s = df[column].astype(str)
-    s = s.replace("nan", "(vuoto)").replace("", "(vuoto)")
-    vc = s.value_counts()
-    if vc.empty:
-        st.info("Nessuna categoria disponibile.")
-        return
-    fig = px.pie(
-        values=vc.values,
-        names=vc.index,
-        title=title,
-        hole=0.35,
-        color_discrete_sequence=px.colors.sequential.YlOrBr,
-    )
-    fig.update_traces(textposition="inside", textinfo="percent+label")
-    fig.update_layout(
-        legend_title_text="Legenda",
-        font=dict(color=TEXT),
-        title=dict(font=dict(size=18, color=GOLD_DARK)),
-        margin=dict(t=48, b=24, l=24, r=24),
-    )
-    st.plotly_chart(fig, use_container_width=True)
-    st.caption(legend_help)
-
-
-def plot_dispersion(df: pd.DataFrame, title: str) -> None:
-    if df.empty:
-        return
-    d = df.copy()
-    d["x_lateral_m"] = pd.to_numeric(d["Proximity_Lateral_m"], errors="coerce")
-    d["y_depth_m"] = pd.to_numeric(d["Proximity_Depth_m"], errors="coerce")
-    d = d.dropna(subset=["x_lateral_m", "y_depth_m"])
-    if d.empty:
-        st.info("Aggiungi errore laterale e profondità per vedere la dispersione dall’alto.")
-        return
-    fig = px.scatter(
-        d,
-        x="x_lateral_m",
-        y="y_depth_m",
-        color="Club",
-        hover_data=["Impact", "Rating", "Date"],
-        title=title,
-        labels={
-            "x_lateral_m": "Errore laterale (m): sinistra ← 0 → destra",
-            "y_depth_m": "Errore in profondità (m): indietro ← 0 → avanti",
-        },
-    )
-    fig.add_vline(x=0, line_dash="dash", line_color=GOLD)
-    fig.add_hline(y=0, line_dash="dash", line_color=GOLD)
-    fig.update_layout(
-        legend_title_text="Legenda",
-        font=dict(color=TEXT),
-    )
-    st.plotly_chart(fig, use_container_width=True)
-    st.caption(
-        "Ogni punto è un colpo visto dall’alto: incrocio delle linee = bersaglio. "
-        "L’asse orizzontale è l’errore a sinistra/destra, quello verticale corto/lungo."
-    )
-
-
-def putting_make_table(df_putt: pd.DataFrame) -> None:
-    """Bucket da 15 m in giù ogni 2 m."""
-    if df_putt.empty:
-        st.info("Nessun putt nel periodo.")
-        return
-    d = df_putt.copy()
-    d["sd"] = pd.to_numeric(d["Start_Dist_m"], errors="coerce")
-    d["ed"] = pd.to_numeric(d["End_Dist_m"], errors="coerce")
-    d = d.dropna(subset=["sd"])
-    rows = []
-    for hi in range(15, 0, -2):
-        lo = max(hi - 2, 0)
-        sub = d[(d["sd"] > lo) & (d["sd"] <= hi)]
-        n = len(sub)
-        made = int((sub["ed"].fillna(999) <= 0).sum())
-        pct = (made / n * 100.0) if n else 0.0
-        rows.append({"Fascia di partenza": f"{lo}–{hi} m", "Putt": n, "Realizzati": made, "% Made": pct})
-    out = pd.DataFrame(rows)
-    st.markdown("#### Tabella realizzazione putt per distanza di partenza")
-    st.caption(
-        "Percentuale di putt chiusi in buca al primo tentativo (distanza finale = 0 m), "
-        "raggruppati per ampiezza di 2 metri fino a 15 m."
-    )
-    st.dataframe(
-        out.style.format({"% Made": "{:.1f}%"}),
-        use_container_width=True,
-        hide_index=True,
-    )
-
-
-def sg_summary_table(df: pd.DataFrame, cat_key: str) -> None:
-    sub = df[df["Category"] == cat_key]
-    if sub.empty:
-        st.info("Nessuno strokes gained: dati assenti per questo settore.")
-        return
-    sg = pd.to_numeric(sub["Strokes_Gained"], errors="coerce").dropna()
-    if sg.empty:
-        st.info("Colonna strokes gained vuota per questo periodo.")
-        return
-    st.markdown("#### Riepilogo Strokes Gained (modello practice)")
-    st.caption(
-        "Valori positivi indicano un colpo migliore della media di riferimento usata dal modello "
-        "(approssimazione didattica, non ufficiale PGA)."
-    )
-    c1, c2, c3, c4 = st.columns(4)
-    c1.metric("Media SG", f"{sg.mean():+.3f}")
-    c2.metric("Totale SG", f"{sg.sum():+.3f}")
-    c3.metric("Colpi", f"{len(sg)}")
-    c4.metric("Migliore", f"{sg.max():+.3f}")
-    hist = px.histogram(
-        sg,
-        nbins=20,
-        title="Distribuzione SG colpo per colpo",
-        labels={"value": "Strokes gained per colpo", "count": "Numero di colpi"},
-        color_discrete_sequence=[GOLD],
-    )
-    hist.update_layout(showlegend=False)
-    st.plotly_chart(hist, use_container_width=True)
-
-
-def satisfaction_breakdown(df: pd.DataFrame, cat_key: str) -> None:
-    sub = df[df["Category"] == cat_key]
-    if sub.empty:
-        return
-    plot_pie(
-        sub,
-        "Rating",
-        "Distribuzione voto colpo (1–5)",
-        "Legenda: percentuale di colpi per ogni voto di qualità auto-valutata.",
-    )
-    plot_pie(
-        sub,
-        "Mental_Reaction",
-        "Reazione mentale",
-        "Legenda: mix delle reazioni emotive/cognitive dichiarate dopo il colpo.",
-    )
-
-
-def trend_panel(df_sector: pd.DataFrame, sector_label: str) -> None:
-    if df_sector.empty:
-        return
-    d = df_sector.copy()
-    d["Date"] = pd.to_datetime(d["Date"], errors="coerce")
-    d = d.dropna(subset=["Date"])
-    if d.empty:
-        return
-    d["Rating"] = pd.to_numeric(d["Rating"], errors="coerce")
-    d["Strokes_Gained"] = pd.to_numeric(d["Strokes_Gained"], errors="coerce")
-    grp = (
-        d.groupby("Date", as_index=False)
-        .agg(
-            rating_mean=("Rating", "mean"),
-            sg_mean=("Strokes_Gained", "mean"),
-            shots=("Category", "count"),
-        )
-        .sort_values("Date")
-    )
-    st.markdown("#### Trend giornaliero")
-    st.caption(
-        "Linea oro = voto medio; linea scura = strokes gained medio per giorno. "
-        "Serve a capire se la qualità sale o scende nel tempo."
-    )
-    fig = go.Figure()
-    fig.add_trace(
-        go.Scatter(
-            x=grp["Date"],
-            y=grp["rating_mean"],
-            mode="lines+markers",
-            name="Voto medio",
-            line=dict(color=GOLD, width=3),
-        )
-    )
-    fig.add_trace(
-        go.Scatter(
-            x=grp["Date"],
-            y=grp["sg_mean"],
-            mode="lines+markers",
-            name="SG medio",
-            line=dict(color="#5c4a12", width=2),
-            yaxis="y2",
-        )
-    )
-    fig.update_layout(
-        title=f"Andamento performance - {sector_label}",
-        xaxis_title="Data",
-        yaxis=dict(title="Voto medio (1-5)"),
-        yaxis2=dict(title="SG medio", overlaying="y", side="right"),
-        legend_title_text="Legenda",
-        margin=dict(t=48, b=24, l=24, r=24),
-    )
-    st.plotly_chart(fig, use_container_width=True)
-
-
-def club_breakdown_table(df_sector: pd.DataFrame) -> None:
-    d = df_sector.copy()
-    if d.empty:
-        return
-    d["Rating"] = pd.to_numeric(d["Rating"], errors="coerce")
-    d["Strokes_Gained"] = pd.to_numeric(d["Strokes_Gained"], errors="coerce")
-    g = (
-        d.groupby("Club", as_index=False)
-        .agg(
-            Colpi=("Club", "count"),
-            Voto_medio=("Rating", "mean"),
-            SG_medio=("Strokes_Gained", "mean"),
-        )
-        .sort_values(["Colpi", "Voto_medio"], ascending=[False, False])
-    )
-    if g.empty:
-        return
-    st.markdown("#### Ranking bastoni (nel filtro scelto)")
-    st.caption(
-        "Tabella sintetica per bastone: volume, voto medio e strokes gained medio."
-    )
-    st.dataframe(
-        g.style.format({"Voto_medio": "{:.2f}", "SG_medio": "{:+.3f}"}),
-        use_container_width=True,
-        hide_index=True,
-    )
-
-
-# =============================================================================
-# Wizard inserimento colpo
-# =============================================================================
-def wizard_range(session_name: str, user: str) -> None:
-    st.session_state.setdefault("wz_step", 0)
-    step = st.session_state["wz_step"]
-    shot: dict[str, Any] = st.session_state.setdefault("wz_payload", {})
-
-    if step == 0:
-        st.markdown("#### Bastone")
-        cols = st.columns(3)
-        for i, cl in enumerate(CLUBS_LONG):
-            if cols[i % 3].button(cl, key=f"cl{i}"):
-                shot["Club"] = cl
-                st.session_state["wz_step"] = 1
-                st.rerun()
-    elif step == 1:
-        st.markdown("#### Impatto")
-        for opt in LONG_IMPACT:
-            if st.button(opt, key=f"im{opt}", use_container_width=True):
-                shot["Impact"] = opt
-                st.session_state["wz_step"] = 2
-                st.rerun()
-    elif step == 2:
-        st.markdown("#### Curvatura palla")
-        for opt in LONG_CURVE:
-            if st.button(opt, key=f"cv{opt}", use_container_width=True):
-                shot["Curvature"] = opt
-                shot["Trajectory"] = ""
-                st.session_state["wz_step"] = 3
-                st.rerun()
-    elif step == 3:
-        st.markdown("#### Posizione rispetto al bersaglio (linea)")
-        for opt in LONG_DIR:
-            if st.button(opt, key=f"dir{opt}", use_container_width=True):
-                shot["Direction_LR"] = opt
-                st.session_state["wz_step"] = 4
-                st.rerun()
-    elif step == 4:
-        st.markdown("#### Errore laterale (metri assoluti)")
-        lat = st.number_input("Metri a destra/sinistra dal punto mirato", min_value=0.0, step=0.5)
-        if st.button("Conferma errore laterale", use_container_width=True):
-            shot["Proximity_Lateral_m"] = lat_sign(shot["Direction_LR"], lat)
-            st.session_state["wz_step"] = 5
-            st.rerun()
-    elif step == 5:
-        st.markdown("#### Errore in profondità (per mappa dall’alto)")
-        depth_amt = st.number_input("Quanti metri corto/lungo?", min_value=0.0, step=0.5)
-        sense = st.radio("Senso", ["In linea col bersaglio", "Corto del bersaglio", "Lungo del bersaglio"])
-        if st.button("Conferma profondità", use_container_width=True):
-            shot["Proximity_Depth_m"] = depth_sign(depth_amt, sense)
-            st.session_state["wz_step"] = 6
-            st.rerun()
-    elif step == 6:
-        st.markdown("#### Voto colpo (1–5)")
-        cols = st.columns(5)
-        for v in range(1, 6):
-            if cols[v - 1].button(str(v)):
-                shot["Rating"] = v
-                st.session_state["wz_step"] = 7
-                st.rerun()
-    elif step == 7:
-        st.markdown("#### Reazione mentale")
-        for opt in MENTAL_OPTIONS:
-            if st.button(opt, key=f"mn{opt}", use_container_width=True):
-                shot["Mental_Reaction"] = opt
-                st.session_state["wz_step"] = 8
-                st.rerun()
-    elif step == 8:
-        st.markdown("#### Dati per Strokes Gained — gioco lungo")
-        shot["Lie_Long"] = st.radio("Lie di partenza", ["Tee", "Fairway"])
-        shot["Hole_Dist_Start_m"] = st.number_input(
-            "Distanza dalla buca prima del colpo (metri)", min_value=0.0, step=5.0
-        )
-        shot["Hole_Dist_End_m"] = st.number_input(
-            "Distanza dalla buca dopo il colpo (metri)", min_value=0.0, step=5.0
-        )
-        lie_after = st.selectbox(
-            "Lie dopo il colpo (per il modello)",
-            ["Fairway", "Rough", "Bunker"],
-        )
-        if st.button("Calcola e salva colpo", type="primary", use_container_width=True):
-            from_tee = shot["Lie_Long"] == "Tee"
-            sg = compute_sg_long(
-                float(shot["Hole_Dist_Start_m"]),
-                float(shot["Hole_Dist_End_m"]),
-                from_tee,
-                lie_after,
-            )
-            row = {
-                "User": user,
-                "Date": datetime.date.today(),
-                "SessionName": session_name,
-                "Time": datetime.datetime.now().strftime("%H:%M"),
-                "Category": "RANGE",
-                "Club": shot.get("Club", ""),
-                "Impact": shot.get("Impact", ""),
-                "Curvature": shot.get("Curvature", ""),
-                "Trajectory": "",
-                "Lie_Start": shot.get("Lie_Long", ""),
-                "Lie_End": lie_after,
-                "Direction_LR": shot.get("Direction_LR", ""),
-                "Proximity_Lateral_m": shot.get("Proximity_Lateral_m", np.nan),
-                "Proximity_Depth_m": shot.get("Proximity_Depth_m", np.nan),
-                "Start_Dist_m": shot.get("Hole_Dist_Start_m", np.nan),
-                "End_Dist_m": shot.get("Hole_Dist_End_m", np.nan),
-                "Hole_Dist_Start_m": shot.get("Hole_Dist_Start_m", np.nan),
-                "Hole_Dist_End_m": shot.get("Hole_Dist_End_m", np.nan),
-                "Lie_Long": shot.get("Lie_Long", ""),
-                "Rating": shot.get("Rating", np.nan),
-                "Mental_Reaction": shot.get("Mental_Reaction", ""),
-                "Strokes_Gained": sg,
-            }
-            save_shot(row)
-            st.success("Colpo RANGE salvato.")
-            reset_wizard()
-            st.rerun()
-    if st.button("Annulla inserimento", key="cancel_r"):
-        reset_wizard()
-        st.rerun()
-
-
-def wizard_short(session_name: str, user: str) -> None:
-    st.session_state.setdefault("wz_step", 0)
-    step = st.session_state["wz_step"]
-    shot: dict[str, Any] = st.session_state.setdefault("wz_payload", {})
-
-    if step == 0:
-        st.markdown("#### Bastone")
-        cols = st.columns(4)
-        for i, cl in enumerate(CLUBS_SHORT):
-            if cols[i % 4].button(cl, key=f"scl{i}"):
-                shot["Club"] = cl
-                st.session_state["wz_step"] = 1
-                st.rerun()
-    elif step == 1:
-        shot["Start_Dist_m"] = st.number_input(
-            "Distanza iniziale dalla buca (metri)", min_value=0.0, max_value=50.0, step=1.0
-        )
-        if st.button("Conferma distanza", use_container_width=True):
-            st.session_state["wz_step"] = 2
-            st.rerun()
-    elif step == 2:
-        st.markdown("#### Lie iniziale")
-        for opt in SHORT_LIE_START:
-            if st.button(opt, key=f"ls{opt}", use_container_width=True):
-                shot["Lie_Start"] = opt
-                st.session_state["wz_step"] = 3
-                st.rerun()
-    elif step == 3:
-        shot["End_Dist_m"] = st.number_input("Distanza finale dalla buca (metri)", min_value=0.0, step=0.5)
-        if st.button("Conferma distanza finale", use_container_width=True):
-            st.session_state["wz_step"] = 4
-            st.rerun()
-    elif step == 4:
-        st.markdown("#### Lie finale")
-        for opt in SHORT_LIE_END:
-            if st.button(opt, key=f"le{opt}", use_container_width=True):
-                shot["Lie_End"] = opt
-                st.session_state["wz_step"] = 5
-                st.rerun()
-    elif step == 5:
-        st.markdown("#### Impatto")
-        for opt in SHORT_IMPACT:
-            if st.button(opt, key=f"sim{opt}", use_container_width=True):
-                shot["Impact"] = opt
-                shot["Curvature"] = ""
-                st.session_state["wz_step"] = 6
-                st.rerun()
-    elif step == 6:
-        st.markdown("#### Direzione rispetto alla buca")
-        for opt in SHORT_DIR:
-            if st.button(opt, key=f"sd{opt}", use_container_width=True):
-                shot["Direction_LR"] = opt
-                st.session_state["wz_step"] = 7
-                st.rerun()
-    elif step == 7:
-        lat = st.number_input("Metri a destra/sinistra dalla buca", min_value=0.0, step=0.5)
-        if st.button("Conferma errore laterale", use_container_width=True):
-            shot["Proximity_Lateral_m"] = lat_sign(shot["Direction_LR"], lat)
-            st.session_state["wz_step"] = 8
-            st.rerun()
-    elif step == 8:
-        depth_amt = st.number_input("Metri corto/lungo rispetto alla buca", min_value=0.0, step=0.5)
-        sense = st.radio("Senso", ["In linea", "Corto", "Lungo"])
-        conv = {"In linea": "In linea col bersaglio", "Corto": "Corto del bersaglio", "Lungo": "Lungo del bersaglio"}
-        if st.button("Conferma profondità", use_container_width=True):
-            shot["Proximity_Depth_m"] = depth_sign(depth_amt, conv[sense])
-            st.session_state["wz_step"] = 9
-            st.rerun()
-    elif step == 9:
-        st.markdown("#### Voto (1–5)")
-        cols = st.columns(5)
-        for v in range(1, 6):
-            if cols[v - 1].button(str(v), key=f"sv{v}"):
-                shot["Rating"] = v
-                st.session_state["wz_step"] = 10
-                st.rerun()
-    elif step == 10:
-        st.markdown("#### Reazione mentale")
-        for opt in MENTAL_OPTIONS:
-            if st.button(opt, key=f"smn{opt}", use_container_width=True):
-                shot["Mental_Reaction"] = opt
-                st.session_state["wz_step"] = 11
-                st.rerun()
-    elif step == 11:
-        st.markdown("#### Strokes gained (usa distanze e lie già inseriti)")
-        if st.button("Calcola e salva colpo", type="primary", use_container_width=True):
-            sg = compute_sg_short(
-                float(shot["Start_Dist_m"]),
-                float(shot["End_Dist_m"]),
-                str(shot["Lie_Start"]),
-                str(shot["Lie_End"]),
-            )
-            row = {
-                "User": user,
-                "Date": datetime.date.today(),
-                "SessionName": session_name,
-                "Time": datetime.datetime.now().strftime("%H:%M"),
-                "Category": "SHORT",
-                "Club": shot.get("Club", ""),
-                "Impact": shot.get("Impact", ""),
-                "Curvature": "",
-                "Trajectory": "",
-                "Lie_Start": shot.get("Lie_Start", ""),
-                "Lie_End": shot.get("Lie_End", ""),
-                "Direction_LR": shot.get("Direction_LR", ""),
-                "Proximity_Lateral_m": shot.get("Proximity_Lateral_m", np.nan),
-                "Proximity_Depth_m": shot.get("Proximity_Depth_m", np.nan),
-                "Start_Dist_m": shot.get("Start_Dist_m", np.nan),
-                "End_Dist_m": shot.get("End_Dist_m", np.nan),
-                "Hole_Dist_Start_m": shot.get("Start_Dist_m", np.nan),
-                "Hole_Dist_End_m": shot.get("End_Dist_m", np.nan),
-                "Lie_Long": "",
-                "Rating": shot.get("Rating", np.nan),
-                "Mental_Reaction": shot.get("Mental_Reaction", ""),
-                "Strokes_Gained": sg,
-            }
-            save_shot(row)
-            st.success("Gioco corto salvato.")
-            reset_wizard()
-            st.rerun()
-    if st.button("Annulla inserimento", key="cancel_s"):
-        reset_wizard()
-        st.rerun()
-
-
-def wizard_putt(session_name: str, user: str) -> None:
-    st.session_state.setdefault("wz_step", 0)
-    step = st.session_state["wz_step"]
-    shot: dict[str, Any] = st.session_state.setdefault("wz_payload", {})
-
-    if step == 0:
-        shot["Start_Dist_m"] = st.number_input(
-            "Distanza iniziale dalla buca (metri)", min_value=0.0, step=0.25
-        )
-        if st.button("Avanti", use_container_width=True):
-            st.session_state["wz_step"] = 1
-            st.rerun()
-    elif step == 1:
-        shot["End_Dist_m"] = st.number_input(
-            "Distanza finale (0 se in buca)", min_value=0.0, step=0.1
-        )
-        if st.button("Conferma distanze", use_container_width=True):
-            st.session_state["wz_step"] = 2
-            st.rerun()
-    elif step == 2:
-        st.markdown("#### Impatto sulla faccia")
-        for opt in PUTT_IMPACT:
-            if st.button(opt, key=f"pi{opt}", use_container_width=True):
-                shot["Impact"] = opt
-                st.session_state["wz_step"] = 3
-                st.rerun()
-    elif step == 3:
-        st.markdown("#### Traiettoria")
-        for opt in PUTT_TRAJ:
-            if st.button(opt, key=f"pt{opt}", use_container_width=True):
-                shot["Trajectory"] = opt
-                shot["Curvature"] = opt
-                st.session_state["wz_step"] = 4
-                st.rerun()
-    elif step == 4:
-        st.markdown("#### Voto (1–5)")
-        cols = st.columns(5)
-        for v in range(1, 6):
-            if cols[v - 1].button(str(v), key=f"pv{v}"):
-                shot["Rating"] = v
-                st.session_state["wz_step"] = 5
-                st.rerun()
-    elif step == 5:
-        st.markdown("#### Reazione mentale")
-        for opt in MENTAL_OPTIONS:
-            if st.button(opt, key=f"pmn{opt}", use_container_width=True):
-                shot["Mental_Reaction"] = opt
-                st.session_state["wz_step"] = 6
-                st.rerun()
-    elif step == 6:
-        st.markdown("#### Salva putt (strokes gained dal primo putt)")
-        if st.button("Calcola SG e salva", type="primary", use_container_width=True):
-            sg = compute_sg_putt(float(shot["Start_Dist_m"]), float(shot["End_Dist_m"]))
-            row = {
-                "User": user,
-                "Date": datetime.date.today(),
-                "SessionName": session_name,
-                "Time": datetime.datetime.now().strftime("%H:%M"),
-                "Category": "PUTT",
-                "Club": "Putter",
-                "Impact": shot.get("Impact", ""),
-                "Curvature": shot.get("Curvature", ""),
-                "Trajectory": shot.get("Trajectory", ""),
-                "Lie_Start": "Green",
-                "Lie_End": "Green",
-                "Direction_LR": "",
-                "Proximity_Lateral_m": np.nan,
-                "Proximity_Depth_m": np.nan,
-                "Start_Dist_m": shot.get("Start_Dist_m", np.nan),
-                "End_Dist_m": shot.get("End_Dist_m", np.nan),
-                "Hole_Dist_Start_m": shot.get("Start_Dist_m", np.nan),
-                "Hole_Dist_End_m": shot.get("End_Dist_m", np.nan),
-                "Lie_Long": "",
-                "Rating": shot.get("Rating", np.nan),
-                "Mental_Reaction": shot.get("Mental_Reaction", ""),
-                "Strokes_Gained": sg,
-            }
-            save_shot(row)
-            st.success("Putt salvato.")
-            reset_wizard()
-            st.rerun()
-    if st.button("Annulla inserimento", key="cancel_p"):
-        reset_wizard()
-        st.rerun()
-
-
-# =============================================================================
-# Review
-# =============================================================================
-def review_panel(user: str, session_name: str) -> None:
-    df_all = load_data()
-    df_u = df_all[df_all["User"] == user]
-    render_hero(
-        "Review performance",
-        "Seleziona settore e periodo per aprire una dashboard completa con grafici, SG e tabelle.",
-        ["Pie charts", "Dispersione", "Strokes Gained", "Trend", "Putting make%"],
-    )
-    st.markdown("### Review — statistiche")
-    render_panel(
-        "Filtro analisi",
-        "Scegli prima periodo e settore. La dashboard sotto si aggiorna in tempo reale.",
-    )
-    period = st.selectbox("Periodo", PERIOD_LABELS, key="rev_period")
-    df_f = filter_period(df_u, session_name, period)
-    sector = st.radio(
-        "Settore",
-        ["RANGE", "SHORT", "PUTT"],
-        format_func=lambda x: CATEGORIES[x],
-        horizontal=True,
-        key="rev_sector",
-    )
-    dsec = df_f[df_f["Category"] == sector]
-    st.caption(
-        f"Utente **{user}** · periodo **{period}** · settore **{CATEGORIES[sector]}** · "
-        f"n = **{len(dsec)}** colpi."
-    )
-
-    if dsec.empty:
-        st.info("Nessun colpo in questo filtro.")
-        brand_footer()
-        return
-
-    m1, m2, m3 = st.columns(3)
-    m1.metric("Colpi registrati", len(dsec))
-    rmean = pd.to_numeric(dsec["Rating"], errors="coerce").mean()
-    m2.metric("Voto medio", f"{rmean:.2f}" if pd.notna(rmean) else "—")
-    sg_series = pd.to_numeric(dsec["Strokes_Gained"], errors="coerce").dropna()
-    m3.metric("SG medio", f"{sg_series.mean():+.3f}" if len(sg_series) else "—")
-
-    sg_summary_table(df_f, sector)
-    trend_panel(dsec, CATEGORIES[sector])
-    club_breakdown_table(dsec)
-
-    if sector == "RANGE":
-        render_panel(
-            "Analisi tecnica range",
-            "Impatti, curvatura, direzione e dispersione per identificare pattern e bias di traiettoria.",
-        )
-        plot_pie(
-            dsec,
-            "Impact",
-            "Tipologia di impatto — percentuali",
-            "Legenda: ripartizione percentuale degli impatti dichiarati.",
-        )
-        plot_pie(
-            dsec,
-            "Curvature",
-            "Curvatura — percentuali",
-            "Legenda: forma di volo predominante nel campione.",
-        )
-        plot_pie(
-            dsec,
-            "Direction_LR",
-            "Tendenza direzionale vs bersaglio",
-            "Legenda: orientamento medio rispetto alla linea di punteria.",
-        )
-        plot_dispersion(dsec, "Dispersione dall’alto — RANGE")
-        satisfaction_breakdown(df_f, "RANGE")
-
-    elif sector == "SHORT":
-        render_panel(
-            "Analisi tecnica gioco corto",
-            "Confronta lie iniziale/finale, contatto e direzione per leggere conversione e qualità d'esecuzione.",
-        )
-        plot_pie(dsec, "Lie_Start", "Lie iniziale", "Legenda: da dove parte la palla più spesso.")
-        plot_pie(dsec, "Lie_End", "Lie finale", "Legenda: dove finisce la palla dopo il colpo.")
-        plot_pie(dsec, "Impact", "Impatto", "Legenda: qualità di contatto dichiarata.")
-        plot_pie(dsec, "Direction_LR", "Linea vs buca", "Legenda: tendenza destra/sinistra.")
-        plot_dispersion(dsec, "Dispersione dall’alto — gioco corto")
-        satisfaction_breakdown(df_f, "SHORT")
-
-    else:
-        render_panel(
-            "Analisi putting",
-            "Contatto faccia, linea e percentuali realizzazione per fascia distanza.",
-        )
-        plot_pie(dsec, "Impact", "Impatto sulla faccia", "Legenda: zona di contatto sul putter.")
-        plot_pie(dsec, "Trajectory", "Traiettoria di rotazione", "Legenda: pull/dritta/push.")
-        putting_make_table(dsec)
-        satisfaction_breakdown(df_f, "PUTT")
-
-    brand_footer()
-
-
-# =============================================================================
-# Main
-# =============================================================================
-def main() -> None:
-    inject_styles()
-
-    if "splash_done" not in st.session_state:
-        run_splash_sequence()
-        st.session_state["splash_done"] = True
-        st.rerun()
-
-    if "logged_in" not in st.session_state:
-        st.session_state["logged_in"] = False
-
-    if not st.session_state["logged_in"]:
-        login_screen()
-        return
-
-    user = str(st.session_state["user"])
-
-    with st.sidebar:
-        brand_header("Profilo")
-        render_panel(
-            "Navigazione",
-            "Passa tra raccolta dati e review analytics. La scelta e' sempre disponibile qui.",
-        )
-        st.write(f"**Atleta:** {user}")
-        st.markdown("### Sezione")
-        page = st.selectbox(
-            "Apri sezione",
-            ["Inserimento dati", "Review"],
-            index=0,
-            key="main_page_sidebar",
-            label_visibility="collapsed",
-        )
-        session_name = st.text_input("Nome sessione / note", value="Sessione Allenamento")
-        st.divider()
-        render_panel(
-            "Sessione attiva",
-            "Il nome sessione viene usato nel filtro 'Sessione corrente' in Review.",
-        )
-        if st.button("Logout / cambia utente", use_container_width=True):
-            st.session_state["logged_in"] = False
-            st.session_state.pop("user", None)
-            st.rerun()
-
-    if page == "Inserimento dati":
-        brand_header("Inserimento rapido")
-        render_hero(
-            "Sessione di raccolta dati",
-            "Input veloce a step singoli con pulsanti grandi, pensato per utilizzo smartphone sul campo pratica.",
-            ["Range", "Short game", "Putting"],
-        )
-        st.session_state.setdefault("wz_cat", None)
-        if st.session_state["wz_cat"] is None:
-            st.markdown("#### Scegli il settore")
-            c1, c2, c3 = st.columns(3)
-            if c1.button("Range\n(gioco lungo)", use_container_width=True):
-                reset_wizard()
-                st.session_state["wz_cat"] = "RANGE"
-                st.rerun()
-            if c2.button("Gioco corto\n(<50 m)", use_container_width=True):
-                reset_wizard()
-                st.session_state["wz_cat"] = "SHORT"
-                st.rerun()
-            if c3.button("Putting", use_container_width=True):
-                reset_wizard()
-                st.session_state["wz_cat"] = "PUTT"
-                st.rerun()
-            brand_footer()
-        else:
-            st.caption(f"Sessione: **{session_name}**")
-            if st.button("Torna alla scelta settore"):
-                reset_wizard()
-                st.session_state["wz_cat"] = None
-                st.rerun()
-            cat = st.session_state["wz_cat"]
-            if cat == "RANGE":
-                wizard_range(session_name, user)
-            elif cat == "SHORT":
-                wizard_short(session_name, user)
-            else:
-                wizard_putt(session_name, user)
-            brand_footer()
-
-    else:
-        brand_header()
-        review_panel(user, session_name)
-
-
-if __name__ == "__main__":
-    main()
-
+"""
+Supernova Range Suite — tracking allenamento (range, gioco corto, putting).
+UI mobile-first, tema bianco/oro, persistenza Google Sheets. Nessun export PDF.
+"""
+
+from __future__ import annotations
+
+import atexit
+import base64
+import contextlib
+import datetime
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import random
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import unicodedata
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+try:
+    from streamlit_gsheets_connection import GSheetsConnection
+except ImportError:  # pragma: no cover
+    from streamlit_gsheets import GSheetsConnection  # type: ignore
+
+# =============================================================================
+# Config pagina
+# =============================================================================
+st.set_page_config(
+    page_title="Supernova Range Suite",
+    page_icon="⛳",
+    layout="wide",
+    initial_sidebar_state="collapsed",
+)
+
+
+GOLD = "#C9A227"
+GOLD_LIGHT = "#E8D48A"
+GOLD_DARK = "#7A5B12"
+WHITE = "#FFFFFF"
+OFF_WHITE = "#F8F7F4"
+TEXT = "#1E2430"
+MUTED = "#596174"
+ACCENT_BLUE = "#2F6DF6"
+ACCENT_BLUE_SOFT = "#EAF0FF"
+SUCCESS_GREEN = "#17A673"
+CARD_BG = "#FFFFFF"
+CARD_BORDER = "#E7EAF1"
+
+PASSWORD_DEFAULT = "supernova.analytics"
+
+CATEGORIES = {
+    "RANGE": "Gioco lungo / Range",
+    "SHORT": "Gioco corto (<50 m)",
+    "PUTT": "Putting",
+}
+
+# Schema colonne foglio (ordine stabile per concat/update)
+DATA_COLUMNS = [
+    "User",
+    "Date",
+    "SessionName",
+    "Time",
+    "Category",
+    "Club",
+    "Impact",
+    "Curvature",
+    "Trajectory",
+    "Lie_Start",
+    "Lie_End",
+    "Direction_LR",
+    "Proximity_Lateral_m",
+    "Proximity_Depth_m",
+    "Start_Dist_m",
+    "End_Dist_m",
+    "Hole_Dist_Start_m",
+    "Hole_Dist_End_m",
+    "Lie_Long",
+    "Rating",
+    "Mental_Reaction",
+    "Strokes_Gained",
+    "SG_Model",
+    "Shot_ID",
+]
+
+LONG_IMPACT = ["Centro", "Punta", "Tacco", "Shank", "Top", "Flappa"]
+LONG_CURVE = ["Dritta", "Fade", "Draw", "Slice", "Hook", "Push", "Pull"]
+LONG_DIR = ["Esattamente in linea", "A destra del bersaglio", "A sinistra del bersaglio"]
+
+SHORT_IMPACT = ["Dritta", "Punta", "Tacco", "Shank", "Top", "Flappa"]
+SHORT_LIE_START = ["Fairway", "Rough", "Bunker"]
+SHORT_LIE_END = ["Fairway", "Rough", "Bunker", "Green"]
+SHORT_DIR = ["Esattamente in linea", "A destra della buca", "A sinistra della buca"]
+
+PUTT_IMPACT = ["Centro", "Punta", "Tacco", "Flappa"]
+PUTT_TRAJ = ["Dritta", "Pull", "Push"]
+
+MENTAL_OPTIONS = [
+    "Molto negativa",
+    "Negativa",
+    "Neutra",
+    "Positiva",
+    "Molto positiva",
+]
+
+CLUBS_LONG = [
+    "DR",
+    "3W",
+    "5W",
+    "7W",
+    "3H",
+    "3i",
+    "4i",
+    "5i",
+    "6i",
+    "7i",
+    "8i",
+    "9i",
+    "PW",
+    "AW",
+    "GW",
+    "SW",
+    "LW",
+]
+CLUBS_SHORT = ["LW", "SW", "GW", "AW", "PW", "9i", "8i", "7i"]
+
+PERIOD_LABELS = [
+    "Sessione corrente",
+    "Ultimi 7 giorni",
+    "Ultimo mese",
+    "Ultimi 6 mesi",
+    "Ultimo anno",
+    "Lifelong",
+]
+# "Sessione corrente" è il nome sessione di chi guarda: non ha senso sugli altri atleti
+COACH_PERIOD_LABELS = [p for p in PERIOD_LABELS if p != "Sessione corrente"]
+
+
+STATIC_DIR = Path(__file__).with_name("static")
+# Foglio di stile generato da build_stylesheet() e versionato con l'app (vedi write_stylesheet)
+STYLESHEET_PATH = STATIC_DIR / "supernova.css"
+
+
+def font_faces(base: str = "") -> str:
+    """@font-face di Inter/Manrope self-hosted in static/fonts (OFL), prima la copia locale.
+
+    ``base`` è il prefisso degli URL dei font rispetto a chi include il CSS.
+    """
+    return f"""
+    @font-face {{
+        font-family: 'Inter';
+        font-style: normal;
+        font-weight: 400;
+        font-display: swap;
+        src: local('Inter'), local('Inter Regular'), url('{base}fonts/Inter-Regular.woff2') format('woff2');
+    }}
+    @font-face {{
+        font-family: 'Inter';
+        font-style: normal;
+        font-weight: 500;
+        font-display: swap;
+        src: local('Inter Medium'), url('{base}fonts/Inter-Medium.woff2') format('woff2');
+    }}
+    @font-face {{
+        font-family: 'Inter';
+        font-style: normal;
+        font-weight: 600;
+        font-display: swap;
+        src: local('Inter SemiBold'), url('{base}fonts/Inter-SemiBold.woff2') format('woff2');
+    }}
+    @font-face {{
+        font-family: 'Inter';
+        font-style: normal;
+        font-weight: 700 800;
+        font-display: swap;
+        src: local('Inter Bold'), url('{base}fonts/Inter-Bold.woff2') format('woff2');
+    }}
+    @font-face {{
+        font-family: 'Manrope';
+        font-style: normal;
+        font-weight: 200 800;
+        font-display: swap;
+        src: url('{base}fonts/Manrope-Variable.woff2') format('woff2');
+    }}
+"""
+
+
+def build_stylesheet(font_base: str | None = "") -> str:
+    """CSS dell'app; con ``font_base=None`` niente @font-face (font locali o di sistema)."""
+    faces = font_faces(font_base) if font_base is not None else ""
+    return faces + f"""
+    #MainMenu {{visibility: hidden; height: 0;}}
+    footer {{visibility: hidden; height: 0;}}
+    header {{visibility: hidden;}}
+    .stDeployButton {{display: none;}}
+    [data-testid="stToolbar"] {{visibility: hidden !important;}}
+    header [data-testid="stHeader"] {{background: transparent;}}
+    html, body, [class*="css"] {{
+        font-family: 'Inter', system-ui, -apple-system, 'Segoe UI', Roboto, sans-serif;
+        color: {TEXT};
+    }}
+    .stApp {{
+        background:
+            radial-gradient(circle at 85% 8%, #dce8ff 0%, rgba(220,232,255,0.0) 28%),
+            radial-gradient(circle at 10% -5%, #f7ebc8 0%, rgba(247,235,200,0.0) 32%),
+            linear-gradient(180deg, #f5f7fb 0%, #ffffff 46%);
+        color: {TEXT};
+    }}
+    .block-container {{
+        padding-top: 0.75rem;
+        padding-bottom: 4rem;
+        max-width: 860px;
+    }}
+    h1, h2, h3 {{
+        color: {TEXT};
+        font-family: 'Manrope', system-ui, -apple-system, 'Segoe UI', Roboto, sans-serif;
+        font-weight: 800;
+        letter-spacing: -0.01em;
+    }}
+    h3 {{
+        margin-top: 0.25rem;
+    }}
+    p, span, label {{
+        color: {TEXT};
+    }}
+    [data-testid="stTabs"] button[role="tab"] {{
+        font-size: 0.98rem !important;
+        font-weight: 700 !important;
+        border-radius: 12px !important;
+        color: {MUTED} !important;
+        border: 1px solid transparent !important;
+        background: transparent !important;
+    }}
+    [data-testid="stTabs"] button[aria-selected="true"] {{
+        color: {TEXT} !important;
+        border-color: {CARD_BORDER} !important;
+        background: {WHITE} !important;
+        box-shadow: 0 6px 20px rgba(30, 36, 48, 0.08) !important;
+    }}
+    div[data-testid="stSelectbox"], div[data-testid="stTextInput"], div[data-testid="stNumberInput"] {{
+        background: transparent;
+    }}
+    div[data-baseweb="select"] > div,
+    .stTextInput input,
+    .stNumberInput input {{
+        border-radius: 12px !important;
+        border: 1px solid #d9dee8 !important;
+        background: #fff !important;
+        min-height: 2.7rem !important;
+    }}
+    .stTextInput input:focus,
+    .stNumberInput input:focus {{
+        border-color: {ACCENT_BLUE} !important;
+        box-shadow: 0 0 0 2px rgba(47, 109, 246, 0.13) !important;
+    }}
+    [data-testid="stMetric"] {{
+        background: {CARD_BG};
+        border: 1px solid {CARD_BORDER};
+        border-radius: 14px;
+        padding: 8px 10px;
+        box-shadow: 0 6px 18px rgba(28, 40, 64, 0.06);
+    }}
+    [data-testid="stMetricLabel"] {{
+        color: {MUTED} !important;
+        font-weight: 600 !important;
+    }}
+    [data-testid="stMetricValue"] {{
+        color: {TEXT} !important;
+        font-family: 'Manrope', system-ui, -apple-system, 'Segoe UI', Roboto, sans-serif !important;
+        font-weight: 800 !important;
+    }}
+    div[data-testid="stHorizontalBlock"] button {{
+        min-height: 3.15rem !important;
+        font-size: 1rem !important;
+        border-radius: 14px !important;
+        border: 1px solid #d7ddeb !important;
+        background: {WHITE} !important;
+        color: {TEXT} !important;
+        font-weight: 700 !important;
+        transition: all .14s ease-in-out !important;
+    }}
+    div[data-testid="stHorizontalBlock"] button:hover {{
+        border-color: {ACCENT_BLUE} !important;
+        box-shadow: 0 8px 16px rgba(47,109,246,0.15) !important;
+        transform: translateY(-1px);
+    }}
+    .sn-big-btn > button {{
+        width: 100%;
+        min-height: 3.5rem;
+        font-size: 1.05rem;
+        border-radius: 16px;
+        background: {WHITE};
+        border: 1px solid #d7ddeb;
+        font-weight: 700;
+    }}
+    .stButton > button[kind="primary"], .stDownloadButton > button {{
+        border-radius: 14px !important;
+        border: 0 !important;
+        color: #fff !important;
+        font-weight: 700 !important;
+        background: linear-gradient(135deg, {ACCENT_BLUE}, #5f89f8) !important;
+        box-shadow: 0 8px 18px rgba(47,109,246,0.28) !important;
+    }}
+    .stButton > button[kind="primary"]:hover, .stDownloadButton > button:hover {{
+        filter: brightness(1.04);
+        transform: translateY(-1px);
+    }}
+    .stRadio > div {{
+        background: {CARD_BG};
+        border: 1px solid {CARD_BORDER};
+        border-radius: 14px;
+        padding: 8px 10px;
+        box-shadow: 0 4px 14px rgba(28,40,64,0.05);
+    }}
+    .stCaption {{
+        color: {MUTED} !important;
+    }}
+    .sn-footer {{
+        text-align: center;
+        color: {MUTED};
+        font-size: 0.82rem;
+        margin-top: 2rem;
+        padding: 0.8rem;
+        border-top: 1px solid #e6eaf2;
+    }}
+    .sn-logo-caption {{
+        font-style: italic;
+        color: {MUTED};
+        font-weight: 600;
+        font-size: 0.9rem;
+        margin: 0;
+    }}
+    [data-testid="stSidebar"] {{
+        background: linear-gradient(180deg, #f7f8fc, #fdfefe);
+        border-right: 1px solid #e8ecf3;
+    }}
+    [data-testid="stSidebar"] .block-container {{
+        padding-top: 1rem;
+    }}
+    .sn-hero {{
+        background: linear-gradient(122deg, #ffffff, #f8fbff);
+        border: 1px solid {CARD_BORDER};
+        border-radius: 18px;
+        padding: 14px 16px;
+        margin: 8px 0 16px 0;
+        box-shadow: 0 12px 24px rgba(33, 44, 68, 0.08);
+    }}
+    .sn-hero-title {{
+        font-size: 1.08rem;
+        font-weight: 800;
+        color: {TEXT};
+        margin-bottom: 4px;
+    }}
+    .sn-hero-sub {{
+        color: {MUTED};
+        font-size: 0.9rem;
+        margin: 0;
+    }}
+    .sn-chip {{
+        display: inline-block;
+        background: {ACCENT_BLUE_SOFT};
+        border: 1px solid #cddaff;
+        border-radius: 999px;
+        padding: 4px 10px;
+        margin-right: 6px;
+        margin-top: 6px;
+        color: #355ac6;
+        font-size: 0.8rem;
+        font-weight: 700;
+    }}
+    .sn-panel {{
+        background: {CARD_BG};
+        border: 1px solid {CARD_BORDER};
+        border-radius: 16px;
+        padding: 12px 14px;
+        margin-bottom: 12px;
+        box-shadow: 0 8px 18px rgba(29, 41, 65, 0.06);
+    }}
+    .sn-panel-title {{
+        font-family: 'Manrope', system-ui, -apple-system, 'Segoe UI', Roboto, sans-serif;
+        font-size: 0.98rem;
+        color: {TEXT};
+        font-weight: 800;
+        margin-bottom: 2px;
+    }}
+    .sn-panel-sub {{
+        color: {MUTED};
+        font-size: 0.86rem;
+        margin: 0;
+    }}
+"""
+
+
+def write_stylesheet() -> Path:
+    """Rigenera static/supernova.css; da lanciare (e committare) dopo ogni modifica al CSS."""
+    STYLESHEET_PATH.write_text(build_stylesheet(), encoding="utf-8")
+    return STYLESHEET_PATH
+
+
+@st.cache_resource
+def stylesheet_href() -> str | None:
+    """Link al foglio di stile versionato, con l'hash del contenuto come parametro di cache.
+
+    L'app non scrive nulla nella propria cartella: se il file manca o non
+    corrisponde a ``build_stylesheet()`` si ripiega sul CSS inline.
+    """
+    css = build_stylesheet()
+    try:
+        if STYLESHEET_PATH.read_text(encoding="utf-8") != css:
+            return None
+    except OSError:
+        return None
+    return f"app/static/{STYLESHEET_PATH.name}?v={hashlib.sha256(css.encode()).hexdigest()[:12]}"
+
+
+def inject_styles() -> None:
+    # Ad ogni rerun parte solo il <link>: il CSS è in cache nel browser grazie all'hash
+    static = st.get_option("server.enableStaticServing")
+    href = stylesheet_href() if static else None
+    if href:
+        st.markdown(f"<link rel='stylesheet' href='{href}'>", unsafe_allow_html=True)
+    else:
+        # Inline gli URL relativi partono dalla pagina; senza static/ i font non sono raggiungibili
+        css = build_stylesheet("app/static/" if static else None)
+        st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
+
+
+LOGO_PATH = Path(__file__).with_name("logo.png")
+LOGO_MAX_WIDTH = 480
+
+
+@st.cache_resource
+def load_logo() -> bytes | None:
+    """Logo ridimensionato e ricodificato una sola volta per processo."""
+    try:
+        raw = LOGO_PATH.read_bytes()
+    except OSError:
+        return None
+    try:
+        from PIL import Image
+    except ImportError:
+        return raw
+    try:
+        with Image.open(io.BytesIO(raw)) as img:
+            if img.width > LOGO_MAX_WIDTH:
+                img = img.resize(
+                    (LOGO_MAX_WIDTH, round(img.height * LOGO_MAX_WIDTH / img.width)),
+                    Image.LANCZOS,
+                )
+            buf = io.BytesIO()
+            img.save(buf, format="PNG", optimize=True)
+    except Exception:
+        return raw
+    return buf.getvalue() if buf.tell() < len(raw) else raw
+
+
+@st.cache_resource
+def logo_data_uri() -> str | None:
+    logo = load_logo()
+    if logo is None:
+        return None
+    return "data:image/png;base64," + base64.b64encode(logo).decode("ascii")
+
+
+def brand_header(title: str | None = None) -> None:
+    c1, c2 = st.columns([1, 3])
+    with c1:
+        logo = load_logo()
+        if logo is not None:
+            st.image(logo, use_container_width=True)
+        else:
+            st.markdown(
+                f"<div style='font-size:1.6rem;font-weight:800;color:{GOLD};'>SUPERNOVA</div>",
+                unsafe_allow_html=True,
+            )
+    with c2:
+        if title:
+            st.markdown(f"### {title}")
+        st.markdown(
+            "<p class='sn-logo-caption'>Range Data Suite · Data over talent</p>",
+            unsafe_allow_html=True,
+        )
+
+
+def brand_footer() -> None:
+    st.markdown(
+        "<div class='sn-footer'>Powered by Supernova Sport Science</div>",
+        unsafe_allow_html=True,
+    )
+
+
+def render_hero(title: str, subtitle: str, chips: list[str] | None = None) -> None:
+    chips_html = ""
+    if chips:
+        chips_html = "".join([f"<span class='sn-chip'>{c}</span>" for c in chips])
+    st.markdown(
+        (
+            "<div class='sn-hero'>"
+            f"<div class='sn-hero-title'>{title}</div>"
+            f"<p class='sn-hero-sub'>{subtitle}</p>"
+            f"{chips_html}"
+            "</div>"
+        ),
+        unsafe_allow_html=True,
+    )
+
+
+def render_panel(title: str, subtitle: str) -> None:
+    st.markdown(
+        (
+            "<div class='sn-panel'>"
+            f"<div class='sn-panel-title'>{title}</div>"
+            f"<p class='sn-panel-sub'>{subtitle}</p>"
+            "</div>"
+        ),
+        unsafe_allow_html=True,
+    )
+
+
+# =============================================================================
+# Strokes gained (modello semplificato da practice — coerente tra settori)
+# =============================================================================
+# Baseline del modello: colpi attesi per distanza (metri). "Tour" è la tabella
+# storica PGA-style usata per lo SG salvato; le altre servono al confronto in Review.
+SG_BASELINE_SPECS: dict[str, dict[str, Any]] = {
+    "Tour": {
+        "label": "Tour (PGA-style)",
+        "putt": {
+            "xs": [0.5, 1, 1.5, 2, 3, 4, 5, 6, 8, 10, 12, 15, 20, 25, 30],
+            "ys": [1.02, 1.06, 1.10, 1.15, 1.23, 1.30, 1.38, 1.45, 1.58, 1.72, 1.85, 2.05, 2.25, 2.42, 2.55],
+        },
+        "long_tee": {
+            "xs": [120, 160, 200, 240, 280, 320, 380, 440],
+            "ys": [3.05, 3.25, 3.45, 3.62, 3.78, 3.92, 4.08, 4.22],
+        },
+        "long_fairway": {
+            "xs": [30, 60, 90, 120, 150, 180, 210],
+            "ys": [2.35, 2.72, 3.02, 3.28, 3.48, 3.65, 3.78],
+        },
+        "short": {
+            "base": 2.08,
+            "per_45m": 0.95,
+            "lie_adj": {"Fairway": 0.0, "Rough": 0.18, "Bunker": 0.55, "Green": 0.0},
+        },
+    },
+    "Scratch": {
+        "label": "Scratch",
+        "putt": {
+            "xs": [0.5, 1, 1.5, 2, 3, 4, 5, 6, 8, 10, 12, 15, 20, 25, 30],
+            "ys": [1.02, 1.08, 1.13, 1.19, 1.29, 1.37, 1.46, 1.54, 1.68, 1.83, 1.96, 2.14, 2.34, 2.51, 2.64],
+        },
+        "long_tee": {
+            "xs": [120, 160, 200, 240, 280, 320, 380, 440],
+            "ys": [3.15, 3.38, 3.60, 3.79, 3.97, 4.12, 4.30, 4.46],
+        },
+        "long_fairway": {
+            "xs": [30, 60, 90, 120, 150, 180, 210],
+            "ys": [2.42, 2.82, 3.15, 3.44, 3.66, 3.85, 4.00],
+        },
+        "short": {
+            "base": 2.18,
+            "per_45m": 1.00,
+            "lie_adj": {"Fairway": 0.0, "Rough": 0.22, "Bunker": 0.65, "Green": 0.0},
+        },
+    },
+    "Hcp 10": {
+        "label": "Handicap 10",
+        "putt": {
+            "xs": [0.5, 1, 1.5, 2, 3, 4, 5, 6, 8, 10, 12, 15, 20, 25, 30],
+            "ys": [1.03, 1.11, 1.18, 1.26, 1.38, 1.48, 1.58, 1.67, 1.82, 1.96, 2.08, 2.25, 2.44, 2.60, 2.72],
+        },
+        "long_tee": {
+            "xs": [120, 160, 200, 240, 280, 320, 380, 440],
+            "ys": [3.45, 3.72, 3.98, 4.20, 4.42, 4.60, 4.82, 5.00],
+        },
+        "long_fairway": {
+            "xs": [30, 60, 90, 120, 150, 180, 210],
+            "ys": [2.60, 3.05, 3.45, 3.78, 4.05, 4.28, 4.46],
+        },
+        "short": {
+            "base": 2.38,
+            "per_45m": 1.10,
+            "lie_adj": {"Fairway": 0.0, "Rough": 0.30, "Bunker": 0.90, "Green": 0.0},
+        },
+    },
+}
+DEFAULT_BASELINE = "Tour"
+# Da incrementare a ogni modifica della baseline di default: abilita il ricalcolo dello storico
+SG_MODEL_VERSION = "practice-v1"
+
+
+def compile_baseline(spec: dict[str, Any]) -> dict[str, Any]:
+    """Tabelle di una baseline convertite in array NumPy pronti per ``np.interp``."""
+
+    def table(key: str) -> tuple[np.ndarray, np.ndarray]:
+        return np.asarray(spec[key]["xs"], dtype=float), np.asarray(spec[key]["ys"], dtype=float)
+
+    short = spec["short"]
+    return {
+        "label": str(spec.get("label", "")),
+        "putt": table("putt"),
+        "long_tee": table("long_tee"),
+        "long_fairway": table("long_fairway"),
+        "short_base": float(short["base"]),
+        "short_per_45m": float(short["per_45m"]),
+        "lie_adj": {str(k): float(v) for k, v in short["lie_adj"].items()},
+    }
+
+
+BASELINE_DEFAULT = compile_baseline(SG_BASELINE_SPECS[DEFAULT_BASELINE])
+
+
+def _as_float(x: Any) -> np.ndarray:
+    return np.asarray(x, dtype=float)
+
+
+def _as_labels(x: Any) -> np.ndarray:
+    """Etichette (lie) come array di stringhe; valori mancanti → stringa vuota."""
+    arr = np.asarray(x, dtype=object)
+    return pd.Series(arr.reshape(-1)).fillna("").astype(str).to_numpy().reshape(arr.shape)
+
+
+def _first(arr: np.ndarray) -> float:
+    return float(np.ravel(arr)[0])
+
+
+def expected_putts_vec(distance_m: Any, baseline: dict[str, Any] | None = None) -> np.ndarray:
+    """Colpi attesi (default PGA-style) per array di distanze in metri."""
+    b = baseline or BASELINE_DEFAULT
+    d = _as_float(distance_m)
+    return np.where(d <= 0, 0.0, np.interp(d, *b["putt"]))
+
+
+def expected_short_hole_vec(dist_m: Any, lie: Any, baseline: dict[str, Any] | None = None) -> np.ndarray:
+    """Colpi attesi dal gioco corto (non green), vettoriale su distanza e lie."""
+    b = baseline or BASELINE_DEFAULT
+    d = _as_float(dist_m)
+    lies = _as_labels(lie)
+    lie_adj = b["lie_adj"]
+    adj = np.select([lies == k for k in lie_adj], list(lie_adj.values()), 0.0)
+    return np.where(d <= 0, 0.0, b["short_base"] + (d / 45.0) * b["short_per_45m"] + adj)
+
+
+def expected_long_hole_vec(dist_m: Any, from_tee: Any, baseline: dict[str, Any] | None = None) -> np.ndarray:
+    """Colpi attesi da tee / fairway, vettoriale."""
+    b = baseline or BASELINE_DEFAULT
+    d = _as_float(dist_m)
+    tee = np.asarray(from_tee, dtype=bool)
+    exp = np.where(tee, np.interp(d, *b["long_tee"]), np.interp(d, *b["long_fairway"]))
+    return np.where(d <= 0, 0.0, exp)
+
+
+def compute_sg_putt_vec(start_m: Any, end_m: Any, baseline: dict[str, Any] | None = None) -> np.ndarray:
+    return expected_putts_vec(start_m, baseline) - expected_putts_vec(end_m, baseline) - 1.0
+
+
+def compute_sg_short_vec(
+    start_m: Any, end_m: Any, lie_s: Any, lie_e: Any, baseline: dict[str, Any] | None = None
+) -> np.ndarray:
+    def exp_at(d: Any, lie: Any) -> np.ndarray:
+        on_green = _as_labels(lie) == "Green"
+        return np.where(on_green, expected_putts_vec(d, baseline), expected_short_hole_vec(d, lie, baseline))
+
+    return exp_at(start_m, lie_s) - exp_at(end_m, lie_e) - 1.0
+
+
+def compute_sg_long_vec(
+    start_before_m: Any,
+    start_after_m: Any,
+    from_tee: Any,
+    lie_after: Any,
+    baseline: dict[str, Any] | None = None,
+) -> np.ndarray:
+    exp_before = expected_long_hole_vec(start_before_m, from_tee, baseline)
+    use_fairway = np.char.lower(_as_labels(lie_after).astype(str)) == "fairway"
+    exp_after = np.where(
+        use_fairway,
+        expected_long_hole_vec(start_after_m, False, baseline),
+        expected_short_hole_vec(start_after_m, lie_after, baseline),
+    )
+    return exp_before - exp_after - 1.0
+
+
+def expected_putts(distance_m: float) -> float:
+    """Colpi attesi PGA-style (approssimazione) da distanza in metri."""
+    return _first(expected_putts_vec(distance_m))
+
+
+def expected_short_hole(dist_m: float, lie: str) -> float:
+    """Colpi attesi fino alla buca dal gioco corto (non green)."""
+    return _first(expected_short_hole_vec(dist_m, lie))
+
+
+def expected_long_hole(dist_m: float, from_tee: bool) -> float:
+    """Approccio / tee: colpi attesi verso la buca prima/dopo il colpo."""
+    return _first(expected_long_hole_vec(dist_m, from_tee))
+
+
+def compute_sg_putt(start_m: float, end_m: float) -> float:
+    return _first(compute_sg_putt_vec(start_m, end_m))
+
+
+def compute_sg_short(start_m: float, end_m: float, lie_s: str, lie_e: str) -> float:
+    return _first(compute_sg_short_vec(start_m, end_m, lie_s, lie_e))
+
+
+def compute_sg_long(start_before_m: float, start_after_m: float, from_tee: bool, lie_after: str) -> float:
+    return _first(compute_sg_long_vec(start_before_m, start_after_m, from_tee, lie_after))
+
+
+def compute_sg_frame(df: pd.DataFrame, baseline: dict[str, Any] | None = None) -> np.ndarray:
+    """SG di ogni riga dai campi salvati (distanze e lie), in un solo passaggio.
+
+    Categorie sconosciute o distanze mancanti producono NaN.
+    """
+    def num(col: str) -> np.ndarray:
+        return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+
+    cat = _as_labels(df["Category"])
+    lie_start = _as_labels(df["Lie_Start"])
+    lie_long = _as_labels(df["Lie_Long"])
+    from_tee = np.where(lie_long != "", lie_long, lie_start) == "Tee"
+    lie_end = _as_labels(df["Lie_End"])
+    sg_long = compute_sg_long_vec(
+        num("Hole_Dist_Start_m"), num("Hole_Dist_End_m"), from_tee, lie_end, baseline
+    )
+    sg_short = compute_sg_short_vec(num("Start_Dist_m"), num("End_Dist_m"), lie_start, lie_end, baseline)
+    sg_putt = compute_sg_putt_vec(num("Start_Dist_m"), num("End_Dist_m"), baseline)
+    return np.select([cat == "RANGE", cat == "SHORT", cat == "PUTT"], [sg_long, sg_short, sg_putt], np.nan)
+
+
+@st.cache_resource
+def load_baselines() -> dict[str, dict[str, Any]]:
+    """Baseline compilate una sola volta per processo.
+
+    ``sg_baselines.json`` accanto all'app (stessa struttura di
+    ``SG_BASELINE_SPECS``) aggiunge o sostituisce baseline.
+    """
+    specs = dict(SG_BASELINE_SPECS)
+    path = Path(__file__).with_name("sg_baselines.json")
+    if path.exists():
+        specs.update(json.loads(path.read_text(encoding="utf-8")))
+    return {name: compile_baseline(spec) for name, spec in specs.items()}
+
+
+SG_INPUT_COLUMNS = [
+    "Category",
+    "Start_Dist_m",
+    "End_Dist_m",
+    "Hole_Dist_Start_m",
+    "Hole_Dist_End_m",
+    "Lie_Start",
+    "Lie_End",
+    "Lie_Long",
+]
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _sg_for_baseline(inputs: pd.DataFrame, name: str) -> np.ndarray:
+    return compute_sg_frame(inputs, load_baselines()[name])
+
+
+def sg_by_baseline(df: pd.DataFrame, names: list[str]) -> pd.DataFrame:
+    """Una colonna SG per baseline sullo stesso frame, memorizzata per baseline."""
+    inputs = df[SG_INPUT_COLUMNS]
+    return pd.DataFrame({name: _sg_for_baseline(inputs, name) for name in names}, index=df.index)
+
+
+# =============================================================================
+# Storage (backend intercambiabili)
+# =============================================================================
+NUMERIC_COLUMNS = [
+    "Proximity_Lateral_m",
+    "Proximity_Depth_m",
+    "Start_Dist_m",
+    "End_Dist_m",
+    "Hole_Dist_Start_m",
+    "Hole_Dist_End_m",
+    "Rating",
+    "Strokes_Gained",
+]
+
+
+# Foglio senza accesso gspread: la revisione avanza a finestre di questa durata
+REVISION_FALLBACK_SECONDS = 30
+# Tetto alla durata di una generazione del foglio: oltre si rilegge comunque tutto
+REVISION_MAX_AGE_SECONDS = 300
+
+
+def _secret(key: str, default: Any = None) -> Any:
+    """Legge una chiave da st.secrets senza fallire se il file manca."""
+    try:
+        return st.secrets.get(key, default)
+    except Exception:
+        return default
+
+
+def align_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.copy()
+    for c in DATA_COLUMNS:
+        if c not in out.columns:
+            out[c] = np.nan
+    return out[DATA_COLUMNS]
+
+
+def _sheet_cell(v: Any) -> Any:
+    """Valore serializzabile per l'API Sheets (date ISO, NaN → cella vuota)."""
+    # Qualsiasi mancante (None, NaN float32/float64, pd.NA, NaT) diventa cella vuota
+    if pd.api.types.is_scalar(v) and pd.isna(v):
+        return ""
+    if isinstance(v, np.datetime64):
+        v = pd.Timestamp(v)
+    if isinstance(v, (datetime.date, pd.Timestamp)):
+        return v.isoformat()[:10]
+    if isinstance(v, np.generic):
+        return v.item()
+    return v
+
+
+def _col_letter(n: int) -> str:
+    """Lettera di colonna A1 (1 → A, 27 → AA)."""
+    letters = ""
+    while n > 0:
+        n, rem = divmod(n - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _sql_value(v: Any) -> Any:
+    """Come ``_sheet_cell`` ma con NULL al posto della cella vuota."""
+    cell = _sheet_cell(v)
+    return None if cell == "" else cell
+
+
+class StorageBackend:
+    """Interfaccia di persistenza dei colpi.
+
+    ``read_all``/``read_user`` restituiscono frame allineati a ``DATA_COLUMNS``
+    con indice = identificativo di riga del backend (crescente con gli append);
+    ``update_rows`` riscrive le righe indicate dall'indice del frame passato,
+    eventualmente limitandosi a ``columns``.
+    """
+
+    name = "base"
+    # True se il backend legge la partizione di un utente senza scorrere tutto
+    partitioned = False
+    # True se ``read_user(..., since=)`` salta davvero i mesi precedenti
+    date_sharded = False
+
+    def read_all(self) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def read_user(self, user: str, since: datetime.date | None = None) -> pd.DataFrame:
+        """Colpi di ``user``; ``since`` è solo un suggerimento, il chiamante filtra comunque."""
+        df = self.read_all()
+        return df[df["User"] == user]
+
+    def append(self, rows: pd.DataFrame, skip_existing: bool = False) -> None:
+        """Accoda ``rows``; con ``skip_existing`` ignora gli ``Shot_ID`` già salvati."""
+        raise NotImplementedError
+
+    def update_rows(self, rows: pd.DataFrame, columns: list[str] | None = None) -> None:
+        raise NotImplementedError
+
+    def read_since(self, watermark: int, user: str | None = None) -> pd.DataFrame:
+        """Solo le righe con identificativo maggiore di ``watermark`` (opz. di un utente)."""
+        raise NotImplementedError
+
+    def revision(self) -> tuple[int, int]:
+        """Token economico ``(generazione, watermark)`` che cambia con i dati.
+
+        Il watermark è l'identificativo dell'ultima riga e cresce a ogni append;
+        la generazione cambia quando righe esistenti vengono riscritte.
+        """
+        raise NotImplementedError
+
+    def watermark_of(self, df: pd.DataFrame, fallback: int) -> int:
+        """Watermark raggiunto da una lettura (di default l'identificativo massimo)."""
+        return int(df.index.max()) if len(df) else fallback
+
+
+class BackendUnavailable(RuntimeError):
+    """Backend remoto sospeso (circuito aperto) o tentativi esauriti."""
+
+
+# Risposte HTTP da ritentare: quota superata ed errori temporanei lato Google
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def _is_transient(exc: Exception) -> bool:
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status is not None:
+        return int(status) in RETRYABLE_STATUS
+    return isinstance(exc, (ConnectionError, TimeoutError, OSError))
+
+
+class TokenBucket:
+    """Limitatore a gettoni: ``rate_per_minute`` chiamate, raffiche fino a ``burst``."""
+
+    def __init__(self, rate_per_minute: float, burst: int) -> None:
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Prende un gettone, attendendo se serve; restituisce i secondi di attesa."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return waited
+                delay = (1.0 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class CircuitBreaker:
+    """Dopo ``threshold`` errori consecutivi sospende le chiamate per ``reset_seconds``.
+
+    Scaduta la pausa passa una sola chiamata di prova: se riesce il circuito si
+    richiude, se fallisce si riapre; finché è in corso le altre falliscono subito.
+    """
+
+    def __init__(self, threshold: int = 5, reset_seconds: float = 60.0) -> None:
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def check(self) -> None:
+        with self._lock:
+            if self.opened_at is None:
+                return
+            left = self.reset_seconds - (time.monotonic() - self.opened_at)
+            if left > 0:
+                raise BackendUnavailable(f"Foglio sospeso per altri {left:.0f} s dopo errori ripetuti.")
+            if self._probing:
+                raise BackendUnavailable("Foglio in verifica dopo errori ripetuti: riprova tra poco.")
+            # Mezza apertura: questa chiamata fa da prova
+            self._probing = True
+
+    def success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def failure(self) -> bool:
+        """Registra un errore; True se il circuito è (ri)aperto."""
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+                self._probing = False
+            return self.opened_at is not None
+
+
+class ApiGuard:
+    """Chiamate al foglio con limitatore di quota, retry esponenziale e circuit breaker.
+
+    Solo gli errori temporanei (429/5xx, rete) vengono ritentati e contano per
+    il breaker; quando il circuito si apre o i tentativi finiscono si solleva
+    ``BackendUnavailable``.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float = 60.0,
+        burst: int = 10,
+        retries: int = 4,
+        base_delay: float = 1.0,
+        max_delay: float = 32.0,
+        breaker: CircuitBreaker | None = None,
+        bucket: TokenBucket | None = None,
+    ) -> None:
+        self.bucket = bucket or TokenBucket(rate_per_minute, burst)
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+
+    def interactive(self, retries: int = 1, max_delay: float = 1.0) -> ApiGuard:
+        """Stessa quota e stesso breaker, con un budget di retry breve per le letture a schermo."""
+        return ApiGuard(
+            retries=retries,
+            base_delay=min(self.base_delay, max_delay),
+            max_delay=max_delay,
+            breaker=self.breaker,
+            bucket=self.bucket,
+        )
+
+    def call(self, fn: Any, *args: Any, **kwargs: Any) -> Any:
+        self.breaker.check()
+        delay = self.base_delay
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as exc:
+                if not _is_transient(exc):
+                    # Il foglio ha risposto: il circuito (e l'eventuale prova) si chiude
+                    self.breaker.success()
+                    raise
+                opened = self.breaker.failure()
+                if opened or attempt == self.retries:
+                    raise BackendUnavailable(str(exc) or type(exc).__name__) from exc
+                # Jitter: le sessioni in coda non ripartono tutte insieme
+                time.sleep(min(delay, self.max_delay) * random.uniform(0.5, 1.0))
+                delay *= 2
+                continue
+            self.breaker.success()
+            return result
+        raise AssertionError("unreachable")
+
+
+class SheetRevision:
+    """Generazione di un foglio che cambia anche per modifiche fatte fuori dal processo.
+
+    Il conteggio righe vede solo gli append. Se ``modifiedTime`` del file su
+    Drive cambia senza righe nuove (modifiche a mano, cancellazioni compensate
+    da append, riscritture da un'altra istanza) si apre una nuova generazione;
+    in ogni caso una generazione non dura più di ``max_age`` secondi, così
+    anche le modifiche che coincidono con un append vengono viste.
+    """
+
+    def __init__(self, max_age: float = REVISION_MAX_AGE_SECONDS) -> None:
+        self.max_age = max_age
+        self.generation = 0
+        self.drive = True
+        self._epoch = int(time.monotonic() // max_age)
+        self._modified: str | None = None
+        self._count = -1
+
+    def bump(self) -> None:
+        self.generation += 1
+
+    def modified_time(self, read: Any, spreadsheet: Any) -> str | None:
+        """``modifiedTime`` del file via Drive; None se il client non lo espone."""
+        get = getattr(spreadsheet, "get_lastUpdateTime", None)
+        if get is None or not self.drive:
+            return None
+        try:
+            return str(read(get))
+        except BackendUnavailable:
+            raise
+        except Exception:
+            # Drive API non abilitata o senza permessi: resta il tetto di durata
+            self.drive = False
+            return None
+
+    def observe(self, count: int, modified: str | None) -> int:
+        epoch = int(time.monotonic() // self.max_age)
+        edited = self._modified is not None and modified not in (None, self._modified) and count <= self._count
+        if epoch != self._epoch or edited:
+            self.generation += 1
+        self._epoch, self._count = epoch, count
+        if modified is not None:
+            self._modified = modified
+        return self.generation
+
+
+class GSheetsBackend(StorageBackend):
+    """Foglio Google via st-gsheets-connection (append/update tramite gspread)."""
+
+    name = "gsheets"
+
+    def __init__(
+        self,
+        conn: Any,
+        revision_ttl: float = 2.0,
+        guard: ApiGuard | None = None,
+        worksheet: Any | None = None,
+        read_guard: ApiGuard | None = None,
+    ) -> None:
+        self.conn = conn
+        self.revision_ttl = revision_ttl
+        self.guard = guard
+        # Letture dallo script: budget di retry breve per non bloccare la pagina
+        self.read_guard = read_guard or guard
+        self._ws: Any | None = worksheet
+        self._header_cache: list[str] | None = None
+        self._revision = SheetRevision()
+        self._rev_memo: tuple[float, tuple[int, int]] | None = None
+
+    def _api(self, fn: Any, *args: Any, **kwargs: Any) -> Any:
+        """Ogni chiamata reale all'API passa dal guard (quota, retry, breaker)."""
+        if self.guard is None:
+            return fn(*args, **kwargs)
+        return self.guard.call(fn, *args, **kwargs)
+
+    def _read(self, fn: Any, *args: Any, **kwargs: Any) -> Any:
+        if self.read_guard is None:
+            return fn(*args, **kwargs)
+        return self.read_guard.call(fn, *args, **kwargs)
+
+    def _worksheet(self) -> Any | None:
+        """Worksheet gspread sottostante (solo service account), altrimenti None."""
+        if self._ws is None:
+            select = getattr(getattr(self.conn, "client", None), "_select_worksheet", None)
+            if select is None:
+                return None
+            self._ws = self._read(select)
+        return self._ws
+
+    def _touch(self, rewrite: bool = False) -> None:
+        if rewrite:
+            self._revision.bump()
+        self._rev_memo = None
+
+    def revision(self) -> tuple[int, int]:
+        """Numero di righe letto dalla sola colonna A (più la generazione di ``SheetRevision``).
+
+        Memorizzato per pochi secondi.
+        """
+        now = time.monotonic()
+        if self._rev_memo is not None and now - self._rev_memo[0] < self.revision_ttl:
+            return self._rev_memo[1]
+        ws = self._worksheet()
+        if ws is None:
+            # Foglio pubblico: nessun conteggio economico, si ragiona a finestre temporali
+            rev = (int(time.time() // REVISION_FALLBACK_SECONDS), -1)
+        else:
+            count = max(len(self._read(ws.col_values, 1)) - 1, 0)
+            modified = self._revision.modified_time(self._read, getattr(ws, "spreadsheet", None))
+            rev = (self._revision.observe(count, modified), count)
+        self._rev_memo = (now, rev)
+        return rev
+
+    def _header(self, ws: Any) -> list[str]:
+        """Intestazione del foglio, completata con le colonne mancanti."""
+        if self._header_cache is not None:
+            return self._header_cache
+        header = [h for h in self._read(ws.row_values, 1) if h]
+        missing = [c for c in DATA_COLUMNS if c not in header]
+        if missing:
+            header = header + missing
+            self._api(ws.update, range_name="A1", values=[header])
+        self._header_cache = header
+        return header
+
+    @staticmethod
+    def _values(rows: pd.DataFrame, header: list[str]) -> list[list[Any]]:
+        aligned = align_dataframe(rows)
+        return [
+            [_sheet_cell(rec[c]) if c in aligned.columns else "" for c in header]
+            for rec in aligned.to_dict("records")
+        ]
+
+    def read_all(self) -> pd.DataFrame:
+        """Foglio intero; indice = numero di riga dati (1 = prima sotto l'intestazione)."""
+        df = self._read(self.conn.read, ttl=0)
+        if df is None or df.empty:
+            return pd.DataFrame(columns=DATA_COLUMNS)
+        # gspread_dataframe scarta le righe vuote ma ne conserva le etichette:
+        # rinumerare sposterebbe gli identificativi rispetto alle righe del foglio
+        df.index = df.index + 1
+        return align_dataframe(df.dropna(how="all"))
+
+    def read_since(self, watermark: int, user: str | None = None) -> pd.DataFrame:
+        df = self.read_rows(watermark)
+        return df if user is None else df[df["User"] == user]
+
+    def read_rows(self, watermark: int, upto: int | None = None) -> pd.DataFrame:
+        """Righe dati da ``watermark + 1`` a ``upto`` compreso (default: fino in fondo)."""
+        ws = self._worksheet()
+        if ws is None:
+            raise NotImplementedError
+        if upto is not None and upto <= watermark:
+            return pd.DataFrame(columns=DATA_COLUMNS)
+        header = self._header(ws)
+        end = f"ZZ{upto + 1}" if upto is not None else "ZZ"
+        # Date come testo (come gspread_dataframe nelle letture complete), non numeri seriali
+        values = self._read(
+            ws.get,
+            f"A{watermark + 2}:{end}",
+            value_render_option="UNFORMATTED_VALUE",
+            date_time_render_option="FORMATTED_STRING",
+        )
+        if not values:
+            return pd.DataFrame(columns=DATA_COLUMNS)
+        width = len(header)
+        padded = [(list(r) + [""] * width)[:width] for r in values]
+        df = pd.DataFrame(padded, columns=header).replace("", np.nan)
+        df.index = pd.RangeIndex(watermark + 1, watermark + 1 + len(df))
+        return align_dataframe(df.dropna(how="all"))
+
+    def append(self, rows: pd.DataFrame, skip_existing: bool = False) -> None:
+        """Accoda al foglio solo le righe nuove, lasciando intatto lo storico.
+
+        I valori seguono l'intestazione del foglio; le colonne di ``DATA_COLUMNS``
+        non ancora presenti vengono aggiunte in coda all'intestazione. Con
+        ``skip_existing`` (replay dopo un errore) si legge la sola colonna
+        ``Shot_ID`` e si scartano i colpi già arrivati.
+        """
+        if rows.empty:
+            return
+        ws = self._worksheet()
+        if ws is None:
+            # Client senza accesso gspread: ripiego su lettura + riscrittura completa
+            existing = self.read_all()
+            if skip_existing:
+                rows = rows[~rows["Shot_ID"].isin(set(existing["Shot_ID"].dropna()))]
+            if rows.empty:
+                return
+            self._api(self.conn.update, data=align_dataframe(pd.concat([existing, rows], ignore_index=True)))
+            self._touch(rewrite=True)
+            return
+        header = self._header(ws)
+        if skip_existing:
+            known = set(self._api(ws.col_values, header.index("Shot_ID") + 1)[1:])
+            rows = rows[~rows["Shot_ID"].isin(known)]
+            if rows.empty:
+                return
+        self._api(ws.append_rows, self._values(rows, header), value_input_option="RAW", table_range="A1")
+        self._touch()
+
+    def update_rows(self, rows: pd.DataFrame, columns: list[str] | None = None) -> None:
+        """Riscrive le righe indicate in un'unica batch_update.
+
+        Righe consecutive diventano un solo intervallo (per colonna se
+        ``columns`` è indicato), così un ricalcolo dell'intero storico
+        costa pochi range invece di uno per riga.
+        """
+        if rows.empty:
+            return
+        cols = list(columns) if columns else DATA_COLUMNS
+        aligned = align_dataframe(rows).sort_index()
+        ws = self._worksheet()
+        if ws is None:
+            existing = self.read_all()
+            existing.loc[aligned.index, cols] = aligned[cols]
+            self._api(self.conn.update, data=existing)
+            self._touch(rewrite=True)
+            return
+        header = self._header(ws)
+        ids = aligned.index.to_numpy(dtype=int)
+        runs = np.split(np.arange(len(ids)), np.flatnonzero(np.diff(ids) != 1) + 1)
+        data = []
+        for run in runs:
+            first, last = ids[run[0]] + 1, ids[run[-1]] + 1
+            chunk = aligned.iloc[run]
+            if columns is None:
+                end = _col_letter(len(header))
+                data.append({"range": f"A{first}:{end}{last}", "values": self._values(chunk, header)})
+                continue
+            for c in cols:
+                letter = _col_letter(header.index(c) + 1)
+                data.append(
+                    {"range": f"{letter}{first}:{letter}{last}", "values": [[_sheet_cell(v)] for v in chunk[c]]}
+                )
+        self._api(ws.batch_update, data, value_input_option="RAW")
+        self._touch(rewrite=True)
+
+
+MANIFEST_SHEET = "_manifest"
+MANIFEST_COLUMNS = ["Shard", "User", "Month", "Rows"]
+# Identificativo riga = numero shard × passo + riga nello shard (un foglio ha al massimo 10M celle)
+SHARD_ROW_STRIDE = 1_000_000
+# Manifest ricordati per le letture delta (chiave: totale righe)
+SHARD_MARKS = 64
+
+
+def shard_title(user: str, month: str) -> str:
+    """Nome del worksheet di uno shard; Sheets vieta alcuni caratteri e oltre 100 caratteri.
+
+    Il nome ripulito e troncato non basta ("A/B" e "A_B" coinciderebbero):
+    un hash breve dell'utente originale rende il titolo univoco.
+    """
+    safe = re.sub(r"[\[\]:*?/\\']", "_", user)[:72]
+    tag = hashlib.blake2b(user.encode(), digest_size=4).hexdigest()
+    return f"{safe} {tag} {month}" if month else f"{safe} {tag}"
+
+
+class ShardedSheetsBackend(StorageBackend):
+    """Colpi divisi in un worksheet per atleta (o per atleta e mese) elencati in un manifest.
+
+    Il worksheet ``_manifest`` ha una riga per shard (titolo, utente, mese,
+    righe); la revisione legge solo il manifest e ogni lettura apre, in
+    parallelo, i soli shard che servono. L'identificativo di riga codifica
+    shard e riga (vedi ``SHARD_ROW_STRIDE``); il watermark è il totale righe
+    del manifest, che cresce a ogni append.
+    """
+
+    name = "gsheets_sharded"
+    partitioned = True
+
+    def __init__(
+        self,
+        spreadsheet: Any,
+        by_month: bool = True,
+        guard: ApiGuard | None = None,
+        revision_ttl: float = 2.0,
+        max_workers: int = 8,
+        legacy: GSheetsBackend | None = None,
+        read_guard: ApiGuard | None = None,
+    ) -> None:
+        self.spreadsheet = spreadsheet
+        self.by_month = by_month
+        self.date_sharded = by_month
+        self.guard = guard
+        self.read_guard = read_guard or guard
+        self.revision_ttl = revision_ttl
+        self.max_workers = max_workers
+        # Foglio unico di prima dello sharding, solo per la migrazione
+        self.legacy = legacy
+        self._titles: dict[str, Any] | None = None
+        self._mws: Any | None = None
+        self._shards: dict[str, GSheetsBackend] = {}
+        self._manifest: pd.DataFrame | None = None
+        self._manifest_at = 0.0
+        self._marks: OrderedDict[int, dict[int, int]] = OrderedDict()
+        self._revision = SheetRevision()
+        self._rev_memo: tuple[float, tuple[int, int]] | None = None
+        self._lock = threading.RLock()
+
+    _api = GSheetsBackend._api
+    _read = GSheetsBackend._read
+
+    def _worksheets(self, refresh: bool = False) -> dict[str, Any]:
+        if self._titles is None or refresh:
+            self._titles = {ws.title: ws for ws in self._read(self.spreadsheet.worksheets)}
+        return self._titles
+
+    def _open(self, title: str, create: bool = False) -> Any:
+        """Worksheet per titolo, creandolo se serve (tollera la creazione concorrente)."""
+        ws = self._worksheets().get(title) or self._worksheets(refresh=True).get(title)
+        if ws is not None or not create:
+            return ws
+        try:
+            ws = self._api(self.spreadsheet.add_worksheet, title=title, rows=1000, cols=len(DATA_COLUMNS))
+        except Exception:
+            ws = self._worksheets(refresh=True).get(title)
+            if ws is None:
+                raise
+        self._titles[title] = ws
+        return ws
+
+    def _manifest_ws(self) -> Any:
+        with self._lock:
+            if self._mws is None:
+                ws = self._open(MANIFEST_SHEET, create=True)
+                if not self._read(ws.row_values, 1):
+                    self._api(ws.update, range_name="A1", values=[MANIFEST_COLUMNS])
+                self._mws = ws
+            return self._mws
+
+    def manifest(self, refresh: bool = False) -> pd.DataFrame:
+        """Manifest con indice = numero shard (riga dati del worksheet), memorizzato per pochi secondi."""
+        now = time.monotonic()
+        with self._lock:
+            if not refresh and self._manifest is not None and now - self._manifest_at < self.revision_ttl:
+                return self._manifest
+        values = self._read(
+            self._manifest_ws().get,
+            "A2:D",
+            value_render_option="UNFORMATTED_VALUE",
+            date_time_render_option="FORMATTED_STRING",
+        )
+        width = len(MANIFEST_COLUMNS)
+        rows = [(list(r) + [""] * width)[:width] for r in values or []]
+        m = pd.DataFrame(rows, columns=MANIFEST_COLUMNS, index=pd.RangeIndex(1, len(rows) + 1))
+        m["Shard"] = m["Shard"].astype(str)
+        m["User"] = m["User"].astype(str)
+        m["Month"] = m["Month"].astype(str)
+        m["Rows"] = pd.to_numeric(m["Rows"], errors="coerce").fillna(0).astype(int)
+        with self._lock:
+            self._manifest, self._manifest_at = m, now
+            self._marks[int(m["Rows"].sum())] = dict(zip(m.index, m["Rows"]))
+            while len(self._marks) > SHARD_MARKS:
+                self._marks.popitem(last=False)
+        return m
+
+    def _shard(self, sid: int, title: str) -> GSheetsBackend:
+        with self._lock:
+            if title not in self._shards:
+                shard = GSheetsBackend(None, guard=self.guard, worksheet=self._open(title), read_guard=self.read_guard)
+                # Degli shard serve solo il conteggio: modifiedTime lo segue già questo backend
+                shard._revision.drive = False
+                self._shards[title] = shard
+            return self._shards[title]
+
+    def _fetch(self, parts: list[tuple[int, str, int, int]], total: int) -> pd.DataFrame:
+        """Righe (da, a] di ogni shard lette in parallelo, con identificativo globale."""
+        shards = {sid: self._shard(sid, title) for sid, title, _, _ in parts}
+
+        def read(part: tuple[int, str, int, int]) -> pd.DataFrame:
+            sid, _, start, upto = part
+            df = shards[sid].read_rows(start, upto)
+            df.index = df.index + sid * SHARD_ROW_STRIDE
+            return df
+
+        frames: list[pd.DataFrame] = []
+        if parts:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(parts))) as pool:
+                frames = [f for f in pool.map(read, parts) if not f.empty]
+        df = pd.concat(frames) if frames else pd.DataFrame(columns=DATA_COLUMNS)
+        df.attrs["watermark"] = total
+        return df
+
+    def _select(self, m: pd.DataFrame, user: str | None, since: datetime.date | None) -> pd.DataFrame:
+        if user is not None:
+            m = m[m["User"] == user]
+        if since is not None and self.by_month:
+            m = m[m["Month"] >= f"{since:%Y-%m}"]
+        return m
+
+    def read_all(self) -> pd.DataFrame:
+        m = self.manifest()
+        parts = [(sid, r.Shard, 0, r.Rows) for sid, r in m.iterrows() if r.Rows > 0]
+        return self._fetch(parts, int(m["Rows"].sum()))
+
+    def read_user(self, user: str, since: datetime.date | None = None) -> pd.DataFrame:
+        m = self.manifest()
+        sel = self._select(m, user, since)
+        parts = [(sid, r.Shard, 0, r.Rows) for sid, r in sel.iterrows() if r.Rows > 0]
+        return self._fetch(parts, int(m["Rows"].sum()))
+
+    def read_since(self, watermark: int, user: str | None = None) -> pd.DataFrame:
+        """Code degli shard cresciuti dal manifest che corrisponde a ``watermark``."""
+        with self._lock:
+            before = self._marks.get(int(watermark))
+        if before is None:
+            raise NotImplementedError
+        m = self.manifest()
+        sel = self._select(m, user, None)
+        parts = [
+            (sid, r.Shard, before.get(sid, 0), r.Rows)
+            for sid, r in sel.iterrows()
+            if r.Rows > before.get(sid, 0)
+        ]
+        return self._fetch(parts, int(m["Rows"].sum()))
+
+    def watermark_of(self, df: pd.DataFrame, fallback: int) -> int:
+        return int(df.attrs.get("watermark", fallback))
+
+    def revision(self) -> tuple[int, int]:
+        """Una sola lettura del manifest (memorizzata) invece di scorrere i dati.
+
+        Le modifiche dentro uno shard non toccano il manifest: la generazione
+        segue ``modifiedTime`` del file come per il foglio unico.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._rev_memo is not None and now - self._rev_memo[0] < self.revision_ttl:
+                return self._rev_memo[1]
+        count = int(self.manifest()["Rows"].sum())
+        modified = self._revision.modified_time(self._read, self.spreadsheet)
+        rev = (self._revision.observe(count, modified), count)
+        with self._lock:
+            self._rev_memo = (now, rev)
+        return rev
+
+    def _ensure_shard(self, user: str, month: str) -> tuple[int, str]:
+        with self._lock:
+            m = self.manifest(refresh=True)
+            hit = m[(m["User"] == user) & (m["Month"] == month)]
+            if hit.empty:
+                base = title = shard_title(user, month)
+                # Mai riusare un titolo già assegnato a un altro utente/mese nel manifest
+                taken = set(m["Shard"])
+                n = 2
+                while title in taken:
+                    title, n = f"{base} ({n})", n + 1
+                self._open(title, create=True)
+                self._api(
+                    self._manifest_ws().append_rows,
+                    [[title, user, month, 0]],
+                    value_input_option="RAW",
+                    table_range="A1",
+                )
+                m = self.manifest(refresh=True)
+                hit = m[(m["User"] == user) & (m["Month"] == month)]
+            return int(hit.index[0]), str(hit["Shard"].iloc[0])
+
+    def append(self, rows: pd.DataFrame, skip_existing: bool = False) -> None:
+        """Ogni gruppo va nel suo shard; il manifest si aggiorna dopo i dati, col conteggio reale."""
+        if rows.empty:
+            return
+        users = rows["User"].astype(str)
+        months = (
+            pd.to_datetime(rows["Date"], errors="coerce").dt.strftime("%Y-%m").fillna("")
+            if self.by_month
+            else pd.Series("", index=rows.index)
+        )
+        mws = self._manifest_ws()
+        for (user, month), part in rows.groupby([users, months], sort=False):
+            sid, title = self._ensure_shard(user, month)
+            shard = self._shard(sid, title)
+            shard.append(part, skip_existing=skip_existing)
+            count = shard.revision()[1]
+            self._api(mws.update, range_name=f"D{sid + 1}", values=[[count]])
+        with self._lock:
+            self._manifest = None
+            self._rev_memo = None
+
+    def update_rows(self, rows: pd.DataFrame, columns: list[str] | None = None) -> None:
+        if rows.empty:
+            return
+        m = self.manifest()
+        sids = rows.index.to_numpy(dtype=int) // SHARD_ROW_STRIDE
+        for sid, part in rows.groupby(sids):
+            part = part.copy()
+            part.index = part.index - int(sid) * SHARD_ROW_STRIDE
+            self._shard(int(sid), str(m.at[int(sid), "Shard"])).update_rows(part, columns)
+        with self._lock:
+            self._revision.bump()
+            self._rev_memo = None
+
+    def migrate_legacy(self) -> int:
+        """Copia il foglio unico negli shard; ripetibile grazie agli ``Shot_ID``."""
+        if self.legacy is None:
+            return 0
+        df = self.legacy.read_all()
+        if df.empty:
+            return 0
+        # Le righe storiche senza Shot_ID ricevono un ID stabile dalla riga d'origine
+        missing = df["Shot_ID"].isna() | (df["Shot_ID"].astype(str) == "")
+        df.loc[missing, "Shot_ID"] = [f"legacy-{i}" for i in df.index[missing]]
+        self.append(df, skip_existing=True)
+        return len(df)
+
+
+class SQLiteBackend(StorageBackend):
+    """Motore locale SQLite: salvataggi immediati e query indicizzate per utente."""
+
+    name = "sqlite"
+    partitioned = True
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._ensure_schema()
+
+    @staticmethod
+    def _col_type(col: str) -> str:
+        return "REAL" if col in NUMERIC_COLUMNS else "TEXT"
+
+    def _ensure_schema(self) -> None:
+        with self._lock, self._db:
+            cols = ", ".join(f'"{c}" {self._col_type(c)}' for c in DATA_COLUMNS)
+            self._db.execute(f"CREATE TABLE IF NOT EXISTS shots ({cols})")
+            present = {r[1] for r in self._db.execute("PRAGMA table_info(shots)")}
+            for c in DATA_COLUMNS:
+                if c not in present:
+                    self._db.execute(f'ALTER TABLE shots ADD COLUMN "{c}" {self._col_type(c)}')
+            self._db.execute('CREATE INDEX IF NOT EXISTS ix_shots_user_date ON shots ("User", "Date")')
+            self._db.execute(
+                'CREATE UNIQUE INDEX IF NOT EXISTS ux_shots_shot_id ON shots ("Shot_ID") '
+                'WHERE "Shot_ID" IS NOT NULL'
+            )
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)")
+
+    def _select(self, where: str = "", params: tuple[Any, ...] = ()) -> pd.DataFrame:
+        cols = ", ".join(f'"{c}"' for c in DATA_COLUMNS)
+        with self._lock:
+            df = pd.read_sql_query(
+                f"SELECT rowid AS _row, {cols} FROM shots {where} ORDER BY rowid",
+                self._db,
+                params=params,
+                index_col="_row",
+            )
+        df.index.name = None
+        return df
+
+    def read_all(self) -> pd.DataFrame:
+        return self._select()
+
+    def read_user(self, user: str, since: datetime.date | None = None) -> pd.DataFrame:
+        return self._select('WHERE "User" = ?', (user,))
+
+    def read_since(self, watermark: int, user: str | None = None) -> pd.DataFrame:
+        if user is None:
+            return self._select("WHERE rowid > ?", (int(watermark),))
+        return self._select('WHERE "User" = ? AND rowid > ?', (user, int(watermark)))
+
+    def append(self, rows: pd.DataFrame, skip_existing: bool = False) -> None:
+        # L'indice unico su Shot_ID rende ogni append idempotente, replay compresi
+        if rows.empty:
+            return
+        aligned = align_dataframe(rows)
+        cols = ", ".join(f'"{c}"' for c in DATA_COLUMNS)
+        marks = ", ".join("?" for _ in DATA_COLUMNS)
+        values = [[_sql_value(v) for v in rec] for rec in aligned.itertuples(index=False, name=None)]
+        with self._lock, self._db:
+            self._db.executemany(f"INSERT OR IGNORE INTO shots ({cols}) VALUES ({marks})", values)
+
+    def update_rows(self, rows: pd.DataFrame, columns: list[str] | None = None) -> None:
+        if rows.empty:
+            return
+        cols = list(columns) if columns else DATA_COLUMNS
+        aligned = align_dataframe(rows)[cols]
+        sets = ", ".join(f'"{c}" = ?' for c in cols)
+        values = [
+            [_sql_value(v) for v in rec] + [int(idx)]
+            for idx, rec in zip(aligned.index, aligned.itertuples(index=False, name=None))
+        ]
+        with self._lock, self._db:
+            self._db.executemany(f"UPDATE shots SET {sets} WHERE rowid = ?", values)
+            self._db.execute(
+                "INSERT INTO meta (key, value) VALUES ('generation', 1) "
+                "ON CONFLICT(key) DO UPDATE SET value = value + 1"
+            )
+
+    def revision(self) -> tuple[int, int]:
+        with self._lock:
+            gen = self._db.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+            last = self._db.execute("SELECT MAX(rowid) FROM shots").fetchone()
+        return (int(gen[0]) if gen else 0, int(last[0] or 0))
+
+
+@st.cache_resource
+def get_backend() -> StorageBackend:
+    """Backend scelto in ``[storage]`` dei secrets (default: Google Sheets)."""
+    cfg = _secret("storage", {}) or {}
+    kind = str(cfg.get("backend", "gsheets")).lower()
+    if kind == "sqlite":
+        return SQLiteBackend(str(cfg.get("sqlite_path", "supernova_shots.sqlite")))
+    # Una sola connessione per processo; quota Sheets: 60 richieste/minuto per utente
+    guard = ApiGuard(
+        rate_per_minute=float(cfg.get("sheets_requests_per_minute", 60)),
+        burst=int(cfg.get("sheets_burst", 10)),
+        breaker=CircuitBreaker(reset_seconds=float(cfg.get("sheets_breaker_seconds", 60))),
+    )
+    read_guard = guard.interactive(retries=int(cfg.get("sheets_read_retries", 1)))
+    legacy = GSheetsBackend(st.connection("gsheets", type=GSheetsConnection), guard=guard, read_guard=read_guard)
+    shard_by = str(cfg.get("shard_by", "")).lower()
+    ws = legacy._worksheet() if shard_by in ("user", "user_month") else None
+    if ws is None:
+        # Sharding solo con service account (serve creare worksheet)
+        return legacy
+    return ShardedSheetsBackend(
+        ws.spreadsheet,
+        by_month=shard_by == "user_month",
+        guard=guard,
+        max_workers=int(cfg.get("shard_workers", 8)),
+        legacy=legacy,
+        read_guard=read_guard,
+    )
+
+
+# =============================================================================
+# Prestazioni
+# =============================================================================
+PERF_WINDOW = 500
+
+
+class PerfRecorder:
+    """Durate per span in finestre scorrevoli, con scrittura opzionale in JSON lines."""
+
+    def __init__(self, window: int = PERF_WINDOW, log_path: str | None = None) -> None:
+        self.window = window
+        self._spans: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+        self._sink = open(log_path, "a", encoding="utf-8", buffering=1) if log_path else None
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._spans.setdefault(name, deque(maxlen=self.window)).append(seconds)
+            if self._sink is not None:
+                self._sink.write(
+                    json.dumps({"ts": round(time.time(), 3), "span": name, "ms": round(seconds * 1000, 3)}) + "\n"
+                )
+
+    def summary(self) -> pd.DataFrame:
+        """Percentili in millisecondi per span, dal più lento al p90."""
+        with self._lock:
+            spans = {name: np.fromiter(d, dtype=float) for name, d in self._spans.items()}
+        rows = [
+            {
+                "Span": name,
+                "n": len(v),
+                "p50 ms": np.percentile(v, 50) * 1000,
+                "p90 ms": np.percentile(v, 90) * 1000,
+                "p99 ms": np.percentile(v, 99) * 1000,
+                "max ms": v.max() * 1000,
+            }
+            for name, v in spans.items()
+        ]
+        cols = ["Span", "n", "p50 ms", "p90 ms", "p99 ms", "max ms"]
+        return pd.DataFrame(rows, columns=cols).sort_values("p90 ms", ascending=False)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+@st.cache_resource
+def get_perf() -> PerfRecorder:
+    return PerfRecorder(log_path=_secret("PERF_LOG_PATH"))
+
+
+@contextlib.contextmanager
+def perf_span(name: str) -> Any:
+    """Misura un blocco (``with``) o una funzione (decoratore) nel recorder di processo."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        get_perf().record(name, time.perf_counter() - t0)
+
+
+# =============================================================================
+# Dati
+# =============================================================================
+# Schema tipizzato in memoria: categorie dalle liste di opzioni (valori extra
+# trovati nei dati vengono aggiunti in coda), float32 per le distanze.
+CATEGORICAL_COLUMNS: dict[str, list[str]] = {
+    "User": [],
+    "SessionName": [],
+    "Time": [],
+    "Category": list(CATEGORIES),
+    "Club": CLUBS_LONG + ["Putter"],
+    "Impact": list(dict.fromkeys(LONG_IMPACT + SHORT_IMPACT + PUTT_IMPACT)),
+    "Curvature": list(dict.fromkeys(LONG_CURVE + PUTT_TRAJ)),
+    "Trajectory": PUTT_TRAJ,
+    "Lie_Start": ["Tee"] + SHORT_LIE_END,
+    "Lie_End": SHORT_LIE_END,
+    "Direction_LR": list(dict.fromkeys(LONG_DIR + SHORT_DIR)),
+    "Lie_Long": ["Tee", "Fairway"],
+    "Mental_Reaction": MENTAL_OPTIONS,
+    "SG_Model": [],
+}
+FLOAT32_COLUMNS = [
+    "Proximity_Lateral_m",
+    "Proximity_Depth_m",
+    "Start_Dist_m",
+    "End_Dist_m",
+    "Hole_Dist_Start_m",
+    "Hole_Dist_End_m",
+]
+
+
+def _as_category(s: pd.Series, known: list[str]) -> pd.Series:
+    text = s.astype("string")
+    extra = sorted(set(text.dropna().unique()) - set(known))
+    return pd.Series(pd.Categorical(text, categories=known + extra), index=s.index)
+
+
+def empty_frame() -> pd.DataFrame:
+    return coerce_frame(pd.DataFrame(columns=DATA_COLUMNS))
+
+
+def coerce_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Righe grezze dal backend → schema tipizzato compatto.
+
+    ``Date`` datetime64, colonne enum categoriche, distanze float32,
+    ``Rating`` Int8 e ``Strokes_Gained`` float64.
+    """
+    df = align_dataframe(df if df is not None else pd.DataFrame())
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce").dt.normalize()
+    for col, known in CATEGORICAL_COLUMNS.items():
+        df[col] = _as_category(df[col], known)
+    for col in FLOAT32_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype("float32")
+    df["Rating"] = pd.to_numeric(df["Rating"], errors="coerce").round().astype("Int8")
+    df["Strokes_Gained"] = pd.to_numeric(df["Strokes_Gained"], errors="coerce").astype("float64")
+    return df
+
+
+def concat_frames(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """Concatena frame tipizzati unendo le categorie, così il dtype resta compatto."""
+    frames = [f for f in frames if not f.empty]
+    if len(frames) <= 1:
+        return frames[0] if frames else empty_frame()
+    frames = [f.copy() for f in frames]
+    for col in CATEGORICAL_COLUMNS:
+        cats = frames[0][col].cat.categories
+        for f in frames[1:]:
+            cats = cats.append(f[col].cat.categories.difference(cats))
+        for f in frames:
+            f[col] = f[col].cat.set_categories(cats)
+    return pd.concat(frames)
+
+
+# Aggregati materializzati per trend e ranking bastoni
+ROLLUP_KEYS = ["User", "Date", "Category", "Club", "SessionName"]
+ROLLUP_VALUES = ["n", "rating_n", "rating_sum", "rating_sumsq", "sg_n", "sg_sum", "sg_sumsq"]
+
+
+def build_rollup(df: pd.DataFrame) -> pd.DataFrame:
+    """Conteggi, somme e somme dei quadrati di voto e SG per chiave di rollup."""
+    if df.empty:
+        return pd.DataFrame(columns=ROLLUP_KEYS + ROLLUP_VALUES)
+    rating = df["Rating"].astype("float64")
+    sg = df["Strokes_Gained"].astype("float64")
+    parts = df[ROLLUP_KEYS].assign(
+        n=1,
+        rating_n=rating.notna().astype(int),
+        rating_sum=rating.fillna(0.0),
+        rating_sumsq=rating.fillna(0.0) ** 2,
+        sg_n=sg.notna().astype(int),
+        sg_sum=sg.fillna(0.0),
+        sg_sumsq=sg.fillna(0.0) ** 2,
+    )
+    return _sum_rollup(parts)
+
+
+def _sum_rollup(parts: pd.DataFrame) -> pd.DataFrame:
+    out = parts.groupby(ROLLUP_KEYS, observed=True, dropna=False, as_index=False)[ROLLUP_VALUES].sum()
+    for k in ROLLUP_KEYS:
+        if k != "Date":
+            out[k] = out[k].astype(object)
+    return out
+
+
+def merge_rollups(base: pd.DataFrame, delta: pd.DataFrame) -> pd.DataFrame:
+    """Somma un rollup di delta su quello esistente (costo ∝ dimensione degli aggregati)."""
+    if base.empty:
+        return delta
+    if delta.empty:
+        return base
+    return _sum_rollup(pd.concat([base, delta], ignore_index=True))
+
+
+def rollup_means(grp: pd.DataFrame) -> pd.DataFrame:
+    """Medie e deviazione standard SG da somme aggregate."""
+    out = grp.copy()
+    rating_n = out["rating_n"].where(out["rating_n"] > 0)
+    sg_n = out["sg_n"].where(out["sg_n"] > 0)
+    out["rating_mean"] = out["rating_sum"] / rating_n
+    out["sg_mean"] = out["sg_sum"] / sg_n
+    var = (out["sg_sumsq"] / sg_n - out["sg_mean"] ** 2).clip(lower=0.0)
+    out["sg_std"] = np.sqrt(var * sg_n / (sg_n - 1).where(sg_n > 1))
+    return out
+
+
+class DatasetCache:
+    """Frame tipizzato condiviso dal processo, aggiornato per delta.
+
+    Se la generazione del backend non cambia e il watermark avanza, vengono
+    lette e convertite solo le righe nuove; altrimenti si rilegge tutto.
+    Con ``user`` la cache copre solo la partizione di quell'utente e, con
+    ``since``, il backend può saltare i mesi precedenti.
+    Il rollup (vedi ``build_rollup``) viene aggiornato con lo stesso delta.
+    Il frame restituito è condiviso tra le sessioni: non va modificato in place.
+    """
+
+    def __init__(
+        self, backend: StorageBackend, user: str | None = None, since: datetime.date | None = None
+    ) -> None:
+        self.backend = backend
+        self.user = user
+        self.since = since
+        self.frame = empty_frame()
+        self.rollup = build_rollup(self.frame)
+        self.generation: int | None = None
+        self.watermark = -1
+        # Token di ``revision()`` così come restituito (watermark -1 sul foglio pubblico)
+        self.token: tuple[int, int] | None = None
+        self._user_index: dict[str, np.ndarray] | None = None
+        self._lock = threading.Lock()
+
+    def _read_all(self) -> pd.DataFrame:
+        if self.user is None:
+            return self.backend.read_all()
+        return self.backend.read_user(self.user, since=self.since)
+
+    def _extend_user_index(self, delta: pd.DataFrame, offset: int) -> None:
+        if self._user_index is None:
+            return
+        for u, pos in delta.groupby("User", sort=False, observed=True).indices.items():
+            prev = self._user_index.get(u)
+            pos = pos + offset
+            self._user_index[u] = pos if prev is None else np.concatenate([prev, pos])
+
+    def _watermark_of(self, df: pd.DataFrame, fallback: int) -> int:
+        return self.backend.watermark_of(df, fallback)
+
+    def get(self) -> pd.DataFrame:
+        gen, mark = self.backend.revision()
+        with self._lock:
+            if (gen, mark) == self.token:
+                return self.frame
+            if gen == self.generation and mark > self.watermark >= 0:
+                try:
+                    delta = self.backend.read_since(self.watermark, user=self.user)
+                except NotImplementedError:
+                    delta = None
+                if delta is not None:
+                    if not delta.empty:
+                        offset = len(self.frame)
+                        typed = coerce_frame(delta)
+                        self.frame = concat_frames([self.frame, typed])
+                        self.rollup = merge_rollups(self.rollup, build_rollup(typed))
+                        self._extend_user_index(typed, offset)
+                    self.watermark = max(self._watermark_of(delta, mark), mark)
+                    self.token = (gen, mark)
+                    return self.frame
+            raw = self._read_all()
+            self.frame = coerce_frame(raw)
+            self.rollup = build_rollup(self.frame)
+            self._user_index = None
+            self.generation = gen
+            self.watermark = max(self._watermark_of(raw, mark), mark)
+            self.token = (gen, mark)
+            return self.frame
+
+    def _user_rows(self, user: str) -> pd.DataFrame:
+        """Righe di un solo utente tramite indice posizionale mantenuto per delta."""
+        if self._user_index is None:
+            self._user_index = dict(self.frame.groupby("User", sort=False, observed=True).indices)
+        pos = self._user_index.get(user)
+        if pos is None:
+            return self.frame.iloc[0:0]
+        return self.frame.iloc[pos]
+
+    @property
+    def loaded(self) -> bool:
+        return self.generation is not None
+
+    def snapshot(
+        self, user: str | None = None, refresh: bool = True
+    ) -> tuple[pd.DataFrame, pd.DataFrame, tuple[int, int]]:
+        """Frame, rollup e versione ``(generazione, watermark)`` coerenti tra loro.
+
+        Con ``refresh=False`` restituisce l'ultimo stato letto senza interrogare il backend.
+        """
+        if refresh:
+            self.get()
+        with self._lock:
+            frame, roll = self.frame, self.rollup
+            version = (int(self.generation or 0), self.watermark)
+            if user is not None and self.user is None:
+                frame = self._user_rows(user)
+                roll = roll[roll["User"] == user]
+        return frame, roll, version
+
+
+@st.cache_resource
+def get_dataset_cache() -> DatasetCache:
+    return DatasetCache(get_backend())
+
+
+@st.cache_resource(max_entries=128)
+def get_user_cache(user: str, since: datetime.date | None = None) -> DatasetCache:
+    return DatasetCache(get_backend(), user=user, since=since)
+
+
+@perf_span("load_data")
+def load_snapshot() -> tuple[pd.DataFrame, pd.DataFrame, tuple[int, int]]:
+    """Dataset completo, rollup e versione: lettura piena solo al primo accesso o dopo riscritture.
+
+    Se il backend non risponde si mostra l'ultimo stato letto, con un avviso.
+    """
+    cache = None
+    try:
+        cache = get_dataset_cache()
+        return cache.snapshot()
+    except Exception as exc:
+        stale = cache is not None and cache.loaded
+        report_backend_error(exc, stale)
+        if stale:
+            return cache.snapshot(refresh=False)
+        empty = empty_frame()
+        return empty, build_rollup(empty), (-1, -1)
+
+
+def load_data() -> pd.DataFrame:
+    """Dataset completo di tutti gli atleti."""
+    return load_snapshot()[0]
+
+
+@perf_span("load_user_snapshot")
+def load_user_snapshot(
+    user: str, since: datetime.date | None = None
+) -> tuple[pd.DataFrame, pd.DataFrame, tuple[int, int]]:
+    """Colpi, rollup e versione dati di ``user`` (partizione nativa se disponibile).
+
+    Con shard mensili e ``since`` si leggono solo i mesi da ``since`` in poi.
+    """
+    cache = None
+    try:
+        backend = get_backend()
+        if not backend.partitioned:
+            cache = get_dataset_cache()
+        else:
+            month = since.replace(day=1) if since is not None and backend.date_sharded else None
+            cache = get_user_cache(user, month)
+        return cache.snapshot(user)
+    except Exception as exc:
+        stale = cache is not None and cache.loaded
+        report_backend_error(exc, stale)
+        if stale:
+            return cache.snapshot(user, refresh=False)
+        empty = empty_frame()
+        return empty, build_rollup(empty), (-1, -1)
+
+
+def report_backend_error(exc: Exception, stale: bool) -> None:
+    """Errore di lettura visibile all'utente: mai una dashboard vuota senza spiegazione."""
+    if stale:
+        st.warning(
+            "Archivio dati non raggiungibile: mostro i dati dell'ultimo aggiornamento riuscito. "
+            "I nuovi colpi restano in coda e verranno sincronizzati."
+        )
+    else:
+        st.error("Archivio dati non raggiungibile e nessun dato in memoria: riprova tra poco.")
+    st.caption(f"Dettaglio: {type(exc).__name__}: {exc}")
+
+
+def load_user_data(user: str) -> pd.DataFrame:
+    """Solo i colpi di ``user``."""
+    return load_user_snapshot(user)[0]
+
+
+class LRUCache:
+    """Cache LRU limitata e thread-safe, condivisa dal processo."""
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self._data: OrderedDict[Any, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Any, compute: Any) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+        value = compute()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return value
+
+
+@st.cache_resource
+def get_review_cache() -> LRUCache:
+    return LRUCache(int(_secret("REVIEW_CACHE_ENTRIES", 256)))
+
+
+@st.cache_resource
+def get_figure_cache() -> LRUCache:
+    return LRUCache(int(_secret("FIGURE_CACHE_ENTRIES", 128)))
+
+
+def data_fingerprint(*parts: Any) -> str:
+    """Impronta stabile dei dati di input (frame, serie, array o scalari)."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, (pd.DataFrame, pd.Series)):
+            h.update(repr(list(part.columns) if isinstance(part, pd.DataFrame) else part.name).encode())
+            h.update(pd.util.hash_pandas_object(part, index=True).to_numpy().tobytes())
+        elif isinstance(part, np.ndarray):
+            h.update(str(part.dtype).encode())
+            h.update(np.ascontiguousarray(part).tobytes())
+        else:
+            h.update(repr(part).encode())
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def cached_figure(build: Any, *args: Any) -> go.Figure:
+    """Figura Plotly riusata se builder e dati in ingresso non sono cambiati."""
+    key = (build.__qualname__, data_fingerprint(*args))
+    return get_figure_cache().get_or_compute(key, lambda: build(*args))
+
+
+class ShotJournal:
+    """Giornale locale append-only (JSONL con fsync) dei colpi da sincronizzare.
+
+    Il file ``<path>.ckpt`` contiene l'offset fino a cui il backend ha
+    confermato la scrittura; quando tutto è sincronizzato il giornale si svuota.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        self.ckpt_path = self.path.with_name(self.path.name + ".ckpt")
+        self._lock = threading.Lock()
+        self._fh = open(self.path, "ab")
+
+    def append(self, row: dict[str, Any]) -> int:
+        """Scrive il colpo su disco e restituisce l'offset di fine riga."""
+        line = json.dumps({k: _sheet_cell(v) for k, v in row.items()}, ensure_ascii=False)
+        with self._lock:
+            self._fh.write(line.encode("utf-8") + b"\n")
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            return self._fh.tell()
+
+    def append_many(self, rows: list[dict[str, Any]]) -> list[int]:
+        """Come ``append`` per un lotto: una sola scrittura e un solo fsync."""
+        lines = [
+            json.dumps({k: _sheet_cell(v) for k, v in row.items()}, ensure_ascii=False).encode("utf-8") + b"\n"
+            for row in rows
+        ]
+        data = b"".join(lines)
+        with self._lock:
+            self._fh.write(data)
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            # Offset dalla posizione dopo la scrittura, come in ``append``
+            end = self._fh.tell()
+        ends = np.cumsum([len(line) for line in lines]) + (end - len(data))
+        return [int(e) for e in ends]
+
+    def checkpoint(self) -> int:
+        try:
+            return int(self.ckpt_path.read_text(encoding="ascii").strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def commit(self, offset: int) -> None:
+        """Registra come sincronizzato tutto fino a ``offset``."""
+        with self._lock:
+            compact = offset >= self._fh.tell()
+            # Checkpoint prima del troncamento: un crash in mezzo porta solo a
+            # un replay del giornale intero, che il backend rende idempotente
+            self._write_checkpoint(0 if compact else offset)
+            if compact:
+                # Niente in sospeso: si compatta il giornale
+                self._fh.truncate(0)
+                self._fh.seek(0)
+
+    def _write_checkpoint(self, offset: int) -> None:
+        tmp = self.ckpt_path.with_name(self.ckpt_path.name + ".tmp")
+        with open(tmp, "w", encoding="ascii") as fh:
+            fh.write(str(offset))
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.ckpt_path)
+
+    def unsynced(self) -> list[tuple[dict[str, Any], int]]:
+        """Colpi oltre il checkpoint con il rispettivo offset (riga troncata scartata)."""
+        with self._lock:
+            self._fh.flush()
+            with open(self.path, "rb") as fh:
+                fh.seek(self.checkpoint())
+                data = fh.read()
+                start = fh.tell() - len(data)
+        out = []
+        pos = start
+        for line in data.split(b"\n")[:-1]:
+            pos += len(line) + 1
+            try:
+                out.append((json.loads(line), pos))
+            except ValueError:
+                continue
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            self._fh.close()
+
+
+class ShotWriter:
+    """Scrittore unico per processo: accoda i colpi e li salva a lotti in background.
+
+    Ogni colpo riceve un ``Shot_ID`` e un ticket progressivo; con un giornale
+    locale viene prima scritto su disco, così la conferma non dipende dalla
+    rete. I lotti vengono scaricati dopo ``flush_seconds`` o al raggiungimento
+    di ``flush_rows`` righe. In caso di errore il lotto resta in testa alla coda
+    e si ritenta con backoff; i ritentativi e il replay del giornale all'avvio
+    saltano i colpi già arrivati al backend.
+    """
+
+    def __init__(
+        self,
+        backend: StorageBackend,
+        flush_seconds: float = 3.0,
+        flush_rows: int = 25,
+        journal: ShotJournal | None = None,
+    ) -> None:
+        self.backend = backend
+        self.flush_seconds = flush_seconds
+        self.flush_rows = flush_rows
+        self.journal = journal
+        self.last_error: str | None = None
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._pending: list[tuple[int, dict[str, Any], int]] = []
+        self._oldest = 0.0
+        self._next_ticket = 1
+        self._flushed_upto = 0
+        self._replay = False
+        self._stop = threading.Event()
+        if journal is not None:
+            recovered = journal.unsynced()
+            if recovered:
+                self._oldest = time.monotonic()
+                self._replay = True
+            for row, offset in recovered:
+                self._pending.append((self._next_ticket, row, offset))
+                self._next_ticket += 1
+        self._thread = threading.Thread(target=self._run, name="shot-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def submit(self, row: dict[str, Any]) -> int:
+        row = {**row, "Shot_ID": row.get("Shot_ID") or uuid.uuid4().hex}
+        offset = self.journal.append(row) if self.journal is not None else 0
+        with self._cond:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append((ticket, row, offset))
+            if len(self._pending) == 1 or len(self._pending) >= self.flush_rows:
+                # Primo colpo in coda: il thread passa dall'attesa libera al timer di flush
+                self._cond.notify()
+            return ticket
+
+    def submit_many(self, rows: list[dict[str, Any]], dedupe: bool = False) -> list[int]:
+        """Accoda un lotto intero (import): un solo giornale e un solo append al backend.
+
+        Con ``dedupe`` il prossimo append salta gli ``Shot_ID`` già presenti.
+        """
+        rows = [{**row, "Shot_ID": row.get("Shot_ID") or uuid.uuid4().hex} for row in rows]
+        offsets = self.journal.append_many(rows) if self.journal is not None else [0] * len(rows)
+        with self._cond:
+            first = self._next_ticket
+            self._next_ticket += len(rows)
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.extend(zip(range(first, first + len(rows)), rows, offsets))
+            self._replay = self._replay or dedupe
+            self._cond.notify()
+        return list(range(first, first + len(rows)))
+
+    def is_flushed(self, ticket: int) -> bool:
+        with self._cond:
+            return ticket <= self._flushed_upto
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def _wait_due(self) -> None:
+        with self._cond:
+            while not self._stop.is_set():
+                if self._pending:
+                    due = self._oldest + self.flush_seconds - time.monotonic()
+                    if due <= 0 or len(self._pending) >= self.flush_rows:
+                        return
+                    self._cond.wait(timeout=due)
+                else:
+                    self._cond.wait()
+
+    def _write_pending(self) -> bool:
+        with self._io_lock:
+            with self._cond:
+                batch = list(self._pending)
+                self._pending.clear()
+            if not batch:
+                return True
+            try:
+                # Dopo un errore l'append può essere arrivato a metà: si salta il già scritto
+                self.backend.append(pd.DataFrame([row for _, row, _ in batch]), skip_existing=self._replay)
+            except Exception as exc:
+                self.last_error = str(exc)
+                self._replay = True
+                with self._cond:
+                    # Il lotto torna in testa: l'ordine dei ticket resta stabile
+                    self._pending[:0] = batch
+                    self._oldest = time.monotonic()
+                return False
+            if self.journal is not None:
+                self.journal.commit(batch[-1][2])
+            with self._cond:
+                self._flushed_upto = batch[-1][0]
+            self._replay = False
+            self.last_error = None
+        return True
+
+    def _run(self) -> None:
+        backoff = 1.0
+        while True:
+            self._wait_due()
+            if self._stop.is_set():
+                return
+            if self._write_pending():
+                backoff = 1.0
+            elif self._stop.wait(backoff):
+                return
+            else:
+                backoff = min(backoff * 2, 60.0)
+
+    def flush(self) -> bool:
+        """Scarica subito quanto in coda (usato anche allo spegnimento)."""
+        return self._write_pending()
+
+    def close(self) -> bool:
+        """Ultimo flush, poi ferma il thread e chiude il giornale (benchmark e test)."""
+        with self._cond:
+            self._stop.set()
+            self._cond.notify()
+        self._thread.join()
+        atexit.unregister(self.flush)
+        ok = self._write_pending()
+        if self.journal is not None:
+            self.journal.close()
+        return ok
+
+
+@st.cache_resource
+def get_writer() -> ShotWriter:
+    cfg = _secret("storage", {}) or {}
+    return ShotWriter(
+        get_backend(),
+        flush_seconds=float(cfg.get("flush_seconds", 3.0)),
+        flush_rows=int(cfg.get("flush_rows", 25)),
+        journal=ShotJournal(str(cfg.get("journal_path", "supernova_journal.jsonl"))),
+    )
+
+
+def recompute_strokes_gained(backend: StorageBackend) -> int:
+    """Ricalcola lo SG di tutto lo storico con il modello corrente.
+
+    Solo le righe con valore o versione diversi vengono riscritte, in
+    un'unica ``update_rows`` sulle colonne ``Strokes_Gained``/``SG_Model``.
+    Restituisce il numero di righe aggiornate.
+    """
+    # Righe grezze: le distanze restano float64 (lo schema compatto le porta a float32)
+    df = align_dataframe(backend.read_all())
+    if df.empty:
+        return 0
+    new_sg = compute_sg_frame(df)
+    old_sg = pd.to_numeric(df["Strokes_Gained"], errors="coerce").to_numpy(dtype=float)
+    current = _as_labels(df["SG_Model"]) == SG_MODEL_VERSION
+    same = np.isclose(old_sg, new_sg, rtol=0.0, atol=1e-9, equal_nan=True) & current
+    todo = ~same & np.isfinite(new_sg)
+    if not todo.any():
+        return 0
+    changed = df.loc[todo, ["Strokes_Gained", "SG_Model"]].copy()
+    changed["Strokes_Gained"] = new_sg[todo]
+    changed["SG_Model"] = SG_MODEL_VERSION
+    backend.update_rows(changed, columns=["Strokes_Gained", "SG_Model"])
+    return int(todo.sum())
+
+
+@perf_span("save_shot")
+def save_shot(row: dict[str, Any]) -> int:
+    """Accoda il colpo al writer e restituisce subito il ticket."""
+    ticket = get_writer().submit(row)
+    st.session_state.setdefault("save_tickets", []).append(ticket)
+    close_shot_cpu()
+    return ticket
+
+
+# Con colpi in coda l'indicatore si aggiorna da solo a questo intervallo
+SAVE_STATUS_POLL_SECONDS = 2.0
+
+
+def render_save_status() -> None:
+    """Indicatore colpi in attesa / salvati per la sessione corrente.
+
+    I passaggi del wizard rieseguono solo il loro frammento: finché ci sono
+    colpi in coda l'indicatore è un frammento che si riesegue da solo.
+    """
+    tickets = st.session_state.get("save_tickets", [])
+    if not tickets:
+        return
+    writer = get_writer()
+    waiting = any(not writer.is_flushed(t) for t in tickets)
+    st.fragment(_save_status_body, run_every=SAVE_STATUS_POLL_SECONDS if waiting else None)()
+
+
+def _save_status_body() -> None:
+    writer = get_writer()
+    tickets = st.session_state.get("save_tickets", [])
+    pending = [t for t in tickets if not writer.is_flushed(t)]
+    st.session_state["save_tickets"] = pending
+    if pending:
+        st.caption(f"⏳ {len(pending)} colpi in salvataggio…")
+        if writer.last_error:
+            st.caption("Foglio non raggiungibile: nuovo tentativo automatico in corso.")
+    else:
+        st.caption("✅ Tutti i colpi sono salvati.")
+
+
+# =============================================================================
+# Splash & login
+# =============================================================================
+SPLASH_SLIDES = ["The first…", "the easiest…", "the original RANGE DATA SUITE"]
+SPLASH_SLIDE_SECONDS = 1.2
+
+
+def render_splash() -> None:
+    """Splash animata solo lato browser: non blocca lo script e si salta con un tocco."""
+    step = SPLASH_SLIDE_SECONDS
+    total = step * (len(SPLASH_SLIDES) + 1)
+    uri = logo_data_uri()
+    logo = (
+        f"<img src='{uri}' alt='Supernova' />"
+        if uri
+        else f"<h1 style='color:{GOLD};'>SUPERNOVA</h1>"
+    )
+    slides = [f"{logo}<p style='color:{MUTED};'>Range Data Suite</p>"] + [
+        f"<h2 style='color:{GOLD_DARK};'>{msg}</h2>" for msg in SPLASH_SLIDES
+    ]
+    body = "".join(
+        f"<div class='sn-splash-slide' style='animation-delay:{i * step:.2f}s'>{html}</div>"
+        for i, html in enumerate(slides)
+    )
+    st.markdown(
+        f"""
+<style>
+    #sn-splash-skip {{ display: none; }}
+    .sn-splash {{
+        position: fixed;
+        inset: 0;
+        z-index: 999999;
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        background: {WHITE};
+        cursor: pointer;
+        animation: sn-splash-out 0.4s ease-in {total:.2f}s forwards;
+    }}
+    #sn-splash-skip:checked + .sn-splash {{ display: none; }}
+    .sn-splash-slide {{
+        position: absolute;
+        width: min(80vw, 420px);
+        text-align: center;
+        opacity: 0;
+        animation: sn-splash-slide {step:.2f}s ease-in-out both;
+    }}
+    .sn-splash-slide img {{ width: 100%; height: auto; }}
+    .sn-splash-hint {{
+        position: absolute;
+        bottom: 2rem;
+        color: {MUTED};
+        font-size: 0.8rem;
+    }}
+    @keyframes sn-splash-slide {{
+        0% {{ opacity: 0; }}
+        15%, 85% {{ opacity: 1; }}
+        100% {{ opacity: 0; }}
+    }}
+    @keyframes sn-splash-out {{
+        to {{ opacity: 0; visibility: hidden; pointer-events: none; }}
+    }}
+</style>
+<input type="checkbox" id="sn-splash-skip" />
+<label class="sn-splash" for="sn-splash-skip">
+    {body}
+    <span class="sn-splash-hint">Tocca per saltare</span>
+</label>
+""",
+        unsafe_allow_html=True,
+    )
+
+
+def login_screen() -> None:
+    brand_header("Accesso")
+    st.caption("Inserisci le credenziali per salvare i tuoi colpi sul foglio collegato.")
+    u = st.text_input("Username / ID atleta", key="login_user").strip()
+    p = st.text_input("Password", type="password", key="login_pass")
+    privacy = st.checkbox(
+        "Ho letto e accetto l'informativa privacy e il trattamento dei dati.",
+        key="privacy_ok",
+    )
+    if st.button("Entra nella suite", type="primary", use_container_width=True):
+        if not privacy:
+            st.error("È necessario accettare la privacy policy.")
+            return
+        if not u:
+            st.error("Inserisci uno username.")
+            return
+        pwd_ok = p == PASSWORD_DEFAULT
+        env_p = None
+        try:
+            env_p = st.secrets.get("APP_PASSWORD")
+        except Exception:
+            env_p = None
+        if env_p:
+            pwd_ok = pwd_ok or (p == str(env_p))
+        if pwd_ok:
+            st.session_state["logged_in"] = True
+            st.session_state["user"] = u.upper()
+            st.rerun()
+        else:
+            st.error("Credenziali non valide.")
+    brand_footer()
+    st.stop()
+
+
+# =============================================================================
+# Helpers UI wizard
+# =============================================================================
+def track_shot_cpu(t0: float) -> None:
+    """Accumula la CPU server (thread dello script) spesa sul colpo in corso."""
+    st.session_state["shot_cpu_s"] = st.session_state.get("shot_cpu_s", 0.0) + time.thread_time() - t0
+    st.session_state["shot_cpu_runs"] = st.session_state.get("shot_cpu_runs", 0) + 1
+
+
+def close_shot_cpu() -> None:
+    st.session_state["last_shot_cpu"] = (
+        st.session_state.pop("shot_cpu_s", 0.0),
+        st.session_state.pop("shot_cpu_runs", 0),
+    )
+
+
+def rerun_wizard() -> None:
+    """Rerun del solo frammento wizard; durante un run completo Streamlit lo vieta."""
+    st.rerun(scope="app" if st.session_state.get("_full_run") else "fragment")
+
+
+def reset_wizard() -> None:
+    for k in list(st.session_state.keys()):
+        if k.startswith("wz_"):
+            del st.session_state[k]
+    st.session_state["wz_cat"] = None
+    st.session_state["wz_step"] = 0
+
+
+def lat_sign(direction: str, lateral_abs: float) -> float:
+    if direction.startswith("A destra"):
+        return float(abs(lateral_abs))
+    if direction.startswith("A sinistra"):
+        return -float(abs(lateral_abs))
+    return 0.0
+
+
+def depth_sign(depth_m: float, label: str) -> float:
+    """Profondità: positivo = lungo, negativo = corto (optional convention)."""
+    if label == "Corto del bersaglio":
+        return -abs(depth_m)
+    if label == "Lungo del bersaglio":
+        return abs(depth_m)
+    return 0.0
+
+
+PERIOD_DAYS = {"Ultimi 7 giorni": 7, "Ultimo mese": 30, "Ultimi 6 mesi": 182, "Ultimo anno": 365}
+
+
+def period_start(period: str) -> datetime.date | None:
+    """Primo giorno coperto dal periodo; None se non limitato nel tempo."""
+    days = PERIOD_DAYS.get(period)
+    return datetime.date.today() - datetime.timedelta(days=days) if days else None
+
+
+def period_mask(df: pd.DataFrame, session_name: str, period: str) -> pd.Series | None:
+    """Righe nel periodo come maschera booleana; None se il periodo non filtra."""
+    if period == "Sessione corrente":
+        return df["SessionName"] == session_name
+    start = period_start(period)
+    return df["Date"] >= pd.Timestamp(start) if start is not None else None
+
+
+@perf_span("filter_period")
+def filter_period(df: pd.DataFrame, session_name: str, period: str) -> pd.DataFrame:
+    if df.empty:
+        return df
+    mask = period_mask(df, session_name, period)
+    return df if mask is None else df[mask]
+
+
+# Torte specifiche per settore (voto e reazione mentale si aggiungono sempre)
+SECTOR_PIES = {
+    "RANGE": ["Impact", "Curvature", "Direction_LR"],
+    "SHORT": ["Lie_Start", "Lie_End", "Impact", "Direction_LR"],
+    "PUTT": ["Impact", "Trajectory"],
+}
+
+
+def pie_counts(df: pd.DataFrame, column: str) -> pd.Series | None:
+    """Conteggi per categoria; None se non ci sono righe."""
+    if df.empty or column not in df.columns:
+        return None
+    if column == "Rating":
+        s = pd.to_numeric(df[column], errors="coerce").dropna().astype(int).astype(str)
+    else:
+        s = df[column].astype(str)
+    s = s.replace("nan", "(vuoto)").replace("", "(vuoto)")
+    return s.value_counts()
+
+
+@perf_span("plot_pie")
+def plot_pie(counts: pd.Series | None, title: str, legend_help: str) -> None:
+    if counts is None:
+        st.info("Nessun dato per questo grafico.")
+        return
+    if counts.empty:
+        st.info("Nessuna categoria disponibile.")
+        return
+    st.plotly_chart(cached_figure(_pie_figure, counts, title), use_container_width=True)
+    st.caption(legend_help)
+
+
+def _pie_figure(counts: pd.Series, title: str) -> go.Figure:
+    fig = px.pie(
+        values=counts.values,
+        names=counts.index,
+        title=title,
+        hole=0.35,
+        color_discrete_sequence=px.colors.sequential.YlOrBr,
+    )
+    fig.update_traces(textposition="inside", textinfo="percent+label")
+    fig.update_layout(
+        legend_title_text="Legenda",
+        font=dict(color=TEXT),
+        title=dict(font=dict(size=18, color=GOLD_DARK)),
+        margin=dict(t=48, b=24, l=24, r=24),
+    )
+    return fig
+
+
+def dispersion_points(df: pd.DataFrame) -> pd.DataFrame | None:
+    """Colpi con errore laterale e in profondità; None se non ci sono righe."""
+    if df.empty:
+        return None
+    d = df[["Proximity_Lateral_m", "Proximity_Depth_m", "Club", "Impact", "Rating", "Date"]].rename(
+        columns={"Proximity_Lateral_m": "x_lateral_m", "Proximity_Depth_m": "y_depth_m"}
+    )
+    return d.dropna(subset=["x_lateral_m", "y_depth_m"])
+
+
+DISPERSION_DENSITY_THRESHOLD = 2000
+DISPERSION_DENSITY_BINS = 40
+DISPERSION_LABELS = {
+    "x_lateral_m": "Errore laterale (m): sinistra ← 0 → destra",
+    "y_depth_m": "Errore in profondità (m): indietro ← 0 → avanti",
+}
+
+
+@perf_span("plot_dispersion")
+def plot_dispersion(points: pd.DataFrame | None, title: str) -> None:
+    if points is None:
+        return
+    if points.empty:
+        st.info("Aggiungi errore laterale e profondità per vedere la dispersione dall’alto.")
+        return
+    # Oltre soglia i singoli punti non sono più leggibili e pesano sul telefono: mappa di densità
+    threshold = int(_secret("DISPERSION_DENSITY_THRESHOLD", DISPERSION_DENSITY_THRESHOLD))
+    if len(points) > threshold:
+        fig = cached_figure(_density_figure, points[["x_lateral_m", "y_depth_m"]], title)
+        caption = (
+            f"{len(points)} colpi: vista a densità, le zone più scure raccolgono più colpi. "
+            "Incrocio delle linee = bersaglio; asse orizzontale sinistra/destra, verticale corto/lungo."
+        )
+    else:
+        fig = cached_figure(_dispersion_figure, points, title)
+        caption = (
+            "Ogni punto è un colpo visto dall’alto: incrocio delle linee = bersaglio. "
+            "L’asse orizzontale è l’errore a sinistra/destra, quello verticale corto/lungo."
+        )
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(caption)
+
+
+def _dispersion_figure(points: pd.DataFrame, title: str) -> go.Figure:
+    fig = px.scatter(
+        points,
+        x="x_lateral_m",
+        y="y_depth_m",
+        color="Club",
+        hover_data=["Impact", "Rating", "Date"],
+        title=title,
+        labels=DISPERSION_LABELS,
+        render_mode="webgl",
+    )
+    fig.add_vline(x=0, line_dash="dash", line_color=GOLD)
+    fig.add_hline(y=0, line_dash="dash", line_color=GOLD)
+    fig.update_layout(
+        legend_title_text="Legenda",
+        font=dict(color=TEXT),
+    )
+    return fig
+
+
+def _density_figure(points: pd.DataFrame, title: str) -> go.Figure:
+    """Contorni di densità 2D binnati lato server: il payload dipende dalla griglia, non dai colpi."""
+    x = points["x_lateral_m"].to_numpy(dtype=float)
+    y = points["y_depth_m"].to_numpy(dtype=float)
+    z, xe, ye = np.histogram2d(x, y, bins=DISPERSION_DENSITY_BINS)
+    fig = go.Figure(
+        go.Contour(
+            x=(xe[:-1] + xe[1:]) / 2,
+            y=(ye[:-1] + ye[1:]) / 2,
+            z=z.T,
+            colorscale="YlOrBr",
+            contours=dict(coloring="heatmap", showlines=False),
+            colorbar=dict(title="Colpi"),
+        )
+    )
+    fig.add_vline(x=0, line_dash="dash", line_color=GOLD)
+    fig.add_hline(y=0, line_dash="dash", line_color=GOLD)
+    fig.update_layout(
+        title=title,
+        xaxis_title=DISPERSION_LABELS["x_lateral_m"],
+        yaxis_title=DISPERSION_LABELS["y_depth_m"],
+        font=dict(color=TEXT),
+    )
+    return fig
+
+
+def putting_make_frame(df_putt: pd.DataFrame) -> pd.DataFrame | None:
+    """Bucket da 15 m in giù ogni 2 m; None se non ci sono putt."""
+    if df_putt.empty:
+        return None
+    sd = df_putt["Start_Dist_m"].to_numpy(dtype=float)
+    made_all = np.nan_to_num(df_putt["End_Dist_m"].to_numpy(dtype=float), nan=999.0) <= 0
+    rows = []
+    for hi in range(15, 0, -2):
+        lo = max(hi - 2, 0)
+        in_bucket = (sd > lo) & (sd <= hi)
+        n = int(in_bucket.sum())
+        made = int((made_all & in_bucket).sum())
+        pct = (made / n * 100.0) if n else 0.0
+        rows.append({"Fascia di partenza": f"{lo}–{hi} m", "Putt": n, "Realizzati": made, "% Made": pct})
+    return pd.DataFrame(rows)
+
+
+@perf_span("putting_make_table")
+def putting_make_table(table: pd.DataFrame | None) -> None:
+    if table is None:
+        st.info("Nessun putt nel periodo.")
+        return
+    st.markdown("#### Tabella realizzazione putt per distanza di partenza")
+    st.caption(
+        "Percentuale di putt chiusi in buca al primo tentativo (distanza finale = 0 m), "
+        "raggruppati per ampiezza di 2 metri fino a 15 m."
+    )
+    st.dataframe(
+        table.style.format({"% Made": "{:.1f}%"}),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+
+def sg_summary_stats(df_sector: pd.DataFrame) -> dict[str, Any]:
+    """Metriche SG e istogramma a 20 classi del settore."""
+    if df_sector.empty:
+        return {"status": "no_rows"}
+    sg = df_sector["Strokes_Gained"].dropna()
+    if sg.empty:
+        return {"status": "no_sg"}
+    counts, edges = np.histogram(sg.to_numpy(dtype=float), bins=20)
+    return {
+        "status": "ok",
+        "mean": float(sg.mean()),
+        "sum": float(sg.sum()),
+        "n": int(len(sg)),
+        "max": float(sg.max()),
+        "hist_counts": counts,
+        "hist_edges": edges,
+    }
+
+
+@perf_span("sg_summary_table")
+def sg_summary_table(stats: dict[str, Any]) -> None:
+    if stats["status"] == "no_rows":
+        st.info("Nessuno strokes gained: dati assenti per questo settore.")
+        return
+    if stats["status"] == "no_sg":
+        st.info("Colonna strokes gained vuota per questo periodo.")
+        return
+    st.markdown("#### Riepilogo Strokes Gained (modello practice)")
+    st.caption(
+        "Valori positivi indicano un colpo migliore della media di riferimento usata dal modello "
+        "(approssimazione didattica, non ufficiale PGA)."
+    )
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Media SG", f"{stats['mean']:+.3f}")
+    c2.metric("Totale SG", f"{stats['sum']:+.3f}")
+    c3.metric("Colpi", f"{stats['n']}")
+    c4.metric("Migliore", f"{stats['max']:+.3f}")
+    hist = cached_figure(_sg_hist_figure, stats["hist_counts"], stats["hist_edges"])
+    st.plotly_chart(hist, use_container_width=True)
+
+
+def _sg_hist_figure(counts: np.ndarray, edges: np.ndarray) -> go.Figure:
+    hist = go.Figure(
+        go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=counts,
+            width=np.diff(edges),
+            marker_color=GOLD,
+        )
+    )
+    hist.update_layout(
+        title="Distribuzione SG colpo per colpo",
+        xaxis_title="Strokes gained per colpo",
+        yaxis_title="Numero di colpi",
+        showlegend=False,
+        bargap=0,
+    )
+    return hist
+
+
+@perf_span("sg_baseline_comparison")
+def sg_baseline_comparison(df_sector: pd.DataFrame, names: list[str]) -> None:
+    """SG del settore ricalcolato contro più baseline, affiancate."""
+    if df_sector.empty or not names:
+        return
+    baselines = load_baselines()
+    sg = sg_by_baseline(df_sector, names)
+    rows = []
+    for name in names:
+        col = sg[name].dropna()
+        rows.append(
+            {
+                "Baseline": baselines[name]["label"] or name,
+                "Colpi": len(col),
+                "SG medio": col.mean() if len(col) else np.nan,
+                "SG totale": col.sum(),
+            }
+        )
+    st.markdown("#### Confronto baseline")
+    st.caption(
+        "Lo stesso campione misurato contro riferimenti diversi: un valore positivo "
+        "indica colpi migliori della media di quel livello di gioco."
+    )
+    st.dataframe(
+        pd.DataFrame(rows).style.format({"SG medio": "{:+.3f}", "SG totale": "{:+.2f}"}),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+
+def satisfaction_breakdown(pies: dict[str, pd.Series | None]) -> None:
+    plot_pie(
+        pies["Rating"],
+        "Distribuzione voto colpo (1–5)",
+        "Legenda: percentuale di colpi per ogni voto di qualità auto-valutata.",
+    )
+    plot_pie(
+        pies["Mental_Reaction"],
+        "Reazione mentale",
+        "Legenda: mix delle reazioni emotive/cognitive dichiarate dopo il colpo.",
+    )
+
+
+@perf_span("trend_panel")
+def trend_panel(roll_sector: pd.DataFrame, sector_label: str) -> None:
+    """Trend giornaliero letto dal rollup del settore."""
+    d = roll_sector.dropna(subset=["Date"])
+    if d.empty:
+        return
+    grp = rollup_means(
+        d.groupby("Date", as_index=False)[ROLLUP_VALUES].sum().sort_values("Date")
+    )
+    st.markdown("#### Trend giornaliero")
+    st.caption(
+        "Linea oro = voto medio; linea scura = strokes gained medio per giorno. "
+        "Serve a capire se la qualità sale o scende nel tempo."
+    )
+    st.plotly_chart(
+        cached_figure(_trend_figure, grp[["Date", "rating_mean", "sg_mean"]], sector_label),
+        use_container_width=True,
+    )
+
+
+def _trend_figure(grp: pd.DataFrame, sector_label: str) -> go.Figure:
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scatter(
+            x=grp["Date"],
+            y=grp["rating_mean"],
+            mode="lines+markers",
+            name="Voto medio",
+            line=dict(color=GOLD, width=3),
+        )
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=grp["Date"],
+            y=grp["sg_mean"],
+            mode="lines+markers",
+            name="SG medio",
+            line=dict(color="#5c4a12", width=2),
+            yaxis="y2",
+        )
+    )
+    fig.update_layout(
+        title=f"Andamento performance - {sector_label}",
+        xaxis_title="Data",
+        yaxis=dict(title="Voto medio (1-5)"),
+        yaxis2=dict(title="SG medio", overlaying="y", side="right"),
+        legend_title_text="Legenda",
+        margin=dict(t=48, b=24, l=24, r=24),
+    )
+    return fig
+
+
+@perf_span("club_breakdown_table")
+def club_breakdown_table(roll_sector: pd.DataFrame) -> None:
+    """Ranking per bastone dalle somme del rollup."""
+    if roll_sector.empty:
+        return
+    agg = rollup_means(roll_sector.groupby("Club", as_index=False)[ROLLUP_VALUES].sum())
+    g = agg.rename(
+        columns={"n": "Colpi", "rating_mean": "Voto_medio", "sg_mean": "SG_medio", "sg_std": "SG_dev_std"}
+    )[["Club", "Colpi", "Voto_medio", "SG_medio", "SG_dev_std"]].sort_values(
+        ["Colpi", "Voto_medio"], ascending=[False, False]
+    )
+    if g.empty:
+        return
+    st.markdown("#### Ranking bastoni (nel filtro scelto)")
+    st.caption(
+        "Tabella sintetica per bastone: volume, voto medio, strokes gained medio e sua dispersione."
+    )
+    st.dataframe(
+        g.style.format({"Voto_medio": "{:.2f}", "SG_medio": "{:+.3f}", "SG_dev_std": "{:.3f}"}),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+
+# =============================================================================
+# Wizard inserimento colpo
+# =============================================================================
+def wizard_range(session_name: str, user: str) -> None:
+    st.session_state.setdefault("wz_step", 0)
+    step = st.session_state["wz_step"]
+    shot: dict[str, Any] = st.session_state.setdefault("wz_payload", {})
+
+    if step == 0:
+        st.markdown("#### Bastone")
+        cols = st.columns(3)
+        for i, cl in enumerate(CLUBS_LONG):
+            if cols[i % 3].button(cl, key=f"cl{i}"):
+                shot["Club"] = cl
+                st.session_state["wz_step"] = 1
+                rerun_wizard()
+    elif step == 1:
+        st.markdown("#### Impatto")
+        for opt in LONG_IMPACT:
+            if st.button(opt, key=f"im{opt}", use_container_width=True):
+                shot["Impact"] = opt
+                st.session_state["wz_step"] = 2
+                rerun_wizard()
+    elif step == 2:
+        st.markdown("#### Curvatura palla")
+        for opt in LONG_CURVE:
+            if st.button(opt, key=f"cv{opt}", use_container_width=True):
+                shot["Curvature"] = opt
+                shot["Trajectory"] = ""
+                st.session_state["wz_step"] = 3
+                rerun_wizard()
+    elif step == 3:
+        st.markdown("#### Posizione rispetto al bersaglio (linea)")
+        for opt in LONG_DIR:
+            if st.button(opt, key=f"dir{opt}", use_container_width=True):
+                shot["Direction_LR"] = opt
+                st.session_state["wz_step"] = 4
+                rerun_wizard()
+    elif step == 4:
+        st.markdown("#### Errore laterale (metri assoluti)")
+        lat = st.number_input("Metri a destra/sinistra dal punto mirato", min_value=0.0, step=0.5)
+        if st.button("Conferma errore laterale", use_container_width=True):
+            shot["Proximity_Lateral_m"] = lat_sign(shot["Direction_LR"], lat)
+            st.session_state["wz_step"] = 5
+            rerun_wizard()
+    elif step == 5:
+        st.markdown("#### Errore in profondità (per mappa dall’alto)")
+        depth_amt = st.number_input("Quanti metri corto/lungo?", min_value=0.0, step=0.5)
+        sense = st.radio("Senso", ["In linea col bersaglio", "Corto del bersaglio", "Lungo del bersaglio"])
+        if st.button("Conferma profondità", use_container_width=True):
+            shot["Proximity_Depth_m"] = depth_sign(depth_amt, sense)
+            st.session_state["wz_step"] = 6
+            rerun_wizard()
+    elif step == 6:
+        st.markdown("#### Voto colpo (1–5)")
+        cols = st.columns(5)
+        for v in range(1, 6):
+            if cols[v - 1].button(str(v)):
+                shot["Rating"] = v
+                st.session_state["wz_step"] = 7
+                rerun_wizard()
+    elif step == 7:
+        st.markdown("#### Reazione mentale")
+        for opt in MENTAL_OPTIONS:
+            if st.button(opt, key=f"mn{opt}", use_container_width=True):
+                shot["Mental_Reaction"] = opt
+                st.session_state["wz_step"] = 8
+                rerun_wizard()
+    elif step == 8:
+        st.markdown("#### Dati per Strokes Gained — gioco lungo")
+        shot["Lie_Long"] = st.radio("Lie di partenza", ["Tee", "Fairway"])
+        shot["Hole_Dist_Start_m"] = st.number_input(
+            "Distanza dalla buca prima del colpo (metri)", min_value=0.0, step=5.0
+        )
+        shot["Hole_Dist_End_m"] = st.number_input(
+            "Distanza dalla buca dopo il colpo (metri)", min_value=0.0, step=5.0
+        )
+        lie_after = st.selectbox(
+            "Lie dopo il colpo (per il modello)",
+            ["Fairway", "Rough", "Bunker"],
+        )
+        if st.button("Calcola e salva colpo", type="primary", use_container_width=True):
+            from_tee = shot["Lie_Long"] == "Tee"
+            sg = compute_sg_long(
+                float(shot["Hole_Dist_Start_m"]),
+                float(shot["Hole_Dist_End_m"]),
+                from_tee,
+                lie_after,
+            )
+            row = {
+                "User": user,
+                "Date": datetime.date.today(),
+                "SessionName": session_name,
+                "Time": datetime.datetime.now().strftime("%H:%M"),
+                "Category": "RANGE",
+                "Club": shot.get("Club", ""),
+                "Impact": shot.get("Impact", ""),
+                "Curvature": shot.get("Curvature", ""),
+                "Trajectory": "",
+                "Lie_Start": shot.get("Lie_Long", ""),
+                "Lie_End": lie_after,
+                "Direction_LR": shot.get("Direction_LR", ""),
+                "Proximity_Lateral_m": shot.get("Proximity_Lateral_m", np.nan),
+                "Proximity_Depth_m": shot.get("Proximity_Depth_m", np.nan),
+                "Start_Dist_m": shot.get("Hole_Dist_Start_m", np.nan),
+                "End_Dist_m": shot.get("Hole_Dist_End_m", np.nan),
+                "Hole_Dist_Start_m": shot.get("Hole_Dist_Start_m", np.nan),
+                "Hole_Dist_End_m": shot.get("Hole_Dist_End_m", np.nan),
+                "Lie_Long": shot.get("Lie_Long", ""),
+                "Rating": shot.get("Rating", np.nan),
+                "Mental_Reaction": shot.get("Mental_Reaction", ""),
+                "Strokes_Gained": sg,
+                "SG_Model": SG_MODEL_VERSION,
+            }
+            save_shot(row)
+            st.success("Colpo RANGE salvato.")
+            reset_wizard()
+            # Rerun completo solo a colpo salvato: aggiorna lo stato salvataggi in sidebar
+            st.rerun()
+    if st.button("Annulla inserimento", key="cancel_r"):
+        reset_wizard()
+        rerun_wizard()
+
+
+def wizard_short(session_name: str, user: str) -> None:
+    st.session_state.setdefault("wz_step", 0)
+    step = st.session_state["wz_step"]
+    shot: dict[str, Any] = st.session_state.setdefault("wz_payload", {})
+
+    if step == 0:
+        st.markdown("#### Bastone")
+        cols = st.columns(4)
+        for i, cl in enumerate(CLUBS_SHORT):
+            if cols[i % 4].button(cl, key=f"scl{i}"):
+                shot["Club"] = cl
+                st.session_state["wz_step"] = 1
+                rerun_wizard()
+    elif step == 1:
+        shot["Start_Dist_m"] = st.number_input(
+            "Distanza iniziale dalla buca (metri)", min_value=0.0, max_value=50.0, step=1.0
+        )
+        if st.button("Conferma distanza", use_container_width=True):
+            st.session_state["wz_step"] = 2
+            rerun_wizard()
+    elif step == 2:
+        st.markdown("#### Lie iniziale")
+        for opt in SHORT_LIE_START:
+            if st.button(opt, key=f"ls{opt}", use_container_width=True):
+                shot["Lie_Start"] = opt
+                st.session_state["wz_step"] = 3
+                rerun_wizard()
+    elif step == 3:
+        shot["End_Dist_m"] = st.number_input("Distanza finale dalla buca (metri)", min_value=0.0, step=0.5)
+        if st.button("Conferma distanza finale", use_container_width=True):
+            st.session_state["wz_step"] = 4
+            rerun_wizard()
+    elif step == 4:
+        st.markdown("#### Lie finale")
+        for opt in SHORT_LIE_END:
+            if st.button(opt, key=f"le{opt}", use_container_width=True):
+                shot["Lie_End"] = opt
+                st.session_state["wz_step"] = 5
+                rerun_wizard()
+    elif step == 5:
+        st.markdown("#### Impatto")
+        for opt in SHORT_IMPACT:
+            if st.button(opt, key=f"sim{opt}", use_container_width=True):
+                shot["Impact"] = opt
+                shot["Curvature"] = ""
+                st.session_state["wz_step"] = 6
+                rerun_wizard()
+    elif step == 6:
+        st.markdown("#### Direzione rispetto alla buca")
+        for opt in SHORT_DIR:
+            if st.button(opt, key=f"sd{opt}", use_container_width=True):
+                shot["Direction_LR"] = opt
+                st.session_state["wz_step"] = 7
+                rerun_wizard()
+    elif step == 7:
+        lat = st.number_input("Metri a destra/sinistra dalla buca", min_value=0.0, step=0.5)
+        if st.button("Conferma errore laterale", use_container_width=True):
+            shot["Proximity_Lateral_m"] = lat_sign(shot["Direction_LR"], lat)
+            st.session_state["wz_step"] = 8
+            rerun_wizard()
+    elif step == 8:
+        depth_amt = st.number_input("Metri corto/lungo rispetto alla buca", min_value=0.0, step=0.5)
+        sense = st.radio("Senso", ["In linea", "Corto", "Lungo"])
+        conv = {"In linea": "In linea col bersaglio", "Corto": "Corto del bersaglio", "Lungo": "Lungo del bersaglio"}
+        if st.button("Conferma profondità", use_container_width=True):
+            shot["Proximity_Depth_m"] = depth_sign(depth_amt, conv[sense])
+            st.session_state["wz_step"] = 9
+            rerun_wizard()
+    elif step == 9:
+        st.markdown("#### Voto (1–5)")
+        cols = st.columns(5)
+        for v in range(1, 6):
+            if cols[v - 1].button(str(v), key=f"sv{v}"):
+                shot["Rating"] = v
+                st.session_state["wz_step"] = 10
+                rerun_wizard()
+    elif step == 10:
+        st.markdown("#### Reazione mentale")
+        for opt in MENTAL_OPTIONS:
+            if st.button(opt, key=f"smn{opt}", use_container_width=True):
+                shot["Mental_Reaction"] = opt
+                st.session_state["wz_step"] = 11
+                rerun_wizard()
+    elif step == 11:
+        st.markdown("#### Strokes gained (usa distanze e lie già inseriti)")
+        if st.button("Calcola e salva colpo", type="primary", use_container_width=True):
+            sg = compute_sg_short(
+                float(shot["Start_Dist_m"]),
+                float(shot["End_Dist_m"]),
+                str(shot["Lie_Start"]),
+                str(shot["Lie_End"]),
+            )
+            row = {
+                "User": user,
+                "Date": datetime.date.today(),
+                "SessionName": session_name,
+                "Time": datetime.datetime.now().strftime("%H:%M"),
+                "Category": "SHORT",
+                "Club": shot.get("Club", ""),
+                "Impact": shot.get("Impact", ""),
+                "Curvature": "",
+                "Trajectory": "",
+                "Lie_Start": shot.get("Lie_Start", ""),
+                "Lie_End": shot.get("Lie_End", ""),
+                "Direction_LR": shot.get("Direction_LR", ""),
+                "Proximity_Lateral_m": shot.get("Proximity_Lateral_m", np.nan),
+                "Proximity_Depth_m": shot.get("Proximity_Depth_m", np.nan),
+                "Start_Dist_m": shot.get("Start_Dist_m", np.nan),
+                "End_Dist_m": shot.get("End_Dist_m", np.nan),
+                "Hole_Dist_Start_m": shot.get("Start_Dist_m", np.nan),
+                "Hole_Dist_End_m": shot.get("End_Dist_m", np.nan),
+                "Lie_Long": "",
+                "Rating": shot.get("Rating", np.nan),
+                "Mental_Reaction": shot.get("Mental_Reaction", ""),
+                "Strokes_Gained": sg,
+                "SG_Model": SG_MODEL_VERSION,
+            }
+            save_shot(row)
+            st.success("Gioco corto salvato.")
+            reset_wizard()
+            # Rerun completo solo a colpo salvato: aggiorna lo stato salvataggi in sidebar
+            st.rerun()
+    if st.button("Annulla inserimento", key="cancel_s"):
+        reset_wizard()
+        rerun_wizard()
+
+
+def wizard_putt(session_name: str, user: str) -> None:
+    st.session_state.setdefault("wz_step", 0)
+    step = st.session_state["wz_step"]
+    shot: dict[str, Any] = st.session_state.setdefault("wz_payload", {})
+
+    if step == 0:
+        shot["Start_Dist_m"] = st.number_input(
+            "Distanza iniziale dalla buca (metri)", min_value=0.0, step=0.25
+        )
+        if st.button("Avanti", use_container_width=True):
+            st.session_state["wz_step"] = 1
+            rerun_wizard()
+    elif step == 1:
+        shot["End_Dist_m"] = st.number_input(
+            "Distanza finale (0 se in buca)", min_value=0.0, step=0.1
+        )
+        if st.button("Conferma distanze", use_container_width=True):
+            st.session_state["wz_step"] = 2
+            rerun_wizard()
+    elif step == 2:
+        st.markdown("#### Impatto sulla faccia")
+        for opt in PUTT_IMPACT:
+            if st.button(opt, key=f"pi{opt}", use_container_width=True):
+                shot["Impact"] = opt
+                st.session_state["wz_step"] = 3
+                rerun_wizard()
+    elif step == 3:
+        st.markdown("#### Traiettoria")
+        for opt in PUTT_TRAJ:
+            if st.button(opt, key=f"pt{opt}", use_container_width=True):
+                shot["Trajectory"] = opt
+                shot["Curvature"] = opt
+                st.session_state["wz_step"] = 4
+                rerun_wizard()
+    elif step == 4:
+        st.markdown("#### Voto (1–5)")
+        cols = st.columns(5)
+        for v in range(1, 6):
+            if cols[v - 1].button(str(v), key=f"pv{v}"):
+                shot["Rating"] = v
+                st.session_state["wz_step"] = 5
+                rerun_wizard()
+    elif step == 5:
+        st.markdown("#### Reazione mentale")
+        for opt in MENTAL_OPTIONS:
+            if st.button(opt, key=f"pmn{opt}", use_container_width=True):
+                shot["Mental_Reaction"] = opt
+                st.session_state["wz_step"] = 6
+                rerun_wizard()
+    elif step == 6:
+        st.markdown("#### Salva putt (strokes gained dal primo putt)")
+        if st.button("Calcola SG e salva", type="primary", use_container_width=True):
+            sg = compute_sg_putt(float(shot["Start_Dist_m"]), float(shot["End_Dist_m"]))
+            row = {
+                "User": user,
+                "Date": datetime.date.today(),
+                "SessionName": session_name,
+                "Time": datetime.datetime.now().strftime("%H:%M"),
+                "Category": "PUTT",
+                "Club": "Putter",
+                "Impact": shot.get("Impact", ""),
+                "Curvature": shot.get("Curvature", ""),
+                "Trajectory": shot.get("Trajectory", ""),
+                "Lie_Start": "Green",
+                "Lie_End": "Green",
+                "Direction_LR": "",
+                "Proximity_Lateral_m": np.nan,
+                "Proximity_Depth_m": np.nan,
+                "Start_Dist_m": shot.get("Start_Dist_m", np.nan),
+                "End_Dist_m": shot.get("End_Dist_m", np.nan),
+                "Hole_Dist_Start_m": shot.get("Start_Dist_m", np.nan),
+                "Hole_Dist_End_m": shot.get("End_Dist_m", np.nan),
+                "Lie_Long": "",
+                "Rating": shot.get("Rating", np.nan),
+                "Mental_Reaction": shot.get("Mental_Reaction", ""),
+                "Strokes_Gained": sg,
+                "SG_Model": SG_MODEL_VERSION,
+            }
+            save_shot(row)
+            st.success("Putt salvato.")
+            reset_wizard()
+            # Rerun completo solo a colpo salvato: aggiorna lo stato salvataggi in sidebar
+            st.rerun()
+    if st.button("Annulla inserimento", key="cancel_p"):
+        reset_wizard()
+        rerun_wizard()
+
+
+# =============================================================================
+# Import da file
+# =============================================================================
+# Intestazioni accettate (normalizzate: minuscole, senza accenti né unità tra parentesi)
+IMPORT_ALIASES: dict[str, list[str]] = {
+    "User": ["user", "utente", "atleta", "player"],
+    "Date": ["date", "data", "session_date"],
+    "SessionName": ["sessionname", "session", "sessione", "session_name"],
+    "Time": ["time", "ora"],
+    "Category": ["category", "categoria", "settore"],
+    "Club": ["club", "bastone", "club_type", "club_name"],
+    "Impact": ["impact", "impatto"],
+    "Curvature": ["curvature", "curvatura", "shape", "shot_shape"],
+    "Trajectory": ["trajectory", "traiettoria"],
+    "Direction_LR": ["direction_lr", "direction", "direzione"],
+    "Proximity_Lateral_m": [
+        "proximity_lateral_m", "lateral", "lateral_m", "offline", "side", "total_side", "errore_laterale",
+    ],
+    "Proximity_Depth_m": ["proximity_depth_m", "depth", "depth_m", "long_short", "errore_profondita"],
+    "Start_Dist_m": ["start_dist_m", "start_distance", "start_dist", "distanza_partenza"],
+    "End_Dist_m": ["end_dist_m", "end_distance", "end_dist", "distanza_finale"],
+    "Hole_Dist_Start_m": ["hole_dist_start_m", "target", "target_distance", "distance_to_pin", "distanza_buca"],
+    "Hole_Dist_End_m": ["hole_dist_end_m", "proximity", "distance_to_pin_after", "distanza_buca_dopo"],
+    "Lie_Start": ["lie_start", "lie", "lie_iniziale"],
+    "Lie_End": ["lie_end", "lie_finale"],
+    "Lie_Long": ["lie_long"],
+    "Rating": ["rating", "voto", "score"],
+    "Mental_Reaction": ["mental_reaction", "mental", "reazione", "reazione_mentale"],
+}
+IMPORT_CARRY = ["carry", "carry_distance"]
+IMPORT_TOTAL = ["total", "total_distance"]
+IMPORT_DISTANCES = [
+    "Proximity_Lateral_m",
+    "Start_Dist_m",
+    "End_Dist_m",
+    "Hole_Dist_Start_m",
+    "Hole_Dist_End_m",
+]
+
+
+def _import_key(header: Any) -> str:
+    text = unicodedata.normalize("NFKD", str(header)).encode("ascii", "ignore").decode().lower()
+    text = re.sub(r"[\(\[].*?[\)\]]", "", text)
+    return re.sub(r"[^a-z0-9]+", "_", text).strip("_")
+
+
+def read_import_file(name: str, data: bytes) -> pd.DataFrame:
+    """CSV (separatore rilevato) o XLSX; per l'XLSX serve openpyxl."""
+    if name.lower().endswith((".xlsx", ".xls")):
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError as exc:
+            raise ValueError("Per importare file Excel installa openpyxl, oppure esporta in CSV.") from exc
+        return pd.read_excel(io.BytesIO(data))
+    return pd.read_csv(io.BytesIO(data), sep=None, engine="python", encoding="utf-8-sig")
+
+
+def prepare_import(
+    raw: pd.DataFrame,
+    user: str,
+    session_name: str,
+    category: str,
+    day: datetime.date,
+    source_id: str,
+) -> tuple[pd.DataFrame, list[str]]:
+    """File grezzo → righe ``DATA_COLUMNS`` validate, con SG calcolato sull'intero lotto.
+
+    Restituisce le righe importabili e gli avvisi da mostrare. ``Shot_ID`` è
+    derivato da ``source_id`` e dal numero di riga: reimportare lo stesso
+    file non duplica i colpi.
+    """
+    notes: list[str] = []
+    keys = {_import_key(c): c for c in raw.columns}
+    df = pd.DataFrame(index=raw.index)
+    for col, aliases in IMPORT_ALIASES.items():
+        src = next((keys[a] for a in aliases if a in keys), None)
+        df[col] = raw[src] if src is not None else np.nan
+    df = df.dropna(how="all")
+    if df.empty:
+        return align_dataframe(df), ["Nessuna colonna riconosciuta nel file."]
+    raw = raw.loc[df.index]
+
+    cat = _as_labels(df["Category"]).astype(object)
+    by_label = {v.upper(): k for k, v in CATEGORIES.items()}
+    cat = np.array([by_label.get(c.upper(), c.upper()) if c else category for c in cat], dtype=object)
+    bad = ~np.isin(cat, list(CATEGORIES))
+    if bad.any():
+        notes.append(f"{int(bad.sum())} righe scartate: settore non riconosciuto.")
+    df["Category"] = cat
+    df = df[~bad]
+    raw = raw[~bad]
+
+    for col in IMPORT_DISTANCES + ["Proximity_Depth_m"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    for col in IMPORT_DISTANCES:
+        neg = df[col] < 0
+        if col != "Proximity_Lateral_m" and neg.any():
+            notes.append(f"{int(neg.sum())} valori negativi in {col} ignorati.")
+            df.loc[neg, col] = np.nan
+
+    # Launch monitor: profondità = totale (o carry) - distanza bersaglio
+    shot_len = None
+    for aliases in (IMPORT_TOTAL, IMPORT_CARRY):
+        src = next((keys[a] for a in aliases if a in keys), None)
+        if src is not None:
+            shot_len = pd.to_numeric(raw[src], errors="coerce")
+            break
+    if shot_len is not None:
+        df["Proximity_Depth_m"] = df["Proximity_Depth_m"].fillna(shot_len - df["Hole_Dist_Start_m"])
+    df["Hole_Dist_End_m"] = df["Hole_Dist_End_m"].fillna(
+        np.hypot(df["Proximity_Lateral_m"], df["Proximity_Depth_m"])
+    )
+    # Come il wizard range: partenza/arrivo coincidono con le distanze dalla buca
+    df["Start_Dist_m"] = df["Start_Dist_m"].fillna(df["Hole_Dist_Start_m"])
+    df["End_Dist_m"] = df["End_Dist_m"].fillna(df["Hole_Dist_End_m"])
+    is_range = df["Category"] == "RANGE"
+    lie_long = np.where(_as_labels(df["Lie_Start"]) == "Tee", "Tee", "Fairway")
+    df["Lie_Long"] = np.where(is_range & df["Lie_Long"].isna(), lie_long, df["Lie_Long"])
+    df["Lie_End"] = np.where(is_range & df["Lie_End"].isna(), "Fairway", df["Lie_End"])
+
+    rating = pd.to_numeric(df["Rating"], errors="coerce").round()
+    out_of_range = rating.notna() & ~rating.between(1, 5)
+    if out_of_range.any():
+        notes.append(f"{int(out_of_range.sum())} voti fuori scala 1–5 ignorati.")
+    df["Rating"] = rating.mask(out_of_range)
+
+    dates = pd.to_datetime(df["Date"], errors="coerce", dayfirst=True)
+    df["Date"] = dates.dt.date.where(dates.notna(), day)
+    df["User"] = user
+    df["SessionName"] = df["SessionName"].fillna(session_name)
+    df["Time"] = df["Time"].fillna(datetime.datetime.now().strftime("%H:%M"))
+
+    df["Strokes_Gained"] = compute_sg_frame(df)
+    df["SG_Model"] = SG_MODEL_VERSION
+    missing_sg = int(df["Strokes_Gained"].isna().sum())
+    if missing_sg:
+        notes.append(f"{missing_sg} righe senza distanze sufficienti: strokes gained vuoto.")
+    df["Shot_ID"] = [f"imp-{source_id}-{i}" for i in df.index]
+    return align_dataframe(df), notes
+
+
+def import_panel(session_name: str, user: str) -> None:
+    with st.expander("Importa sessione da file (CSV/XLSX)"):
+        st.caption(
+            "Esportazione del launch monitor o foglio di sessione: bastone, carry/totale, "
+            "errori laterale e in profondità, distanze di partenza e arrivo."
+        )
+        up = st.file_uploader("File sessione", type=["csv", "xlsx"], key="import_file")
+        c1, c2 = st.columns(2)
+        category = c1.selectbox(
+            "Settore (se manca nel file)",
+            list(CATEGORIES),
+            format_func=lambda x: CATEGORIES[x],
+            key="import_cat",
+        )
+        day = c2.date_input("Data (se manca nel file)", value=datetime.date.today(), key="import_day")
+        if up is None:
+            return
+        data = up.getvalue()
+        try:
+            raw = read_import_file(up.name, data)
+        except Exception as exc:
+            st.error(f"File non leggibile: {exc}")
+            return
+        source_id = hashlib.blake2b(data, digest_size=8).hexdigest()
+        rows, notes = prepare_import(raw, user, session_name, category, day, source_id)
+        for note in notes:
+            st.warning(note)
+        if rows.empty:
+            return
+        st.dataframe(rows.head(20), use_container_width=True, hide_index=True)
+        if st.button(f"Importa {len(rows)} colpi", type="primary", use_container_width=True):
+            t0 = time.perf_counter()
+            writer = get_writer()
+            tickets = writer.submit_many(rows.to_dict("records"), dedupe=True)
+            st.session_state.setdefault("save_tickets", []).extend(tickets)
+            if writer.flush():
+                st.success(f"{len(rows)} colpi importati in {time.perf_counter() - t0:.1f} s.")
+            else:
+                st.warning("Colpi salvati in locale: la sincronizzazione riprenderà automaticamente.")
+
+
+# =============================================================================
+# Review
+# =============================================================================
+@perf_span("compute_review")
+def compute_review(
+    df_u: pd.DataFrame,
+    roll_u: pd.DataFrame,
+    session_name: str,
+    period: str,
+    sector: str,
+) -> dict[str, Any]:
+    """Tutti i derivati della Review per un filtro: frame, metriche, torte, SG, putting."""
+    df_f = filter_period(df_u, session_name, period)
+    roll_f = filter_period(roll_u, session_name, period)
+    dsec = df_f[df_f["Category"] == sector]
+    rmean = dsec["Rating"].astype("float64").mean()
+    sg = dsec["Strokes_Gained"].dropna()
+    return {
+        "dsec": dsec,
+        "roll_sec": roll_f[roll_f["Category"] == sector],
+        "n": len(dsec),
+        "rating_mean": rmean,
+        "sg_mean": sg.mean() if len(sg) else None,
+        "pies": {c: pie_counts(dsec, c) for c in SECTOR_PIES[sector] + ["Rating", "Mental_Reaction"]},
+        "sg_stats": sg_summary_stats(dsec),
+        "points": dispersion_points(dsec) if sector != "PUTT" else None,
+        "putting": putting_make_frame(dsec) if sector == "PUTT" else None,
+    }
+
+
+# Un bastone entra in migliore/peggiore solo con abbastanza colpi con SG
+COACH_MIN_CLUB_SHOTS = 10
+COACH_COLUMNS = (
+    ["Atleta", "Colpi"]
+    + [f"Colpi {c}" for c in CATEGORIES]
+    + ["Voto medio", "SG medio", "SG totale", "Bastone migliore", "Bastone peggiore"]
+)
+
+
+@perf_span("compute_coach_summary")
+def compute_coach_summary(roll: pd.DataFrame, session_name: str, period: str) -> pd.DataFrame:
+    """Una riga per atleta dal rollup: colpi per settore, voto e SG, bastoni migliore/peggiore.
+
+    Un solo groupby atleta × settore × bastone sul rollup filtrato; il resto si
+    ricava da quell'aggregato, che ha al massimo qualche migliaio di righe.
+    """
+    roll_f = filter_period(roll, session_name, period)
+    if roll_f.empty:
+        return pd.DataFrame(columns=COACH_COLUMNS)
+    ucc = roll_f.groupby(["User", "Category", "Club"], observed=True, as_index=False)[ROLLUP_VALUES].sum()
+    per_sector = (
+        ucc.pivot_table(index="User", columns="Category", values="n", aggfunc="sum", fill_value=0)
+        .reindex(columns=list(CATEGORIES), fill_value=0)
+        .add_prefix("Colpi ")
+    )
+    tot = rollup_means(ucc.groupby("User")[ROLLUP_VALUES].sum())
+    clubs = rollup_means(ucc.groupby(["User", "Club"], as_index=False)[ROLLUP_VALUES].sum())
+    clubs = clubs[clubs["sg_n"] >= COACH_MIN_CLUB_SHOTS].sort_values(["User", "sg_mean"])
+    labels = pd.Series(
+        [f"{c} ({m:+.2f})" for c, m in zip(clubs["Club"], clubs["sg_mean"])], index=clubs.index, dtype=object
+    ).groupby(clubs["User"])
+    out = pd.DataFrame(
+        {
+            "Colpi": tot["n"],
+            "Voto medio": tot["rating_mean"],
+            "SG medio": tot["sg_mean"],
+            "SG totale": tot["sg_sum"].where(tot["sg_n"] > 0),
+        }
+    ).join(per_sector)
+    out["Bastone migliore"] = labels.last()
+    out["Bastone peggiore"] = labels.first()
+    out = out.rename_axis("Atleta").reset_index().sort_values(["Colpi", "Atleta"], ascending=[False, True])
+    return out[COACH_COLUMNS].fillna({"Bastone migliore": "—", "Bastone peggiore": "—"})
+
+
+EXPORT_CHUNK_ROWS = 50_000
+# Oltre questa soglia il file di export passa dalla RAM a un file temporaneo
+EXPORT_SPOOL_BYTES = 16 * 1024 * 1024
+
+
+def export_formats() -> dict[str, tuple[str, str]]:
+    """Formati disponibili → (estensione, MIME); Parquet/Arrow solo con pyarrow."""
+    formats = {"CSV": ("csv", "text/csv")}
+    if importlib.util.find_spec("pyarrow") is not None:
+        formats["Parquet"] = ("parquet", "application/vnd.apache.parquet")
+        formats["Arrow IPC"] = ("arrow", "application/vnd.apache.arrow.file")
+    return formats
+
+
+def write_export(df: pd.DataFrame, fmt: str, rows: np.ndarray | None = None) -> tempfile.SpooledTemporaryFile:
+    """Scrive ``df`` (o le sole posizioni ``rows``) a blocchi, senza copie intere del frame."""
+    out = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
+    if rows is None:
+        rows = np.arange(len(df))
+    chunks = (df.iloc[rows[i : i + EXPORT_CHUNK_ROWS]] for i in range(0, len(rows), EXPORT_CHUNK_ROWS))
+    if fmt == "CSV":
+        text = io.TextIOWrapper(out, encoding="utf-8", newline="")
+        # Intestazione sempre presente, anche con zero righe
+        df.iloc[:0].to_csv(text, index=False)
+        for chunk in chunks:
+            chunk.to_csv(text, header=False, index=False, date_format="%Y-%m-%d")
+        text.flush()
+        text.detach()
+    else:
+        import pyarrow as pa
+
+        schema = pa.Schema.from_pandas(df.iloc[rows[:EXPORT_CHUNK_ROWS]], preserve_index=False)
+        # Colonne testo tutte vuote nel primo blocco: tipo esplicito per i blocchi successivi
+        for i, field in enumerate(schema):
+            if pa.types.is_null(field.type):
+                schema = schema.set(i, field.with_type(pa.string()))
+        if fmt == "Parquet":
+            import pyarrow.parquet as pq
+
+            writer = pq.ParquetWriter(out, schema)
+        else:
+            writer = pa.ipc.new_file(out, schema)
+        with writer:
+            for chunk in chunks:
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    out.seek(0)
+    return out
+
+
+def export_panel(user: str, session_name: str, period: str, sector: str, dsec: pd.DataFrame) -> None:
+    """Download del frame filtrato; gli admin possono esportare tutta l'accademia."""
+    with st.expander("Esporta dati"):
+        scope = "Atleta"
+        # Conta chi guarda, non l'atleta mostrato (drill-down coach)
+        if is_admin(str(st.session_state.get("user", ""))):
+            scope = st.radio("Dati", ["Atleta", "Tutta l'accademia"], horizontal=True, key="exp_scope")
+        formats = export_formats()
+        fmt = st.selectbox("Formato", list(formats), key="exp_fmt")
+        st.caption(
+            f"Periodo **{period}** · settore **{CATEGORIES[sector]}**. "
+            "Parquet/Arrow mantengono i tipi per pandas, R o Power BI."
+        )
+        rows = None
+        if scope == "Atleta":
+            df, name = dsec, user
+        else:
+            # Solo le posizioni delle righe scelte: il frame condiviso non viene copiato
+            df, name = load_data(), "accademia"
+            mask = df["Category"] == sector
+            in_period = period_mask(df, session_name, period)
+            if in_period is not None:
+                mask &= in_period
+            rows = np.flatnonzero(mask.to_numpy())
+        ext, mime = formats[fmt]
+
+        def build() -> bytes:
+            # Eseguito da Streamlit solo al click, in un thread separato dallo script
+            with write_export(df, fmt, rows) as spool:
+                return spool.read()
+
+        st.download_button(
+            f"Scarica {len(df) if rows is None else len(rows)} colpi ({fmt})",
+            data=build,
+            file_name=f"supernova_{name}_{sector.lower()}_{datetime.date.today():%Y%m%d}.{ext}",
+            mime=mime,
+            on_click="ignore",
+            use_container_width=True,
+        )
+
+
+def review_panel(
+    user: str, session_name: str, periods: list[str] = PERIOD_LABELS, period_key: str = "rev_period"
+) -> None:
+    render_hero(
+        "Review performance",
+        "Seleziona settore e periodo per aprire una dashboard completa con grafici, SG e tabelle.",
+        ["Pie charts", "Dispersione", "Strokes Gained", "Trend", "Putting make%"],
+    )
+    st.markdown("### Review — statistiche")
+    render_panel(
+        "Filtro analisi",
+        "Scegli prima periodo e settore. La dashboard sotto si aggiorna in tempo reale.",
+    )
+    period = st.selectbox("Periodo", periods, key=period_key)
+    sector = st.radio(
+        "Settore",
+        ["RANGE", "SHORT", "PUTT"],
+        format_func=lambda x: CATEGORIES[x],
+        horizontal=True,
+        key="rev_sector",
+    )
+    # Con shard mensili si leggono solo i mesi del periodo scelto
+    df_u, roll_u, version = load_user_snapshot(user, period_start(period))
+    # Derivati memorizzati: cambiare settore/periodo e tornare indietro non ricalcola
+    key = (user, period, sector, session_name, version, datetime.date.today())
+    rv = get_review_cache().get_or_compute(
+        key, lambda: compute_review(df_u, roll_u, session_name, period, sector)
+    )
+    dsec = rv["dsec"]
+    pies = rv["pies"]
+    st.caption(
+        f"Utente **{user}** · periodo **{period}** · settore **{CATEGORIES[sector]}** · "
+        f"n = **{rv['n']}** colpi."
+    )
+
+    if dsec.empty:
+        st.info("Nessun colpo in questo filtro.")
+        brand_footer()
+        return
+
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Colpi registrati", rv["n"])
+    rmean = rv["rating_mean"]
+    m2.metric("Voto medio", f"{rmean:.2f}" if pd.notna(rmean) else "—")
+    m3.metric("SG medio", f"{rv['sg_mean']:+.3f}" if rv["sg_mean"] is not None else "—")
+
+    sg_summary_table(rv["sg_stats"])
+    baseline_names = st.multiselect(
+        "Baseline di confronto",
+        list(load_baselines()),
+        default=[DEFAULT_BASELINE],
+        format_func=lambda n: load_baselines()[n]["label"] or n,
+        key="rev_baselines",
+    )
+    sg_baseline_comparison(dsec, baseline_names)
+    trend_panel(rv["roll_sec"], CATEGORIES[sector])
+    club_breakdown_table(rv["roll_sec"])
+
+    if sector == "RANGE":
+        render_panel(
+            "Analisi tecnica range",
+            "Impatti, curvatura, direzione e dispersione per identificare pattern e bias di traiettoria.",
+        )
+        plot_pie(
+            pies["Impact"],
+            "Tipologia di impatto — percentuali",
+            "Legenda: ripartizione percentuale degli impatti dichiarati.",
+        )
+        plot_pie(
+            pies["Curvature"],
+            "Curvatura — percentuali",
+            "Legenda: forma di volo predominante nel campione.",
+        )
+        plot_pie(
+            pies["Direction_LR"],
+            "Tendenza direzionale vs bersaglio",
+            "Legenda: orientamento medio rispetto alla linea di punteria.",
+        )
+        plot_dispersion(rv["points"], "Dispersione dall’alto — RANGE")
+        satisfaction_breakdown(pies)
+
+    elif sector == "SHORT":
+        render_panel(
+            "Analisi tecnica gioco corto",
+            "Confronta lie iniziale/finale, contatto e direzione per leggere conversione e qualità d'esecuzione.",
+        )
+        plot_pie(pies["Lie_Start"], "Lie iniziale", "Legenda: da dove parte la palla più spesso.")
+        plot_pie(pies["Lie_End"], "Lie finale", "Legenda: dove finisce la palla dopo il colpo.")
+        plot_pie(pies["Impact"], "Impatto", "Legenda: qualità di contatto dichiarata.")
+        plot_pie(pies["Direction_LR"], "Linea vs buca", "Legenda: tendenza destra/sinistra.")
+        plot_dispersion(rv["points"], "Dispersione dall’alto — gioco corto")
+        satisfaction_breakdown(pies)
+
+    else:
+        render_panel(
+            "Analisi putting",
+            "Contatto faccia, linea e percentuali realizzazione per fascia distanza.",
+        )
+        plot_pie(pies["Impact"], "Impatto sulla faccia", "Legenda: zona di contatto sul putter.")
+        plot_pie(pies["Trajectory"], "Traiettoria di rotazione", "Legenda: pull/dritta/push.")
+        putting_make_table(rv["putting"])
+        satisfaction_breakdown(pies)
+
+    export_panel(user, session_name, period, sector, dsec)
+    brand_footer()
+
+
+@st.fragment
+def entry_wizard(session_name: str, user: str) -> None:
+    """Scelta settore e wizard: i passaggi rieseguono solo questo frammento."""
+    t0 = time.thread_time()
+    in_full_run = st.session_state.get("_full_run", False)
+    try:
+        st.session_state.setdefault("wz_cat", None)
+        if st.session_state["wz_cat"] is None:
+            st.markdown("#### Scegli il settore")
+            c1, c2, c3 = st.columns(3)
+            if c1.button("Range\n(gioco lungo)", use_container_width=True):
+                reset_wizard()
+                st.session_state["wz_cat"] = "RANGE"
+                rerun_wizard()
+            if c2.button("Gioco corto\n(<50 m)", use_container_width=True):
+                reset_wizard()
+                st.session_state["wz_cat"] = "SHORT"
+                rerun_wizard()
+            if c3.button("Putting", use_container_width=True):
+                reset_wizard()
+                st.session_state["wz_cat"] = "PUTT"
+                rerun_wizard()
+        else:
+            st.caption(f"Sessione: **{session_name}**")
+            if st.button("Torna alla scelta settore"):
+                reset_wizard()
+                st.session_state["wz_cat"] = None
+                rerun_wizard()
+            cat = st.session_state["wz_cat"]
+            if cat == "RANGE":
+                wizard_range(session_name, user)
+            elif cat == "SHORT":
+                wizard_short(session_name, user)
+            else:
+                wizard_putt(session_name, user)
+    finally:
+        # Nei run completi la CPU la conta già main()
+        if not in_full_run:
+            track_shot_cpu(t0)
+
+
+def coach_panel(session_name: str) -> None:
+    """Riepilogo di tutti gli atleti per periodo, con apertura della Review di uno di loro."""
+    _, roll, version = load_snapshot()
+    render_hero(
+        "Dashboard coach",
+        "Tutti gli atleti a colpo d'occhio: volume per settore, voto, strokes gained e bastoni.",
+        ["Atleti", "Strokes Gained", "Bastoni", "Review atleta"],
+    )
+    period = st.selectbox("Periodo", COACH_PERIOD_LABELS, key="coach_period")
+    key = ("coach", period, session_name, version, datetime.date.today())
+    summary = get_review_cache().get_or_compute(
+        key, lambda: compute_coach_summary(roll, session_name, period)
+    )
+    if summary.empty:
+        st.info("Nessun colpo in questo periodo.")
+        brand_footer()
+        return
+    st.caption(
+        f"**{len(summary)}** atleti · periodo **{period}** · bastoni migliore/peggiore per SG medio "
+        f"(almeno {COACH_MIN_CLUB_SHOTS} colpi)."
+    )
+    st.dataframe(
+        summary.style.format(
+            {"Voto medio": "{:.2f}", "SG medio": "{:+.3f}", "SG totale": "{:+.2f}"}, na_rep="—"
+        ),
+        use_container_width=True,
+        hide_index=True,
+    )
+    athlete = st.selectbox(
+        "Apri la Review di un atleta",
+        [""] + summary["Atleta"].astype(str).tolist(),
+        format_func=lambda a: a or "— scegli —",
+        key="coach_athlete",
+    )
+    if not athlete:
+        brand_footer()
+        return
+    st.divider()
+    # La Review dell'atleta riparte dal periodo della tabella a ogni cambio di atleta o periodo
+    if st.session_state.get("coach_review_from") != (athlete, period):
+        st.session_state["coach_review_from"] = (athlete, period)
+        st.session_state["coach_review_period"] = period
+    review_panel(athlete, session_name, COACH_PERIOD_LABELS, period_key="coach_review_period")
+
+
+# =============================================================================
+# Amministrazione
+# =============================================================================
+def is_admin(user: str) -> bool:
+    admins = _secret("ADMIN_USERS", []) or []
+    return user.upper() in {str(a).upper() for a in admins}
+
+
+def is_coach(user: str) -> bool:
+    coaches = _secret("COACH_USERS", []) or []
+    return is_admin(user) or user.upper() in {str(c).upper() for c in coaches}
+
+
+def admin_tools() -> None:
+    with st.expander("Manutenzione dati"):
+        st.caption(f"Modello strokes gained attuale: **{SG_MODEL_VERSION}**.")
+        if st.button("Ricalcola strokes gained sullo storico", use_container_width=True):
+            t0 = time.perf_counter()
+            with st.spinner("Ricalcolo in corso…"):
+                n = recompute_strokes_gained(get_backend())
+            st.success(f"{n} righe aggiornate in {time.perf_counter() - t0:.1f} s.")
+        backend = get_backend()
+        if isinstance(backend, ShardedSheetsBackend) and backend.legacy is not None:
+            st.caption("Archivio diviso in shard: lo storico del foglio unico va copiato una volta.")
+            if st.button("Copia lo storico negli shard", use_container_width=True):
+                t0 = time.perf_counter()
+                with st.spinner("Copia in corso…"):
+                    n = backend.migrate_legacy()
+                st.success(f"{n} righe verificate in {time.perf_counter() - t0:.1f} s.")
+        last = st.session_state.get("last_shot_cpu")
+        if last:
+            st.caption(f"CPU server ultimo colpo: **{last[0] * 1000:.0f} ms** in {last[1]} esecuzioni.")
+
+
+def perf_panel() -> None:
+    with st.expander("Prestazioni"):
+        st.caption(
+            f"Durate per funzione e per rerun completo (ultime {PERF_WINDOW} misure per voce, "
+            "tutte le sessioni del processo)."
+        )
+        perf = get_perf()
+        summary = perf.summary()
+        if summary.empty:
+            st.caption("Nessuna misura ancora.")
+            return
+        st.dataframe(
+            summary.style.format({c: "{:.1f}" for c in ["p50 ms", "p90 ms", "p99 ms", "max ms"]}),
+            use_container_width=True,
+            hide_index=True,
+        )
+        if st.button("Azzera misure", use_container_width=True):
+            perf.reset()
+
+
+# =============================================================================
+# Main
+# =============================================================================
+def main() -> None:
+    t0 = time.thread_time()
+    st.session_state["_full_run"] = True
+    try:
+        with perf_span("rerun"):
+            run_app()
+    finally:
+        st.session_state["_full_run"] = False
+        if st.session_state.get("wz_cat") and st.session_state.get("main_page_sidebar") == "Inserimento dati":
+            track_shot_cpu(t0)
+
+
+def run_app() -> None:
+    inject_styles()
+
+    if "splash_done" not in st.session_state:
+        # L'overlay copre il login già renderizzato: nessuna attesa lato server
+        st.session_state["splash_done"] = True
+        render_splash()
+
+    if "logged_in" not in st.session_state:
+        st.session_state["logged_in"] = False
+
+    if not st.session_state["logged_in"]:
+        login_screen()
+        return
+
+    user = str(st.session_state["user"])
+
+    with st.sidebar:
+        brand_header("Profilo")
+        render_panel(
+            "Navigazione",
+            "Passa tra raccolta dati e review analytics. La scelta e' sempre disponibile qui.",
+        )
+        st.write(f"**Atleta:** {user}")
+        render_save_status()
+        st.markdown("### Sezione")
+        page = st.selectbox(
+            "Apri sezione",
+            ["Inserimento dati", "Review"] + (["Coach"] if is_coach(user) else []),
+            index=0,
+            key="main_page_sidebar",
+            label_visibility="collapsed",
+        )
+        session_name = st.text_input("Nome sessione / note", value="Sessione Allenamento")
+        st.divider()
+        render_panel(
+            "Sessione attiva",
+            "Il nome sessione viene usato nel filtro 'Sessione corrente' in Review.",
+        )
+        if is_admin(user):
+            admin_tools()
+            perf_panel()
+        if st.button("Logout / cambia utente", use_container_width=True):
+            st.session_state["logged_in"] = False
+            st.session_state.pop("user", None)
+            st.rerun()
+
+    if page == "Inserimento dati":
+        brand_header("Inserimento rapido")
+        render_hero(
+            "Sessione di raccolta dati",
+            "Input veloce a step singoli con pulsanti grandi, pensato per utilizzo smartphone sul campo pratica.",
+            ["Range", "Short game", "Putting"],
+        )
+        entry_wizard(session_name, user)
+        import_panel(session_name, user)
+        brand_footer()
+
+    elif page == "Coach":
+        brand_header("Coach")
+        coach_panel(session_name)
+
+    else:
+        brand_header()
+        review_panel(user, session_name)
+
+
+if __name__ == "__main__":
+    main()
+